@@ -1,9 +1,22 @@
 import sys
-from PyQt5 import QtCore, QtWidgets, QtWebEngineWidgets, QtGui
+import argparse
+from PyQt5 import QtCore, QtWidgets, QtGui
 import ctypes
 from ctypes import wintypes
 import os
+import random
+import re
 import json
+import struct
+import copy
+import hashlib
+import importlib
+import threading
+import time
+import urllib.parse
+import zlib
+from collections import OrderedDict, deque
+from html import escape
 
 
 GWL_EXSTYLE = -20
@@ -12,24 +25,258 @@ WS_EX_TRANSPARENT = 0x00000020
 WS_EX_TOOLWINDOW = 0x00000080
 WS_EX_NOACTIVATE = 0x08000000
 
+# Duração de um quadro a 60 Hz, usada como orçamento para a troca de modo
+FRAME_BUDGET_MS = 1000 / 60
+
 VK_CONTROL = 0x11  
+VK_SHIFT = 0x10
+VK_MENU = 0x12
+
+# Teclas físicas (esquerda/direita) reportadas pelo hook de teclado
+# para cada modificador genérico
+VK_ALIASES = {
+    VK_CONTROL: (VK_CONTROL, 0xA2, 0xA3),
+    VK_SHIFT: (VK_SHIFT, 0xA0, 0xA1),
+    VK_MENU: (VK_MENU, 0xA4, 0xA5),
+}
+
+WH_KEYBOARD_LL = 13
+WM_KEYDOWN = 0x0100
+WM_KEYUP = 0x0101
+WM_SYSKEYDOWN = 0x0104
+WM_SYSKEYUP = 0x0105
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+
+
+class KBDLLHOOKSTRUCT(ctypes.Structure):
+    _fields_ = [
+        ("vkCode", wintypes.DWORD),
+        ("scanCode", wintypes.DWORD),
+        ("flags", wintypes.DWORD),
+        ("time", wintypes.DWORD),
+        ("dwExtraInfo", ctypes.c_void_p),
+    ]
+
+
+class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+    _fields_ = [
+        ("cb", wintypes.DWORD),
+        ("PageFaultCount", wintypes.DWORD),
+        ("PeakWorkingSetSize", ctypes.c_size_t),
+        ("WorkingSetSize", ctypes.c_size_t),
+        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+        ("PagefileUsage", ctypes.c_size_t),
+        ("PeakPagefileUsage", ctypes.c_size_t),
+    ]
 
 
-user32 = ctypes.windll.user32
-SetWindowLong = user32.SetWindowLongW
-GetWindowLong = user32.GetWindowLongW
-SetLayeredWindowAttributes = user32.SetLayeredWindowAttributes
-GetAsyncKeyState = user32.GetAsyncKeyState
+LRESULT = ctypes.c_ssize_t
+HHOOK = ctypes.c_void_p
+
+
+# Backends de plataforma para as chamadas nativas do Windows
+class Win32Platform:
+    """
+    Acesso às funções do user32 e do kernel32.
+    
+    As funções só são carregadas e tipadas no primeiro uso, para não atrasar
+    a inicialização do aplicativo.
+    """
+    def __init__(self):
+        self._user32 = None
+        self._kernel32 = None
+        self._hook_proc_type = None
+    
+    @property
+    def user32(self):
+        if self._user32 is None:
+            user32 = ctypes.windll.user32
+            
+            user32.SetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int, wintypes.LONG]
+            user32.SetWindowLongW.restype = wintypes.LONG
+            
+            user32.GetWindowLongW.argtypes = [wintypes.HWND, ctypes.c_int]
+            user32.GetWindowLongW.restype = wintypes.LONG
+            
+            user32.SetLayeredWindowAttributes.argtypes = [wintypes.HWND, wintypes.COLORREF, ctypes.c_byte, wintypes.DWORD]
+            user32.SetLayeredWindowAttributes.restype = wintypes.BOOL
+            
+            user32.SetWindowsHookExW.argtypes = [ctypes.c_int, self.hook_proc_type, wintypes.HINSTANCE, wintypes.DWORD]
+            user32.SetWindowsHookExW.restype = HHOOK
+            
+            user32.CallNextHookEx.argtypes = [HHOOK, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM]
+            user32.CallNextHookEx.restype = LRESULT
+            
+            user32.UnhookWindowsHookEx.argtypes = [HHOOK]
+            user32.UnhookWindowsHookEx.restype = wintypes.BOOL
+            
+            self._user32 = user32
+        return self._user32
+    
+    @property
+    def kernel32(self):
+        if self._kernel32 is None:
+            kernel32 = ctypes.windll.kernel32
+            
+            kernel32.GetModuleHandleW.argtypes = [wintypes.LPCWSTR]
+            kernel32.GetModuleHandleW.restype = wintypes.HMODULE
+            
+            kernel32.OpenProcess.argtypes = [wintypes.DWORD, wintypes.BOOL, wintypes.DWORD]
+            kernel32.OpenProcess.restype = wintypes.HANDLE
+            
+            kernel32.K32GetProcessMemoryInfo.argtypes = [
+                wintypes.HANDLE, ctypes.POINTER(PROCESS_MEMORY_COUNTERS), wintypes.DWORD
+            ]
+            kernel32.K32GetProcessMemoryInfo.restype = wintypes.BOOL
+            
+            kernel32.GetProcessTimes.argtypes = [wintypes.HANDLE] + [ctypes.POINTER(wintypes.FILETIME)] * 4
+            kernel32.GetProcessTimes.restype = wintypes.BOOL
+            
+            kernel32.CloseHandle.argtypes = [wintypes.HANDLE]
+            kernel32.CloseHandle.restype = wintypes.BOOL
+            
+            self._kernel32 = kernel32
+        return self._kernel32
+    
+    @property
+    def hook_proc_type(self):
+        if self._hook_proc_type is None:
+            self._hook_proc_type = ctypes.WINFUNCTYPE(LRESULT, ctypes.c_int, wintypes.WPARAM, wintypes.LPARAM)
+        return self._hook_proc_type
+    
+    def get_window_long(self, hwnd, index):
+        return self.user32.GetWindowLongW(hwnd, index)
+    
+    def set_window_long(self, hwnd, index, value):
+        return self.user32.SetWindowLongW(hwnd, index, value)
+    
+    def set_layered_window_attributes(self, hwnd, color_key, alpha, flags):
+        return self.user32.SetLayeredWindowAttributes(hwnd, color_key, alpha, flags)
+    
+    def get_async_key_state(self, vk_code):
+        return self.user32.GetAsyncKeyState(vk_code)
+    
+    def keyboard_hook_proc(self, callback):
+        """Cria o ponteiro de função para o hook (manter a referência viva)"""
+        return self.hook_proc_type(callback)
+    
+    def set_keyboard_hook(self, proc):
+        return self.user32.SetWindowsHookExW(WH_KEYBOARD_LL, proc, self.kernel32.GetModuleHandleW(None), 0)
+    
+    def call_next_hook(self, hook, n_code, w_param, l_param):
+        return self.user32.CallNextHookEx(hook, n_code, w_param, l_param)
+    
+    def unhook(self, hook):
+        return self.user32.UnhookWindowsHookEx(hook)
+    
+    def hook_vk_code(self, l_param):
+        """Lê o código virtual da tecla do KBDLLHOOKSTRUCT recebido pelo hook"""
+        return ctypes.cast(l_param, ctypes.POINTER(KBDLLHOOKSTRUCT)).contents.vkCode
+    
+    def last_error(self):
+        return ctypes.GetLastError()
+    
+    def process_memory(self, pid):
+        """Memória residente (working set) do processo, em bytes"""
+        kernel32 = self.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return 0
+        try:
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return 0
+            return counters.WorkingSetSize
+        finally:
+            kernel32.CloseHandle(handle)
+    
+    def process_cpu_time(self, pid):
+        """Tempo de CPU (usuário + kernel) do processo, em segundos"""
+        kernel32 = self.kernel32
+        handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return 0.0
+        try:
+            times = [wintypes.FILETIME() for _ in range(4)]  # criação, saída, kernel, usuário
+            if not kernel32.GetProcessTimes(handle, *[ctypes.byref(t) for t in times]):
+                return 0.0
+            # FILETIME conta intervalos de 100 ns
+            return sum(t.dwHighDateTime << 32 | t.dwLowDateTime for t in times[2:]) / 1e7
+        finally:
+            kernel32.CloseHandle(handle)
 
 
-SetWindowLong.argtypes = [wintypes.HWND, ctypes.c_int, wintypes.LONG]
-SetWindowLong.restype = wintypes.LONG
+class FakePlatform:
+    """
+    Backend sem chamadas nativas, usado fora do Windows e em testes.
+    
+    Guarda os estilos estendidos de cada janela e o estado das teclas em
+    memória para que possam ser inspecionados.
+    """
+    def __init__(self):
+        self.window_longs = {}
+        self.layered_alpha = {}
+        self.key_states = {}
+    
+    def get_window_long(self, hwnd, index):
+        return self.window_longs.get((hwnd, index), 0)
+    
+    def set_window_long(self, hwnd, index, value):
+        previous = self.get_window_long(hwnd, index)
+        self.window_longs[(hwnd, index)] = value
+        return previous
+    
+    def set_layered_window_attributes(self, hwnd, color_key, alpha, flags):
+        self.layered_alpha[hwnd] = alpha
+        return True
+    
+    def get_async_key_state(self, vk_code):
+        return 0x8000 if self.key_states.get(vk_code) else 0
+    
+    def keyboard_hook_proc(self, callback):
+        return callback
+    
+    def set_keyboard_hook(self, proc):
+        # Sem hook de teclado: o backend de tecla de atalho recorre à consulta periódica
+        return None
+    
+    def call_next_hook(self, hook, n_code, w_param, l_param):
+        return 0
+    
+    def unhook(self, hook):
+        return True
+    
+    def hook_vk_code(self, l_param):
+        return l_param
+    
+    def last_error(self):
+        return 0
+    
+    def process_memory(self, pid):
+        """Memória residente do processo, em bytes (lida de /proc quando existir)"""
+        try:
+            with open(f"/proc/{pid}/statm", 'r') as f:
+                return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            return 0
+    
+    def process_cpu_time(self, pid):
+        """Tempo de CPU do processo, em segundos (lido de /proc quando existir)"""
+        try:
+            with open(f"/proc/{pid}/stat", 'r') as f:
+                # Campos após o nome do processo, a partir do estado
+                fields = f.read().rpartition(")")[2].split()
+            return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        except (OSError, ValueError, IndexError):
+            return 0.0
 
-GetWindowLong.argtypes = [wintypes.HWND, ctypes.c_int]
-GetWindowLong.restype = wintypes.LONG
 
-SetLayeredWindowAttributes.argtypes = [wintypes.HWND, wintypes.COLORREF, ctypes.c_byte, wintypes.DWORD]
-SetLayeredWindowAttributes.restype = wintypes.BOOL
+platform_backend = Win32Platform() if sys.platform == "win32" else FakePlatform()
 
 
 # Classe para configuração do sistema
@@ -37,6 +284,9 @@ class ConfigManager:
     """
     Gerencia a configuração do aplicativo, incluindo carregamento,
     salvamento e fornecimento de valores padrão.
+
+    Alterações feitas com `set()`/`update()` são agrupadas e gravadas em segundo
+    plano depois de `save_delay` segundos sem novas mudanças.
     """
     DEFAULT_CONFIG = {
         "url": "https://streamlabs.com/widgets/chat-box/v1/4485FA70F1938B583520",
@@ -45,14 +295,68 @@ class ConfigManager:
         "opacity": 40,  # 0-100
         "position_x": 100,
         "position_y": 100,
+        "screen_position": {},  # monitor, posição relativa e DPI da janela (preenchido ao mover)
         "enable_sound": True,
         "sound_url": "https://uploads.twitchalerts.com/000/186/728/273/%5BZELDA%5D%20NAVI%20-%20HEY%20LISTEN%20%21%20Sound%20Effect%20%5BFree%20Ringtones%20Download%5D.ogg",
         "hotkey": VK_CONTROL,
-        "hotkey_name": "Control"
+        "hotkey_name": "Control",
+        "hotkey_backend": "auto",  # auto, hook, polling
+        "sound_cooldown_ms": 1000,
+        "sound_max_per_minute": 20,  # 0 = sem limite
+        "asset_cache_dir": "asset_cache",
+        "asset_cache_max_mb": 50,
+        "image_cache_enabled": False,  # cache de emotes e avatares do chat
+        "image_cache_dir": "image_cache",
+        "image_cache_max_mb": 100,
+        "image_cache_memory_mb": 16,
+        "image_cache_hosts": [],  # hosts cujas imagens passam pelo cache (vazio = todos)
+        "web_profile_name": "ChatOverlay",
+        "web_profile_dir": "web_profile",
+        "http_cache_type": "disk",  # disk, memory, none
+        "http_cache_size_mb": 100,
+        "max_messages": 200,  # 0 = sem limite
+        "render_mode": "web",  # web, native
+        "chat_source": "",  # fonte de mensagens do modo nativo: synthetic, socket
+        "synthetic_rate": 10,  # mensagens por segundo
+        "chat_source_address": "127.0.0.1:9000",
+        "chat_source_queue_size": 1000,
+        "max_fps": 30,  # 0 = sem limite
+        "hidden_lifecycle": "active",  # active, frozen, discarded
+        "bridge_enabled": False,  # envia as mensagens da página ao Python (QWebChannel)
+        "bridge_flush_ms": 250,
+        "bridge_queue_size": 1000,
+        "recorder_enabled": False,  # grava o histórico do chat em disco
+        "recorder_dir": "chat_history",
+        "recorder_segment_messages": 100000,  # mensagens por segmento
+        "recorder_commit_ms": 500,  # intervalo da gravação em grupo
+        "filter_highlight": [],  # palavras ou /expressões/ destacadas
+        "filter_hide": [],  # palavras ou /expressões/ ocultadas
+        "filter_muted_users": [],
+        "filter_highlight_color": "rgba(255, 215, 0, 0.35)",
+        "watchdog_enabled": True,  # recupera a página do chat quando ela para de responder
+        "watchdog_interval_ms": 5000,
+        "watchdog_stall_s": 0,  # tempo sem mensagens tratado como falha (0 = nunca)
+        "watchdog_max_backoff_s": 300,
+        "pipeline_stages": [],  # "módulo.Classe" ou {"class": "módulo.Classe", opções}
+        "metrics_enabled": False,
+        "metrics_hud": True,  # exibe as métricas no modo de edição
+        "metrics_file": "",  # arquivo JSONL com as amostras (vazio = não grava)
+        "metrics_max_mb": 5,
+        "metrics_port": 0,  # porta do endpoint http://127.0.0.1:<porta>/metrics (0 = desligado)
+        "overlays": []  # perfis de overlay; cada um sobrescreve as chaves acima
     }
     
-    def __init__(self, config_file="chat_overlay_config.json"):
+    SAVE_DELAY = 1.0  # segundos
+    
+    def __init__(self, config_file="chat_overlay_config.json", save_delay=SAVE_DELAY):
         self.config_file = config_file
+        self.save_delay = save_delay
+        self.write_count = 0
+        self._lock = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._save_deadline = None
+        self._writer = None
+        self._last_written = None
         self.config = self.load_config()
     
     def load_config(self):
@@ -62,25 +366,65 @@ class ConfigManager:
                 with open(self.config_file, 'r', encoding='utf-8') as f:
                     loaded_config = json.load(f)
                     # Mescla com os padrões para garantir que todos os campos existam
-                    config = self.DEFAULT_CONFIG.copy()
+                    config = copy.deepcopy(self.DEFAULT_CONFIG)
                     config.update(loaded_config)
                     return config
         except Exception as e:
             print(f"Erro ao carregar configuração: {e}")
         
-        return self.DEFAULT_CONFIG.copy()
+        return copy.deepcopy(self.DEFAULT_CONFIG)
     
     def save_config(self, config=None):
-        """Salva a configuração atual no arquivo"""
-        if config:
-            self.config = config
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
+        """Salva imediatamente a configuração atual no arquivo"""
+        with self._lock:
+            if config:
+                self.config = config
+            self._save_deadline = None
+        return self._write()
+    
+    def schedule_save(self):
+        """Agenda uma gravação em segundo plano após o período sem alterações"""
+        with self._lock:
+            self._save_deadline = time.monotonic() + self.save_delay
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="ConfigWriter", daemon=True
+                )
+                self._writer.start()
+            self._lock.notify()
+    
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                while self._save_deadline is None:
+                    self._lock.wait()
+                remaining = self._save_deadline - time.monotonic()
+                if remaining > 0:
+                    self._lock.wait(remaining)
+                    continue
+                self._save_deadline = None
+            self._write()
+    
+    def _write(self):
+        """Grava em um arquivo temporário e o renomeia, pulando se nada mudou"""
+        with self._write_lock:
+            with self._lock:
+                data = json.dumps(self.config, indent=4, ensure_ascii=False)
+            if data == self._last_written:
+                return True
+            temp_file = f"{self.config_file}.tmp"
+            try:
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.config_file)
+            except Exception as e:
+                print(f"Erro ao salvar configuração: {e}")
+                return False
+            self._last_written = data
+            self.write_count += 1
             return True
-        except Exception as e:
-            print(f"Erro ao salvar configuração: {e}")
-            return False
     
     def get(self, key, default=None):
         """Obtém um valor de configuração específico"""
@@ -88,11 +432,417 @@ class ConfigManager:
     
     def set(self, key, value):
         """Define um valor de configuração específico"""
-        self.config[key] = value
+        with self._lock:
+            self.config[key] = value
+        self.schedule_save()
     
     def update(self, new_config):
         """Atualiza várias configurações de uma vez"""
-        self.config.update(new_config)
+        with self._lock:
+            self.config.update(new_config)
+        self.schedule_save()
+    
+    def overlay_configs(self):
+        """
+        Retorna uma configuração para cada overlay: um OverlayProfile por perfil
+        em "overlays", ou o próprio ConfigManager se não houver perfis.
+        """
+        profiles = self.config.get("overlays") or []
+        if not profiles:
+            return [self]
+        return [OverlayProfile(self, index) for index in range(len(profiles))]
+    
+    def update_profile(self, index, new_config):
+        """Atualiza as chaves de um perfil de overlay"""
+        with self._lock:
+            self.config["overlays"][index].update(new_config)
+        self.schedule_save()
+
+
+class OverlayProfile:
+    """
+    Configuração de um overlay específico dentro de "overlays".
+    
+    Lê primeiro o valor do perfil e, na falta dele, o valor global. As chaves
+    compartilhadas por todos os overlays (tecla de atalho, perfil do navegador,
+    cache) sempre são lidas e gravadas na configuração global.
+    """
+    SHARED_KEYS = {
+        "hotkey", "hotkey_name", "hotkey_backend",
+        "asset_cache_dir", "asset_cache_max_mb",
+        "web_profile_name", "web_profile_dir", "http_cache_type", "http_cache_size_mb",
+        "overlays",
+    }
+    # Chaves lidas só do perfil, sem cair no valor global
+    OWN_KEYS = {"screen_position"}
+    
+    def __init__(self, manager, index):
+        self.manager = manager
+        self.index = index
+    
+    @property
+    def profile(self):
+        return self.manager.config["overlays"][self.index]
+    
+    @property
+    def name(self):
+        return self.profile.get("name") or f"Overlay {self.index + 1}"
+    
+    @property
+    def config_file(self):
+        return self.manager.config_file
+    
+    @property
+    def config(self):
+        """Configuração efetiva do overlay (globais + perfil)"""
+        config = {k: v for k, v in self.manager.config.items() if k != "overlays"}
+        config.update({k: v for k, v in self.profile.items() if k not in self.SHARED_KEYS})
+        config.update({k: self.get(k) for k in self.OWN_KEYS})
+        return config
+    
+    def get(self, key, default=None):
+        if key in self.OWN_KEYS:
+            return self.profile.get(key, copy.deepcopy(ConfigManager.DEFAULT_CONFIG.get(key, default)))
+        if key not in self.SHARED_KEYS and key in self.profile:
+            return self.profile[key]
+        return self.manager.get(key, default)
+    
+    def set(self, key, value):
+        self.update({key: value})
+    
+    def update(self, new_config):
+        shared = {k: v for k, v in new_config.items() if k in self.SHARED_KEYS}
+        own = {k: v for k, v in new_config.items() if k not in self.SHARED_KEYS}
+        if shared:
+            self.manager.update(shared)
+        if own:
+            self.manager.update_profile(self.index, own)
+    
+    @property
+    def write_count(self):
+        return self.manager.write_count
+    
+    def save_config(self, config=None):
+        return self.manager.save_config()
+
+
+# Classe para o cache local de arquivos usados pela página
+class AssetCache:
+    """
+    Cache em disco para arquivos remotos usados pela página, como o som de notificação.
+    
+    Cada arquivo é salvo com o hash do conteúdo como nome. Um índice em JSON
+    relaciona cada URL ao seu arquivo e ao último uso, que define a ordem de
+    remoção (LRU) quando o tamanho total passa de `max_bytes`. O último uso é
+    gravado no máximo a cada INDEX_SAVE_INTERVAL e em `flush()`, no
+    encerramento, para que a ordem sobreviva a um reinício.
+    """
+    INDEX_FILE = "index.json"
+    INDEX_SAVE_INTERVAL = 30  # segundos
+    
+    def __init__(self, cache_dir="asset_cache", max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._downloading = set()
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        self.index = self.load_index()
+    
+    def load_index(self):
+        """Carrega o índice do cache ou retorna um índice vazio"""
+        try:
+            index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+            if os.path.exists(index_path):
+                with open(index_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar índice do cache: {e}")
+        return {}
+    
+    def save_index(self):
+        """Grava o índice do cache (chamar com o lock adquirido)"""
+        index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        temp_file = f"{index_path}.tmp"
+        self._dirty = False
+        self._saved_at = time.monotonic()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.index, f)
+            os.replace(temp_file, index_path)
+        except Exception as e:
+            print(f"Erro ao salvar índice do cache: {e}")
+    
+    def flush(self):
+        """Grava o índice se o último uso de algum arquivo ainda não foi gravado"""
+        with self._lock:
+            if self._dirty:
+                self.save_index()
+    
+    def local_path(self, url):
+        """Retorna o caminho do arquivo em cache para a URL, ou None"""
+        with self._lock:
+            entry = self.index.get(url)
+            if not entry:
+                return None
+            path = os.path.join(self.cache_dir, entry["file"])
+            self._dirty = True
+            if not os.path.exists(path):
+                del self.index[url]
+                path = None
+            else:
+                entry["last_used"] = time.time()
+            if time.monotonic() - self._saved_at >= self.INDEX_SAVE_INTERVAL:
+                self.save_index()
+            return path
+    
+    def resolve(self, url):
+        """
+        Retorna a URL file:// do arquivo em cache. Se ainda não estiver em cache,
+        agenda o download e retorna a URL original.
+        """
+        if not url or not url.startswith(("http://", "https://")):
+            return url
+        path = self.local_path(url)
+        if path:
+            return QtCore.QUrl.fromLocalFile(os.path.abspath(path)).toString()
+        self.fetch(url)
+        return url
+    
+    def fetch(self, url):
+        """Baixa a URL em segundo plano, se ainda não houver um download em andamento"""
+        with self._lock:
+            if url in self._downloading:
+                return
+            self._downloading.add(url)
+        threading.Thread(target=self._download, args=(url,), daemon=True).start()
+    
+    def _download(self, url):
+        import urllib.request
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read()
+            self.store(url, data)
+        except Exception as e:
+            print(f"Erro ao baixar {url}: {e}")
+        finally:
+            with self._lock:
+                self._downloading.discard(url)
+    
+    def store(self, url, data):
+        """Salva o conteúdo da URL no cache e retorna o caminho do arquivo"""
+        if len(data) > self.max_bytes:
+            return None
+        
+        extension = os.path.splitext(urllib.parse.urlparse(url).path)[1][:10]
+        file_name = hashlib.sha256(data).hexdigest() + extension
+        path = os.path.join(self.cache_dir, file_name)
+        
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if not os.path.exists(path):
+            temp_file = f"{path}.tmp"
+            with open(temp_file, 'wb') as f:
+                f.write(data)
+            os.replace(temp_file, path)
+        
+        with self._lock:
+            self.index[url] = {"file": file_name, "size": len(data), "last_used": time.time()}
+            self._evict()
+            self.save_index()
+        return path
+    
+    def _evict(self):
+        """Remove os arquivos menos usados até caber no limite (chamar com o lock adquirido)"""
+        sizes = {entry["file"]: entry["size"] for entry in self.index.values()}
+        total = sum(sizes.values())
+        by_age = sorted(self.index, key=lambda u: self.index[u]["last_used"])
+        for url in by_age:
+            if total <= self.max_bytes:
+                break
+            file_name = self.index.pop(url)["file"]
+            # Arquivos iguais de URLs diferentes compartilham o mesmo nome
+            if any(entry["file"] == file_name for entry in self.index.values()):
+                continue
+            total -= sizes[file_name]
+            try:
+                os.remove(os.path.join(self.cache_dir, file_name))
+            except OSError:
+                pass
+
+
+# Backends para detecção da tecla de atalho
+class HotkeyBackend(QtCore.QObject):
+    """
+    Base para os backends de tecla de atalho.
+
+    Emite `pressed` quando a tecla configurada é pressionada e `released`
+    quando ela é solta, independente de como o backend detecta o evento.
+    """
+    pressed = QtCore.pyqtSignal()
+    released = QtCore.pyqtSignal()
+
+    def __init__(self, vk_code, parent=None):
+        super().__init__(parent)
+        self.vk_code = vk_code
+        self.is_pressed = False
+
+    def start(self):
+        """Inicia a detecção. Retorna False se o backend não estiver disponível"""
+        return True
+
+    def stop(self):
+        """Interrompe a detecção"""
+
+    def set_key(self, vk_code):
+        """Troca a tecla monitorada"""
+        self.vk_code = vk_code
+        self._set_pressed(False)
+
+    def matches(self, vk_code):
+        """Indica se o código virtual corresponde à tecla configurada"""
+        return vk_code in VK_ALIASES.get(self.vk_code, (self.vk_code,))
+
+    def _set_pressed(self, pressed):
+        if pressed == self.is_pressed:
+            return
+        self.is_pressed = pressed
+        if pressed:
+            self.pressed.emit()
+        else:
+            self.released.emit()
+
+
+class PollingHotkeyBackend(HotkeyBackend):
+    """
+    Consulta GetAsyncKeyState periodicamente.
+
+    Mantido como alternativa para quando o hook de teclado não puder ser instalado.
+    """
+    def __init__(self, vk_code, parent=None, interval=100):
+        super().__init__(vk_code, parent)
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.check_hotkey)
+
+    def start(self):
+        self.timer.start()
+        return True
+
+    def stop(self):
+        self.timer.stop()
+
+    def check_hotkey(self):
+        """Verifica se a tecla configurada está pressionada"""
+        self._set_pressed(bool(platform_backend.get_async_key_state(self.vk_code) & 0x8000))
+
+
+class HookHotkeyBackend(HotkeyBackend):
+    """
+    Usa um hook de teclado de baixo nível (WH_KEYBOARD_LL).
+
+    O Windows só chama o hook quando alguma tecla muda de estado, então não há
+    nenhum despertar periódico enquanto o usuário não digita.
+    """
+    # O Windows remove hooks lentos, por isso o tratamento é adiado para o laço de eventos
+    _key_event = QtCore.pyqtSignal(int, bool)
+
+    def __init__(self, vk_code, parent=None):
+        super().__init__(vk_code, parent)
+        self.hook = None
+        self.down_keys = set()
+        # Referência mantida para o callback não ser coletado pelo GC
+        self._proc = platform_backend.keyboard_hook_proc(self._hook_proc)
+        self._key_event.connect(self._handle_key_event, QtCore.Qt.QueuedConnection)
+
+    def start(self):
+        if self.hook:
+            return True
+        self.hook = platform_backend.set_keyboard_hook(self._proc)
+        if not self.hook:
+            print(f"Erro ao instalar o hook de teclado: {platform_backend.last_error()}")
+            return False
+        return True
+
+    def stop(self):
+        if self.hook:
+            platform_backend.unhook(self.hook)
+            self.hook = None
+
+    def set_key(self, vk_code):
+        self.down_keys.clear()
+        super().set_key(vk_code)
+
+    def _hook_proc(self, n_code, w_param, l_param):
+        if n_code >= 0:
+            try:
+                vk_code = platform_backend.hook_vk_code(l_param)
+                if self.matches(vk_code):
+                    if w_param in (WM_KEYDOWN, WM_SYSKEYDOWN):
+                        self._key_event.emit(vk_code, True)
+                    elif w_param in (WM_KEYUP, WM_SYSKEYUP):
+                        self._key_event.emit(vk_code, False)
+            except Exception as e:
+                print(f"Erro no hook de teclado: {e}")
+        return platform_backend.call_next_hook(self.hook, n_code, w_param, l_param)
+
+    def _handle_key_event(self, vk_code, down):
+        if down:
+            self.down_keys.add(vk_code)
+        else:
+            self.down_keys.discard(vk_code)
+        self._set_pressed(bool(self.down_keys))
+
+
+class FakeHotkeyBackend(HotkeyBackend):
+    """
+    Backend sem acesso ao sistema, usado em testes para injetar eventos de tecla.
+    """
+    def __init__(self, vk_code, parent=None):
+        super().__init__(vk_code, parent)
+        self.down_keys = set()
+
+    def inject(self, vk_code, down):
+        """Simula o pressionamento (down=True) ou a liberação de uma tecla"""
+        if not self.matches(vk_code):
+            return
+        if down:
+            self.down_keys.add(vk_code)
+        else:
+            self.down_keys.discard(vk_code)
+        self._set_pressed(bool(self.down_keys))
+
+    def press(self):
+        self.inject(self.vk_code, True)
+
+    def release(self):
+        self.inject(self.vk_code, False)
+
+
+HOTKEY_BACKENDS = {
+    "hook": HookHotkeyBackend,
+    "polling": PollingHotkeyBackend,
+    "fake": FakeHotkeyBackend,
+}
+
+
+def create_hotkey_backend(kind, vk_code, parent=None):
+    """
+    Cria e inicia o backend de tecla de atalho.
+
+    Com "auto" (ou se o backend pedido falhar ao iniciar) tenta o hook de teclado
+    e recorre à consulta periódica.
+    """
+    candidates = [kind] if kind in HOTKEY_BACKENDS else ["hook"]
+    if "polling" not in candidates:
+        candidates.append("polling")
+
+    for name in candidates:
+        backend = HOTKEY_BACKENDS[name](vk_code, parent)
+        if backend.start():
+            return backend
+        backend.deleteLater()
+    raise RuntimeError("Nenhum backend de tecla de atalho disponível")
 
 
 class ConfigDialog(QtWidgets.QDialog):
@@ -170,55 +920,2338 @@ class ConfigDialog(QtWidgets.QDialog):
         self.hotkey_combo = QtWidgets.QComboBox()
         self.hotkeys = {
             "Control": VK_CONTROL,
-            "Shift": 0x10,
-            "Alt": 0x12,
+            "Shift": VK_SHIFT,
+            "Alt": VK_MENU,
             "F1": 0x70,
             "F2": 0x71,
             "F3": 0x72,
             "F4": 0x73
         }
         
-        for key_name in self.hotkeys:
-            self.hotkey_combo.addItem(key_name)
+        for key_name in self.hotkeys:
+            self.hotkey_combo.addItem(key_name)
+        
+        current_hotkey_name = self.config.get("hotkey_name", "Control")
+        current_index = self.hotkey_combo.findText(current_hotkey_name)
+        if current_index >= 0:
+            self.hotkey_combo.setCurrentIndex(current_index)
+        
+        hotkey_layout.addWidget(self.hotkey_combo)
+        layout.addLayout(hotkey_layout)
+        
+        # Filtros (uma entrada por linha; /padrão/ para expressões regulares)
+        filter_layout = QtWidgets.QFormLayout()
+        self.filter_highlight_input = self.create_filter_input("filter_highlight")
+        filter_layout.addRow("Destacar:", self.filter_highlight_input)
+        self.filter_hide_input = self.create_filter_input("filter_hide")
+        filter_layout.addRow("Ocultar:", self.filter_hide_input)
+        self.filter_muted_input = self.create_filter_input("filter_muted_users")
+        filter_layout.addRow("Usuários silenciados:", self.filter_muted_input)
+        layout.addLayout(filter_layout)
+        
+        # Botões
+        buttons = QtWidgets.QDialogButtonBox(
+            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
+        )
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+        
+        self.setLayout(layout)
+    
+    def create_filter_input(self, key):
+        """Campo de texto com uma regra de filtro por linha"""
+        filter_input = QtWidgets.QPlainTextEdit("\n".join(self.config.get(key) or []))
+        filter_input.setFixedHeight(60)
+        return filter_input
+    
+    @staticmethod
+    def filter_entries(filter_input):
+        return [line.strip() for line in filter_input.toPlainText().splitlines() if line.strip()]
+    
+    def accept(self):
+        # Salvar configurações
+        self.config.update({
+            "url": self.url_input.text(),
+            "width": self.width_input.value(),
+            "height": self.height_input.value(),
+            "opacity": self.opacity_slider.value(),
+            "enable_sound": self.sound_checkbox.isChecked(),
+            "sound_url": self.sound_url_input.text(),
+            "hotkey_name": self.hotkey_combo.currentText(),
+            "hotkey": self.hotkeys[self.hotkey_combo.currentText()],
+            "filter_highlight": self.filter_entries(self.filter_highlight_input),
+            "filter_hide": self.filter_entries(self.filter_hide_input),
+            "filter_muted_users": self.filter_entries(self.filter_muted_input)
+        })
+        
+        # Adicione um log para verificar se as configurações estão corretas
+        print("Salvando configurações:", self.config.config)
+
+        if self.config.save_config():
+            super().accept()  # Fecha o diálogo se a configuração for salva com sucesso
+        else:
+            QtWidgets.QMessageBox.warning(self, "Erro", "Não foi possível salvar as configurações.")
+
+
+# Renderização nativa do chat, sem o iframe do QtWebEngine
+class ChatMessage:
+    """Mensagem de chat em formato compacto"""
+    __slots__ = ("timestamp", "user", "text", "color")
+    
+    def __init__(self, user, text, color="#ffffff", timestamp=None):
+        self.timestamp = time.time() if timestamp is None else timestamp
+        self.user = user
+        self.text = text
+        self.color = color
+    
+    def __repr__(self):
+        return f"ChatMessage({self.user!r}, {self.text!r})"
+    
+    def to_record(self):
+        """Registro no mesmo formato JSON lido por parse_chat_line"""
+        return {"timestamp": self.timestamp, "user": self.user, "text": self.text, "color": self.color}
+
+
+class ChatSource(QtCore.QObject):
+    """
+    Base para as fontes de mensagens do modo nativo.
+    
+    Emite `messages_received` com listas de ChatMessage.
+    """
+    messages_received = QtCore.pyqtSignal(list)
+    
+    def start(self):
+        """Começa a produzir mensagens"""
+    
+    def stop(self):
+        """Para de produzir mensagens"""
+
+
+class SyntheticChatSource(ChatSource):
+    """Gera mensagens sintéticas a uma taxa fixa, para testes e medições"""
+    TICK_MS = 50
+    COLORS = ("#ff7f50", "#9acd32", "#1e90ff", "#ff69b4", "#daa520")
+    
+    def __init__(self, rate=10, parent=None):
+        super().__init__(parent)
+        self.rate = rate
+        self.count = 0
+        self._due = 0.0
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.TICK_MS)
+        self.timer.timeout.connect(self._tick)
+    
+    def start(self):
+        self.timer.start()
+    
+    def stop(self):
+        self.timer.stop()
+    
+    def _tick(self):
+        self._due += self.rate * self.TICK_MS / 1000
+        count = int(self._due)
+        if not count:
+            return
+        self._due -= count
+        
+        batch = []
+        for _ in range(count):
+            self.count += 1
+            batch.append(ChatMessage(
+                f"usuario{self.count % 50}",
+                f"Mensagem de teste {self.count}",
+                self.COLORS[self.count % len(self.COLORS)]
+            ))
+        self.messages_received.emit(batch)
+
+
+def parse_chat_line(line):
+    """Converte uma linha JSON recebida em ChatMessage, ou None se for inválida"""
+    try:
+        record = json.loads(line)
+        timestamp = record.get("timestamp")
+        # Só números viram timestamp; o resto (texto, bool) vira o horário de chegada
+        if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)):
+            timestamp = None
+        return ChatMessage(
+            str(record.get("user", "")),
+            str(record.get("text", "")),
+            record.get("color") or "#ffffff",
+            timestamp
+        )
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+class SocketChatSource(ChatSource):
+    """
+    Recebe mensagens de um endpoint TCP, uma mensagem JSON por linha.
+    
+    A conexão roda em um laço asyncio em uma thread própria e os lotes chegam à
+    interface por sinais do Qt. Entre as duas pontas há uma fila limitada: se a
+    interface não acompanhar, a leitura do socket pausa e o próprio TCP segura
+    o remetente.
+    """
+    RECONNECT_DELAY = 2.0  # segundos
+    BATCH_INTERVAL = 0.05  # segundos
+    MAX_BATCH = 500
+    
+    _batch_ready = QtCore.pyqtSignal(list)
+    
+    def __init__(self, host, port, queue_size=1000, parent=None):
+        super().__init__(parent)
+        self.host = host
+        self.port = port
+        self.queue_size = queue_size
+        self.received_count = 0
+        self.last_latency = None  # segundos entre o envio e a entrega à interface
+        self.loop = None
+        self.thread = None
+        self._task = None
+        # Só um lote por vez aguardando a interface
+        self._delivered = threading.Semaphore(1)
+        self._batch_ready.connect(self._deliver)
+    
+    def start(self):
+        if self.thread:
+            return
+        import asyncio
+        self.loop = asyncio.new_event_loop()
+        self._task = self.loop.create_task(self._main())
+        self.thread = threading.Thread(target=self._run, name="ChatSource", daemon=True)
+        self.thread.start()
+    
+    def stop(self):
+        if not self.thread:
+            return
+        self.loop.call_soon_threadsafe(self._task.cancel)
+        self.thread.join(timeout=2)
+        self.thread = None
+    
+    def _run(self):
+        import asyncio
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+    
+    async def _main(self):
+        import asyncio
+        queue = asyncio.Queue(self.queue_size)
+        dispatcher = asyncio.ensure_future(self._dispatch(queue))
+        try:
+            while True:
+                try:
+                    reader, writer = await asyncio.open_connection(self.host, self.port)
+                except OSError as e:
+                    print(f"Erro ao conectar à fonte de mensagens: {e}")
+                    await asyncio.sleep(self.RECONNECT_DELAY)
+                    continue
+                try:
+                    await self._read(reader, queue)
+                except (OSError, ValueError) as e:
+                    print(f"Conexão com a fonte de mensagens perdida: {e}")
+                finally:
+                    writer.close()
+                await asyncio.sleep(self.RECONNECT_DELAY)
+        finally:
+            dispatcher.cancel()
+    
+    async def _read(self, reader, queue):
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            message = parse_chat_line(line)
+            if message:
+                # Bloqueia com a fila cheia, deixando de ler o socket
+                await queue.put(message)
+    
+    async def _dispatch(self, queue):
+        import asyncio
+        while True:
+            batch = [await queue.get()]
+            await asyncio.sleep(self.BATCH_INTERVAL)
+            while not queue.empty() and len(batch) < self.MAX_BATCH:
+                batch.append(queue.get_nowait())
+            
+            # Espera a interface consumir o lote anterior
+            while not self._delivered.acquire(blocking=False):
+                await asyncio.sleep(0.005)
+            self._batch_ready.emit(batch)
+    
+    def _deliver(self, batch):
+        try:
+            self.received_count += len(batch)
+            self.last_latency = time.time() - batch[-1].timestamp
+            self.messages_received.emit(batch)
+        finally:
+            self._delivered.release()
+
+
+class ChatReplayServer:
+    """
+    Servidor local que reproduz um log de chat gravado (um JSON por linha) para
+    cada cliente conectado.
+    
+    Os intervalos originais entre as mensagens são divididos por `speed`
+    (0 = o mais rápido possível) e o timestamp enviado é o do momento do envio,
+    para que o cliente possa medir a latência de ponta a ponta.
+    """
+    def __init__(self, log_file, host="127.0.0.1", port=9000, speed=1.0):
+        self.host = host
+        self.port = port
+        self.speed = speed
+        with open(log_file, 'r', encoding='utf-8') as f:
+            self.records = [json.loads(line) for line in f if line.strip()]
+    
+    async def handle_client(self, reader, writer):
+        import asyncio
+        start = time.monotonic()
+        first_timestamp = self.records[0].get("timestamp", 0) if self.records else 0
+        try:
+            for record in self.records:
+                if self.speed > 0:
+                    offset = (record.get("timestamp", first_timestamp) - first_timestamp) / self.speed
+                    delay = offset - (time.monotonic() - start)
+                    if delay > 0:
+                        await asyncio.sleep(delay)
+                record = dict(record, timestamp=time.time())
+                writer.write(json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n")
+                # Respeita a contrapressão do cliente
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+    
+    async def serve(self):
+        import asyncio
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print(f"Reproduzindo {len(self.records)} mensagens em {self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+    
+    def run(self):
+        import asyncio
+        asyncio.run(self.serve())
+
+
+# Histórico do chat gravado em disco
+class ChatRecorder:
+    """
+    Grava as mensagens do chat em segmentos só de acréscimo para consulta
+    posterior.
+    
+    Cada gravação em grupo vira um bloco comprimido com zlib no `NNNNNN.log`
+    (tamanho + dados) e uma linha no `NNNNNN.idx` com a posição do bloco, o
+    intervalo de tempo e os usuários presentes. As consultas usam só o índice
+    para escolher os blocos e descomprimem apenas esses.
+    
+    Com `recover=False` o histórico é aberto só para consulta: nada é
+    recuperado nem gravado, para não truncar o bloco que um overlay em
+    execução pode estar gravando no último segmento.
+    """
+    COMMIT_INTERVAL = 0.5  # segundos
+    BLOCK_MESSAGES = 1000  # mensagens por bloco comprimido
+    BLOCK_HEADER = struct.Struct("<I")
+    
+    def __init__(self, directory, segment_messages=100000, commit_interval=COMMIT_INTERVAL, recover=True):
+        self.directory = directory
+        self.segment_messages = segment_messages
+        self.commit_interval = commit_interval
+        self.written_count = 0
+        self.commit_count = 0
+        self._pending = []
+        self._lock = threading.Condition()
+        self._writer = None
+        self._closed = not recover  # sem recuperação, só consulta
+        self._index_cache = {}  # índices dos segmentos já fechados
+        
+        segments = self.segment_ids()
+        self.segment = segments[-1] if segments else 0
+        if recover:
+            self._recover_segment(self.segment)
+        self.segment_count = sum(entry["count"] for entry in self.read_index(self.segment))
+    
+    def segment_path(self, segment, extension):
+        return os.path.join(self.directory, f"{segment:06d}{extension}")
+    
+    def segment_ids(self):
+        """Números dos segmentos existentes, em ordem"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(
+            int(stem) for stem, extension in map(os.path.splitext, names)
+            if extension == ".idx" and stem.isdigit()
+        )
+    
+    def read_index(self, segment):
+        """Entradas do índice de um segmento"""
+        if segment in self._index_cache:
+            return self._index_cache[segment]
+        
+        entries = []
+        try:
+            with open(self.segment_path(segment, ".idx"), 'rb') as f:
+                for line in f:
+                    entry = self._parse_index_line(line)
+                    if entry is not None:
+                        entries.append(entry)
+        except OSError:
+            pass
+        
+        if segment < self.segment:
+            self._index_cache[segment] = entries
+        return entries
+    
+    def _parse_index_line(self, line):
+        """Entrada de uma linha do índice, ou None se a linha estiver incompleta ou inválida"""
+        try:
+            entry = json.loads(line)
+            entry["users"] = set(entry["users"])
+            if not all(isinstance(entry[key], (int, float)) for key in ("offset", "size", "count", "start", "end")):
+                return None
+        except (ValueError, KeyError, TypeError):
+            return None
+        return entry
+    
+    def _recover_segment(self, segment):
+        """
+        Desfaz o que uma gravação interrompida deixou no segmento: linhas
+        incompletas ou inválidas no `.idx`, entradas de blocos que não chegaram
+        ao `.log` e bytes do `.log` depois do último bloco indexado.
+        """
+        index_path = self.segment_path(segment, ".idx")
+        log_path = self.segment_path(segment, ".log")
+        try:
+            with open(index_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return
+        try:
+            log_size = os.path.getsize(log_path)
+        except OSError:
+            log_size = 0
+        
+        lines = []
+        log_end = 0
+        # O que vem depois do último "\n" é uma linha que não terminou de ser gravada
+        for line in data.split(b"\n")[:-1]:
+            entry = self._parse_index_line(line)
+            if entry is None:
+                continue
+            block_end = entry["offset"] + self.BLOCK_HEADER.size + entry["size"]
+            if block_end > log_size:
+                continue
+            lines.append(line + b"\n")
+            log_end = max(log_end, block_end)
+        
+        try:
+            recovered = b"".join(lines)
+            if recovered != data:
+                temp_file = f"{index_path}.tmp"
+                with open(temp_file, 'wb') as f:
+                    f.write(recovered)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, index_path)
+                print(f"Índice do histórico recuperado após uma gravação interrompida: {index_path}")
+            if log_size > log_end:
+                with open(log_path, 'r+b') as f:
+                    f.truncate(log_end)
+        except OSError as e:
+            print(f"Erro ao recuperar o histórico do chat: {e}")
+    
+    def record(self, messages):
+        """Enfileira mensagens (ChatMessage) para a próxima gravação em grupo"""
+        if not messages:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            was_empty = not self._pending
+            self._pending.extend(messages)
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="ChatRecorder", daemon=True
+                )
+                self._writer.start()
+            if was_empty:
+                self._lock.notify()
+    
+    def close(self):
+        """Grava o que estiver pendente e encerra a thread de gravação"""
+        with self._lock:
+            self._closed = True
+            writer = self._writer
+            self._lock.notify()
+        if writer:
+            writer.join()
+    
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                while not self._pending and not self._closed:
+                    self._lock.wait()
+                if not self._pending:
+                    return
+                if not self._closed:
+                    # Junta as mensagens que chegarem durante o intervalo
+                    self._lock.wait(self.commit_interval)
+                batch, self._pending = self._pending, []
+            self._commit(batch)
+    
+    def _commit(self, batch):
+        while batch:
+            room = self.segment_messages - self.segment_count
+            if room <= 0:
+                self.segment += 1
+                self.segment_count = 0
+                continue
+            chunk, batch = batch[:room], batch[room:]
+            if not self._write_blocks(chunk):
+                return
+    
+    def _write_blocks(self, messages):
+        """Grava as mensagens no segmento atual com um único fsync por arquivo"""
+        data = bytearray()
+        entries = []
+        log_path = self.segment_path(self.segment, ".log")
+        try:
+            offset = os.path.getsize(log_path)
+        except OSError:
+            offset = 0
+        
+        for first in range(0, len(messages), self.BLOCK_MESSAGES):
+            block = messages[first:first + self.BLOCK_MESSAGES]
+            compressed = zlib.compress("\n".join(
+                json.dumps(message.to_record(), ensure_ascii=False) for message in block
+            ).encode('utf-8'))
+            timestamps = [message.timestamp for message in block]
+            entries.append(json.dumps({
+                "offset": offset + len(data),
+                "size": len(compressed),
+                "count": len(block),
+                "start": min(timestamps),
+                "end": max(timestamps),
+                "users": sorted({message.user.casefold() for message in block}),
+            }, ensure_ascii=False))
+            data += self.BLOCK_HEADER.pack(len(compressed)) + compressed
+        
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(log_path, 'ab') as f:
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+            with open(self.segment_path(self.segment, ".idx"), 'a+b') as f:
+                text = "\n".join(entries) + "\n"
+                # Uma linha interrompida não pode engolir a primeira entrada nova
+                if f.tell():
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        text = "\n" + text
+                f.write(text.encode('utf-8'))
+                f.flush()
+                os.fsync(f.fileno())
+        except OSError as e:
+            print(f"Erro ao gravar o histórico do chat: {e}")
+            return False
+        
+        self.segment_count += len(messages)
+        self.written_count += len(messages)
+        self.commit_count += 1
+        return True
+    
+    def query(self, start=None, end=None, user=None, limit=None):
+        """
+        Mensagens gravadas entre os timestamps `start` e `end` e/ou de um
+        usuário, na ordem em que foram gravadas.
+        """
+        user_key = user.casefold() if user else None
+        results = []
+        for segment in self.segment_ids():
+            blocks = [
+                entry for entry in self.read_index(segment)
+                if (start is None or entry["end"] >= start)
+                and (end is None or entry["start"] <= end)
+                and (user_key is None or user_key in entry["users"])
+            ]
+            if not blocks:
+                continue
+            
+            with open(self.segment_path(segment, ".log"), 'rb') as f:
+                for entry in blocks:
+                    f.seek(entry["offset"] + self.BLOCK_HEADER.size)
+                    try:
+                        lines = zlib.decompress(f.read(entry["size"])).decode('utf-8').split("\n")
+                    except (zlib.error, UnicodeDecodeError):
+                        # Bloco incompleto de uma gravação interrompida ainda não recuperada
+                        continue
+                    for line in lines:
+                        message = parse_chat_line(line)
+                        if message is None:
+                            continue
+                        if start is not None and message.timestamp < start:
+                            continue
+                        if end is not None and message.timestamp > end:
+                            continue
+                        if user_key is not None and message.user.casefold() != user_key:
+                            continue
+                        results.append(message)
+                        if limit and len(results) >= limit:
+                            return results
+        return results
+
+
+_chat_recorder = None
+
+
+def get_chat_recorder(config):
+    """Retorna o gravador do histórico, compartilhado por todos os overlays"""
+    global _chat_recorder
+    if _chat_recorder is None:
+        _chat_recorder = ChatRecorder(
+            config.get("recorder_dir"),
+            config.get("recorder_segment_messages"),
+            config.get("recorder_commit_ms") / 1000
+        )
+    return _chat_recorder
+
+
+# Processamento das mensagens fora da thread da interface
+class PipelineStage:
+    """
+    Base para os estágios do MessagePipeline (leitura em voz alta, detecção
+    de idioma, pontuação de palavrões...).
+    
+    `process()` roda fora da thread da interface com um lote de ChatMessage e
+    retorna um resultado por mensagem (None = nada a informar). Com
+    `processes = True` ela roda em outro processo, e então o estágio precisa
+    poder ser serializado com pickle. `on_results()` roda na thread da
+    interface com os resultados agrupados.
+    
+    Se o estágio não der conta, a fila (`queue_size`) segue a `policy`:
+    "drop_oldest" descarta as mais antigas, "drop_newest" recusa as novas e
+    "coalesce" mantém só a mensagem mais recente de cada `coalesce_key()`.
+    """
+    name = "stage"
+    queue_size = 1000
+    batch_size = 100
+    policy = "drop_oldest"
+    processes = False
+    
+    def __init__(self, **options):
+        for key, value in options.items():
+            setattr(self, key, value)
+    
+    def process(self, messages):
+        return [None] * len(messages)
+    
+    def coalesce_key(self, message):
+        return message.user
+    
+    def on_results(self, overlay, results):
+        """Recebe [(mensagem, resultado), ...] na thread da interface"""
+
+
+class PipelineWorker:
+    """Fila limitada e thread de um estágio do MessagePipeline"""
+    def __init__(self, pipeline, stage, executor=None):
+        self.pipeline = pipeline
+        self.stage = stage
+        self.executor = executor
+        self.coalesce = stage.policy == "coalesce"
+        self.pending = OrderedDict() if self.coalesce else deque()
+        self.processed = 0
+        self.dropped = 0
+        self.running = True
+        self._lock = threading.Condition()
+        self.thread = threading.Thread(target=self.run, name=f"Pipeline-{stage.name}", daemon=True)
+        self.thread.start()
+    
+    def put(self, messages):
+        stage = self.stage
+        with self._lock:
+            pending = self.pending
+            for message in messages:
+                if self.coalesce:
+                    key = stage.coalesce_key(message)
+                    if key in pending:
+                        del pending[key]
+                        self.dropped += 1
+                    elif len(pending) >= stage.queue_size:
+                        pending.popitem(last=False)
+                        self.dropped += 1
+                    pending[key] = message
+                    continue
+                if len(pending) >= stage.queue_size:
+                    self.dropped += 1
+                    if stage.policy == "drop_newest":
+                        continue
+                    pending.popleft()
+                pending.append(message)
+            self._lock.notify()
+    
+    def take(self):
+        """Próximo lote da fila, ou None quando o worker for parado"""
+        with self._lock:
+            while self.running and not self.pending:
+                self._lock.wait()
+            if not self.running:
+                return None
+            count = min(len(self.pending), self.stage.batch_size)
+            if self.coalesce:
+                return [self.pending.popitem(last=False)[1] for _ in range(count)]
+            return [self.pending.popleft() for _ in range(count)]
+    
+    def run(self):
+        while True:
+            batch = self.take()
+            if batch is None:
+                return
+            try:
+                if self.executor:
+                    results = self.executor.submit(self.stage.process, batch).result()
+                else:
+                    results = self.stage.process(batch)
+                results = list(results)
+                if len(results) != len(batch):
+                    raise ValueError(f"{len(results)} resultados para {len(batch)} mensagens")
+                paired = [(message, result) for message, result in zip(batch, results) if result is not None]
+            except Exception as e:
+                print(f"Erro no estágio {self.stage.name}: {e}")
+                continue
+            self.processed += len(batch)
+            self.pipeline.post(self.stage, paired)
+    
+    def stop(self):
+        with self._lock:
+            self.running = False
+            self._lock.notify()
+
+
+class MessagePipeline(QtCore.QObject):
+    """
+    Passa as mensagens do chat pelos estágios configurados, cada um em sua
+    thread (ou no pool de processos) com sua própria fila limitada.
+    
+    `submit()` só enfileira, então a thread da interface nunca espera um
+    estágio. Os resultados voltam a ela agrupados, no máximo uma vez a cada
+    BATCH_INTERVAL_MS, pelo sinal `results_ready`.
+    """
+    BATCH_INTERVAL_MS = 100
+    
+    results_ready = QtCore.pyqtSignal(list)  # [(estágio, [(mensagem, resultado), ...]), ...]
+    _posted = QtCore.pyqtSignal()
+    
+    def __init__(self, stages, parent=None):
+        super().__init__(parent)
+        self._outbox = []
+        self._outbox_lock = threading.Lock()
+        self.executor = None
+        if any(stage.processes for stage in stages):
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor()
+        self.workers = [
+            PipelineWorker(self, stage, self.executor if stage.processes else None)
+            for stage in stages
+        ]
+        
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.BATCH_INTERVAL_MS)
+        self.timer.timeout.connect(self.deliver)
+        self._posted.connect(self._schedule_delivery)
+    
+    def submit(self, messages):
+        for worker in self.workers:
+            worker.put(messages)
+    
+    def post(self, stage, results):
+        """Guarda os resultados de um estágio (chamado pelas threads dos estágios)"""
+        if not results:
+            return
+        with self._outbox_lock:
+            was_empty = not self._outbox
+            self._outbox.append((stage, results))
+        if was_empty:
+            self._posted.emit()
+    
+    def _schedule_delivery(self):
+        if not self.timer.isActive():
+            self.timer.start()
+    
+    def deliver(self):
+        with self._outbox_lock:
+            batch, self._outbox = self._outbox, []
+        if batch:
+            self.results_ready.emit(batch)
+    
+    def stop(self):
+        self.timer.stop()
+        for worker in self.workers:
+            worker.stop()
+        if self.executor:
+            self.executor.shutdown(wait=False)
+    
+    def stats(self):
+        return {
+            worker.stage.name: {
+                "queued": len(worker.pending),
+                "processed": worker.processed,
+                "dropped": worker.dropped,
+            }
+            for worker in self.workers
+        }
+
+
+def load_pipeline_stages(entries):
+    """Cria os estágios de "pipeline_stages" ("módulo.Classe" ou {"class": ..., opções})"""
+    stages = []
+    for entry in entries or []:
+        options = dict(entry) if isinstance(entry, dict) else {"class": entry}
+        path = options.pop("class", "")
+        module_name, _, class_name = path.rpartition(".")
+        try:
+            stage_class = getattr(importlib.import_module(module_name), class_name)
+            stages.append(stage_class(**options))
+        except Exception as e:
+            print(f"Erro ao carregar o estágio {path!r}: {e}")
+    return stages
+
+
+def create_chat_source(config, parent=None):
+    """Cria a fonte de mensagens configurada, ou None se não houver"""
+    kind = config.get("chat_source")
+    if kind == "synthetic":
+        return SyntheticChatSource(config.get("synthetic_rate"), parent)
+    if kind == "socket":
+        host, _, port = config.get("chat_source_address").rpartition(":")
+        return SocketChatSource(host, int(port), config.get("chat_source_queue_size"), parent)
+    return None
+
+
+class ChatMessageModel(QtCore.QAbstractListModel):
+    """Modelo com as últimas `max_messages` mensagens (0 = sem limite)"""
+    def __init__(self, max_messages=200, parent=None):
+        super().__init__(parent)
+        self.max_messages = max_messages
+        self.messages = []
+    
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.messages)
+    
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        message = self.messages[index.row()]
+        if role == QtCore.Qt.UserRole:
+            return message
+        if role == QtCore.Qt.DisplayRole:
+            return f"{message.user}: {message.text}"
+        return None
+    
+    def append_messages(self, messages):
+        """Adiciona um lote de mensagens e descarta as mais antigas acima do limite"""
+        if self.max_messages:
+            messages = messages[-self.max_messages:]
+        if not messages:
+            return
+        
+        first = len(self.messages)
+        self.beginInsertRows(QtCore.QModelIndex(), first, first + len(messages) - 1)
+        self.messages.extend(messages)
+        self.endInsertRows()
+        
+        excess = len(self.messages) - self.max_messages
+        if self.max_messages and excess > 0:
+            self.beginRemoveRows(QtCore.QModelIndex(), 0, excess - 1)
+            del self.messages[:excess]
+            self.endRemoveRows()
+
+
+class ChatMessageDelegate(QtWidgets.QStyledItemDelegate):
+    """
+    Desenha as mensagens com QStaticText.
+    
+    O layout de glifos de cada texto fica em um cache LRU e é reaproveitado
+    entre repinturas e entre mensagens repetidas.
+    """
+    PADDING = 4
+    CACHE_SIZE = 2000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._layouts = OrderedDict()
+    
+    def static_text(self, message, width, font):
+        key = (message.user, message.text, message.color, width)
+        static = self._layouts.get(key)
+        if static is not None:
+            self._layouts.move_to_end(key)
+            return static
+        
+        static = QtGui.QStaticText(
+            f'<b style="color:{escape(message.color)}">{escape(message.user)}</b>: {escape(message.text)}'
+        )
+        static.setTextFormat(QtCore.Qt.RichText)
+        static.setTextWidth(width)
+        static.setPerformanceHint(QtGui.QStaticText.AggressiveCaching)
+        static.prepare(QtGui.QTransform(), font)
+        
+        self._layouts[key] = static
+        if len(self._layouts) > self.CACHE_SIZE:
+            self._layouts.popitem(last=False)
+        return static
+    
+    def text_width(self):
+        return max(1, self.parent().viewport().width() - 2 * self.PADDING)
+    
+    def paint(self, painter, option, index):
+        message = index.data(QtCore.Qt.UserRole)
+        static = self.static_text(message, self.text_width(), option.font)
+        painter.save()
+        painter.setFont(option.font)
+        painter.setPen(QtGui.QColor("white"))
+        painter.drawStaticText(
+            option.rect.left() + self.PADDING, option.rect.top() + self.PADDING, static
+        )
+        painter.restore()
+    
+    def sizeHint(self, option, index):
+        message = index.data(QtCore.Qt.UserRole)
+        width = self.text_width()
+        static = self.static_text(message, width, option.font)
+        return QtCore.QSize(width, int(static.size().height()) + 2 * self.PADDING)
+
+
+class NativeChatView(QtWidgets.QListView):
+    """
+    Lista de mensagens renderizada pelo Qt.
+    
+    Não há um widget por mensagem: o delegate desenha apenas as linhas visíveis.
+    """
+    def __init__(self, max_messages=200, parent=None):
+        super().__init__(parent)
+        self.chat_model = ChatMessageModel(max_messages, self)
+        self.setModel(self.chat_model)
+        self.setItemDelegate(ChatMessageDelegate(self))
+        
+        self.setLayoutMode(QtWidgets.QListView.Batched)
+        self.setBatchSize(50)
+        self.setResizeMode(QtWidgets.QListView.Adjust)
+        self.setVerticalScrollMode(QtWidgets.QAbstractItemView.ScrollPerPixel)
+        self.setHorizontalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(QtCore.Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
+        self.setFocusPolicy(QtCore.Qt.NoFocus)
+        self.setFrameShape(QtWidgets.QFrame.NoFrame)
+        
+        self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
+        self.viewport().setAutoFillBackground(False)
+        self.setStyleSheet("background: transparent;")
+    
+    def add_messages(self, messages):
+        """Adiciona mensagens e acompanha o final da lista se ela já estiver lá"""
+        scroll_bar = self.verticalScrollBar()
+        at_bottom = scroll_bar.value() >= scroll_bar.maximum()
+        self.chat_model.append_messages(messages)
+        if at_bottom:
+            self.scrollToBottom()
+
+
+# Script injetado na página do chat. Pode ser reinjetado a qualquer momento:
+# o estado anterior fica em window.__chatOverlay e é desfeito antes de aplicar
+# as novas opções.
+OVERLAY_SCRIPT = """
+(function() {
+    var options = __OPTIONS__;
+    var state = window.__chatOverlay || (window.__chatOverlay = {});
+
+    // Desfazer a injeção anterior
+    if (state.observer) {
+        state.observer.disconnect();
+        state.observer = null;
+    }
+    if (state.target) {
+        state.target.style.display = '';
+    }
+    state.target = null;
+    state.pending = 0;
+    state.newNodes = [];
+    state.outbox = state.outbox || [];
+    state.bridgeDropped = state.bridgeDropped || 0;
+
+    // Com a janela oculta o contêiner fica fora do layout. As mensagens continuam
+    // chegando (e tocando o som) e são exibidas de uma vez quando ela volta.
+    state.setHidden = function(hidden) {
+        state.hidden = hidden;
+        if (state.target) {
+            state.target.style.display = hidden ? 'none' : '';
+        }
+    };
+    // Batimento lido pelo watchdog: para se o JavaScript da página travar
+    if (state.heartbeatTimer) {
+        clearInterval(state.heartbeatTimer);
+    }
+    state.heartbeat = Date.now();
+    state.heartbeatTimer = setInterval(function() {
+        state.heartbeat = Date.now();
+    }, 1000);
+    state.playTimes = state.playTimes || [];
+
+    // Som de notificação: um único buffer decodificado, mantido entre injeções
+    function createSound(url) {
+        var sound = { url: url, context: null, buffer: null, element: null };
+        function useElement() {
+            if (sound.element) return;
+            sound.element = new Audio(url);
+            sound.element.preload = 'auto';
+        }
+        var AudioContextClass = window.AudioContext || window.webkitAudioContext;
+        if (!AudioContextClass) {
+            useElement();
+            return sound;
+        }
+        try {
+            sound.context = new AudioContextClass();
+            var request = new XMLHttpRequest();
+            request.open('GET', url, true);
+            request.responseType = 'arraybuffer';
+            request.onload = function() {
+                // Arquivos locais respondem com status 0
+                if (request.status && request.status !== 200) {
+                    useElement();
+                    return;
+                }
+                sound.context.decodeAudioData(request.response, function(buffer) {
+                    sound.buffer = buffer;
+                }, useElement);
+            };
+            request.onerror = useElement;
+            request.send();
+        } catch (e) {
+            useElement();
+        }
+        return sound;
+    }
+
+    function playSound(sound) {
+        if (sound.buffer) {
+            if (sound.context.state === 'suspended') {
+                sound.context.resume();
+            }
+            var source = sound.context.createBufferSource();
+            source.buffer = sound.buffer;
+            source.connect(sound.context.destination);
+            source.start(0);
+        } else if (sound.element) {
+            sound.element.currentTime = 0;
+            var playing = sound.element.play();
+            if (playing && playing.catch) {
+                playing.catch(function() {});
+            }
+        }
+    }
+
+    var soundUrl = options.enableSound ? options.soundUrl : null;
+    if (state.sound && state.sound.url !== soundUrl) {
+        if (state.sound.context) {
+            state.sound.context.close();
+        }
+        state.sound = null;
+    }
+    if (soundUrl && !state.sound) {
+        state.sound = createSound(soundUrl);
+    }
+
+    // Limita os toques por intervalo mínimo e por quantidade em um minuto
+    function notify() {
+        if (!state.sound) return;
+        var now = Date.now();
+        if (now - (state.lastPlay || 0) < options.soundCooldownMs) return;
+        var times = state.playTimes;
+        while (times.length && now - times[0] >= 60000) {
+            times.shift();
+        }
+        if (options.soundMaxPerMinute > 0 && times.length >= options.soundMaxPerMinute) return;
+        times.push(now);
+        state.lastPlay = now;
+        playSound(state.sound);
+    }
+
+    // Mantém só as últimas mensagens, removendo as antigas em lotes
+    function prune() {
+        var target = state.target;
+        if (!options.maxMessages || !target) return;
+        var excess = target.childElementCount - options.maxMessages;
+        if (excess < Math.max(1, Math.floor(options.maxMessages / 10))) return;
+        var range = target.ownerDocument.createRange();
+        range.setStart(target, 0);
+        range.setEndBefore(target.children[excess]);
+        range.deleteContents();
+    }
+
+    // Ponte com o Python: as mensagens novas vão para uma fila limitada,
+    // enviada em lotes a cada bridgeFlushMs
+    if (options.bridge && !state.bridge && typeof QWebChannel !== 'undefined' &&
+            window.qt && qt.webChannelTransport) {
+        new QWebChannel(qt.webChannelTransport, function(channel) {
+            state.bridge = channel.objects.chatBridge;
+        });
+    }
+
+    function readMessage(node) {
+        var name = node.querySelector ? node.querySelector('.name') : null;
+        var body = node.querySelector ? node.querySelector('.message') : null;
+        return {
+            user: name ? name.textContent.trim() : '',
+            text: (body || node).textContent.trim(),
+            color: name ? name.style.color : '',
+            time: Date.now()
+        };
+    }
+
+    function sendToBridge() {
+        state.bridgeTimer = null;
+        if (!state.outbox.length) return;
+        if (!state.bridge) {
+            // Canal ainda não conectado: a fila continua limitada
+            state.bridgeTimer = setTimeout(sendToBridge, options.bridgeFlushMs);
+            return;
+        }
+        var batch = state.outbox;
+        var dropped = state.bridgeDropped;
+        state.outbox = [];
+        state.bridgeDropped = 0;
+        state.bridge.post_messages(batch, dropped);
+    }
+
+    function queueForBridge(records) {
+        for (var i = 0; i < records.length; i++) {
+            state.outbox.push(records[i]);
+        }
+        var overflow = state.outbox.length - options.bridgeQueueSize;
+        if (overflow > 0) {
+            state.outbox.splice(0, overflow);
+            state.bridgeDropped += overflow;
+        }
+        if (!state.bridgeTimer) {
+            state.bridgeTimer = setTimeout(sendToBridge, options.bridgeFlushMs);
+        }
+    }
+
+    // Filtro: o Python devolve só [índice, ações] das mensagens que casaram
+    // com alguma regra (1 = destacar, 2 = ocultar)
+    function filterNodes(nodes, records) {
+        if (!state.bridge) return;
+        var i;
+        if (options.filterHide) {
+            // Evita que uma mensagem a ser ocultada apareça por um instante
+            for (i = 0; i < nodes.length; i++) {
+                nodes[i].style.visibility = 'hidden';
+            }
+        }
+        state.bridge.filter_messages(records, function(matches) {
+            for (var j = 0; j < matches.length; j++) {
+                var node = nodes[matches[j][0]];
+                var flags = matches[j][1];
+                if (flags & 2) {
+                    node.style.display = 'none';
+                } else if (flags & 1) {
+                    node.style.backgroundColor = options.highlightColor;
+                }
+            }
+            if (options.filterHide) {
+                for (j = 0; j < nodes.length; j++) {
+                    nodes[j].style.visibility = '';
+                }
+            }
+        });
+    }
+
+    // Agrupa todas as mutações de um quadro em uma única passada
+    state.flush = function() {
+        state.flushScheduled = false;
+        var count = state.pending;
+        var nodes = state.newNodes;
+        state.pending = 0;
+        state.newNodes = [];
+        if (count) {
+            state.messageCount = (state.messageCount || 0) + count;
+            state.lastMessage = Date.now();
+            if (nodes.length) {
+                var records = nodes.map(readMessage);
+                if (options.bridgeBatches) {
+                    queueForBridge(records);
+                }
+                if (options.filter) {
+                    filterNodes(nodes, records);
+                }
+            }
+            prune();
+            notify();
+        }
+    };
+
+    function scheduleFlush() {
+        if (state.flushScheduled) return;
+        state.flushScheduled = true;
+        var run = function() { state.flush(); };
+        // requestAnimationFrame não dispara com a janela oculta
+        if (document.hidden) {
+            setTimeout(run, 100);
+        } else {
+            window.requestAnimationFrame(run);
+        }
+    }
+
+    if (!state.sound && !options.maxMessages && !options.bridge && !options.watchdog) return;
+
+    var iframe = document.getElementById('chatFrame');
+    if (!iframe) return;
+
+    function attach() {
+        try {
+            var iframeDoc = iframe.contentDocument || iframe.contentWindow.document;
+
+            // Observar mudanças no contêiner de mensagens
+            var target = iframeDoc.getElementById('log');
+            if (!target) return;
+
+            if (state.observer) {
+                state.observer.disconnect();
+            }
+            var observer = new MutationObserver(function(mutations) {
+                for (var i = 0; i < mutations.length; i++) {
+                    var added = mutations[i].addedNodes;
+                    state.pending += added.length;
+                    if (options.bridge) {
+                        for (var j = 0; j < added.length; j++) {
+                            if (added[j].nodeType === 1) {
+                                state.newNodes.push(added[j]);
+                            }
+                        }
+                    }
+                }
+                if (state.pending) {
+                    scheduleFlush();
+                }
+            });
+            observer.observe(target, { childList: true });
+            state.observer = observer;
+            state.target = target;
+            state.lastMessage = state.lastMessage || Date.now();
+            state.setHidden(!!state.hidden);
+        } catch (e) {
+            console.log('Erro ao acessar o conteúdo do iframe:', e);
+        }
+    }
+
+    // Aguardar o iframe carregar (ou aplicar já, se ele estiver carregado)
+    iframe.onload = attach;
+    var loadedDoc = null;
+    try {
+        loadedDoc = iframe.contentDocument;
+    } catch (e) {}
+    if (loadedDoc && loadedDoc.readyState === 'complete' && loadedDoc.URL !== 'about:blank') {
+        attach();
+    }
+})();
+"""
+
+
+def image_type(data):
+    """Tipo MIME de uma imagem pelos primeiros bytes"""
+    if data.startswith(b"\x89PNG"):
+        return b"image/png"
+    if data.startswith(b"GIF8"):
+        return b"image/gif"
+    if data.startswith(b"\xff\xd8"):
+        return b"image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return b"image/webp"
+    if data.lstrip()[:5] in (b"<svg ", b"<?xml"):
+        return b"image/svg+xml"
+    return b"application/octet-stream"
+
+
+class ImageCache(QtCore.QObject):
+    """
+    Cache das imagens do chat (emotes e avatares).
+    
+    As requisições de imagem da página são redirecionadas para o esquema
+    `overlay-image:` e atendidas aqui: primeiro por um LRU em memória com os
+    bytes das imagens, limitado a `memory_bytes`, depois pelo cache em disco
+    (AssetCache) e por último pela rede. Requisições simultâneas da mesma
+    imagem aguardam um único download.
+    """
+    SCHEME = b"overlay-image"
+    DOWNLOAD_WORKERS = 4
+    
+    _downloaded = QtCore.pyqtSignal(str, bytes)
+    
+    def __init__(self, disk_cache, memory_bytes=16 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.disk_cache = disk_cache
+        self.memory_bytes = memory_bytes
+        self.memory = OrderedDict()  # url -> bytes
+        self.memory_size = 0
+        self.waiting = {}  # url -> requisições aguardando o download
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.downloads = 0
+        self.shared_requests = 0  # requisições atendidas por um download já em andamento
+        from concurrent.futures import ThreadPoolExecutor
+        self.executor = ThreadPoolExecutor(self.DOWNLOAD_WORKERS, thread_name_prefix="ImageCache")
+        self._downloaded.connect(self._finish)
+    
+    def cache_url(self, url):
+        """URL do esquema do cache para a URL original"""
+        return f"{self.SCHEME.decode()}:{url.encode('utf-8').hex()}"
+    
+    def original_url(self, cache_url):
+        return bytes.fromhex(cache_url.partition(":")[2]).decode('utf-8')
+    
+    def get(self, url):
+        """Bytes da imagem em memória ou em disco, ou None"""
+        data = self.memory.get(url)
+        if data is not None:
+            self.memory.move_to_end(url)
+            self.memory_hits += 1
+            return data
+        
+        path = self.disk_cache.local_path(url)
+        if path:
+            try:
+                with open(path, 'rb') as f:
+                    data = f.read()
+            except OSError:
+                return None
+            self.disk_hits += 1
+            self.remember(url, data)
+        return data
+    
+    def remember(self, url, data):
+        """Guarda a imagem no LRU em memória, removendo as menos usadas"""
+        if len(data) > self.memory_bytes:
+            return
+        previous = self.memory.pop(url, None)
+        if previous is not None:
+            self.memory_size -= len(previous)
+        self.memory[url] = data
+        self.memory_size += len(data)
+        while self.memory_size > self.memory_bytes:
+            _, evicted = self.memory.popitem(last=False)
+            self.memory_size -= len(evicted)
+    
+    def request(self, url, callback):
+        """
+        Chama `callback(dados)` com a imagem (b"" em caso de erro), já ou
+        quando o download terminar. Só há um download por URL.
+        """
+        data = self.get(url)
+        if data is not None:
+            callback(data)
+            return
+        
+        callbacks = self.waiting.get(url)
+        if callbacks is not None:
+            callbacks.append(callback)
+            self.shared_requests += 1
+            return
+        self.waiting[url] = [callback]
+        self.downloads += 1
+        self.executor.submit(self._download, url)
+    
+    def _download(self, url):
+        import urllib.request
+        data = b""
+        try:
+            with urllib.request.urlopen(url, timeout=30) as response:
+                data = response.read()
+            self.disk_cache.store(url, data)
+        except Exception as e:
+            print(f"Erro ao baixar {url}: {e}")
+        self._downloaded.emit(url, data)
+    
+    def _finish(self, url, data):
+        if data:
+            self.remember(url, data)
+        for callback in self.waiting.pop(url, []):
+            callback(data)
+    
+    def handle_request(self, job):
+        """Atende uma requisição do esquema `overlay-image:`"""
+        from PyQt5 import QtWebEngineCore
+        
+        def reply(data):
+            try:
+                if not data:
+                    job.fail(QtWebEngineCore.QWebEngineUrlRequestJob.RequestFailed)
+                    return
+                buffer = QtCore.QBuffer(job)
+                buffer.setData(data)
+                buffer.open(QtCore.QIODevice.ReadOnly)
+                job.reply(image_type(data), buffer)
+            except RuntimeError:
+                pass  # a página cancelou a requisição
+        
+        try:
+            url = self.original_url(job.requestUrl().toString())
+        except ValueError:
+            job.fail(QtWebEngineCore.QWebEngineUrlRequestJob.UrlInvalid)
+            return
+        self.request(url, reply)
+    
+    def stats(self):
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "downloads": self.downloads,
+            "shared_requests": self.shared_requests,
+            "memory_bytes": self.memory_size,
+        }
+
+
+def register_image_scheme():
+    """Registra o esquema do ImageCache (antes de criar a QApplication)"""
+    global _image_scheme_registered
+    from PyQt5 import QtWebEngineCore
+    
+    scheme = QtWebEngineCore.QWebEngineUrlScheme(ImageCache.SCHEME)
+    scheme.setSyntax(QtWebEngineCore.QWebEngineUrlScheme.Syntax.Path)
+    scheme.setFlags(
+        QtWebEngineCore.QWebEngineUrlScheme.SecureScheme |
+        QtWebEngineCore.QWebEngineUrlScheme.CorsEnabled |
+        QtWebEngineCore.QWebEngineUrlScheme.ContentSecurityPolicyIgnored
+    )
+    QtWebEngineCore.QWebEngineUrlScheme.registerScheme(scheme)
+    _image_scheme_registered = True
+
+
+def install_image_cache(profile, config):
+    """Faz as imagens da página passarem pelo ImageCache"""
+    from PyQt5 import QtWebEngineCore
+    
+    image_cache = ImageCache(
+        AssetCache(config.get("image_cache_dir"), config.get("image_cache_max_mb") * 1024 * 1024),
+        config.get("image_cache_memory_mb") * 1024 * 1024,
+        profile
+    )
+    hosts = set(config.get("image_cache_hosts") or [])
+    
+    class ImageSchemeHandler(QtWebEngineCore.QWebEngineUrlSchemeHandler):
+        def requestStarted(self, job):
+            image_cache.handle_request(job)
+    
+    class ImageRequestInterceptor(QtWebEngineCore.QWebEngineUrlRequestInterceptor):
+        # Roda na thread de rede do QtWebEngine: só olha a URL
+        def interceptRequest(self, info):
+            if info.resourceType() != QtWebEngineCore.QWebEngineUrlRequestInfo.ResourceTypeImage:
+                return
+            url = info.requestUrl()
+            if url.scheme() not in ("http", "https") or (hosts and url.host() not in hosts):
+                return
+            info.redirect(QtCore.QUrl(image_cache.cache_url(url.toString())))
+    
+    profile.installUrlSchemeHandler(ImageCache.SCHEME, ImageSchemeHandler(profile))
+    interceptor = ImageRequestInterceptor(profile)
+    if hasattr(profile, "setUrlRequestInterceptor"):
+        profile.setUrlRequestInterceptor(interceptor)
+    else:
+        profile.setRequestInterceptor(interceptor)
+    profile.image_cache = image_cache
+    # Grava a ordem de uso das imagens em disco antes de sair
+    QtWidgets.QApplication.instance().aboutToQuit.connect(image_cache.disk_cache.flush)
+    return image_cache
+
+
+_web_profiles = {}
+_image_scheme_registered = False
+
+
+def get_web_profile(config):
+    """
+    Retorna o perfil nomeado do QtWebEngine, com armazenamento persistente e cache
+    HTTP configurável, para que o widget não seja baixado de novo a cada início.
+    
+    O perfil é criado uma única vez e compartilhado por todos os overlays.
+    """
+    from PyQt5 import QtWebEngineWidgets
+    
+    name = config.get("web_profile_name")
+    if name in _web_profiles:
+        return _web_profiles[name]
+    
+    cache_types = {
+        "disk": QtWebEngineWidgets.QWebEngineProfile.DiskHttpCache,
+        "memory": QtWebEngineWidgets.QWebEngineProfile.MemoryHttpCache,
+        "none": QtWebEngineWidgets.QWebEngineProfile.NoCache,
+    }
+    
+    # O perfil pertence à aplicação para sobreviver às páginas que o usam
+    profile = QtWebEngineWidgets.QWebEngineProfile(name, QtWidgets.QApplication.instance())
+    storage_path = os.path.abspath(config.get("web_profile_dir"))
+    profile.setPersistentStoragePath(storage_path)
+    profile.setCachePath(os.path.join(storage_path, "cache"))
+    profile.setHttpCacheType(
+        cache_types.get(config.get("http_cache_type"), QtWebEngineWidgets.QWebEngineProfile.DiskHttpCache)
+    )
+    profile.setHttpCacheMaximumSize(config.get("http_cache_size_mb") * 1024 * 1024)
+    profile.setPersistentCookiesPolicy(QtWebEngineWidgets.QWebEngineProfile.AllowPersistentCookies)
+    if config.get("image_cache_enabled") and _image_scheme_registered:
+        install_image_cache(profile, config)
+    _web_profiles[name] = profile
+    return profile
+
+
+class RenderBudget(QtCore.QObject):
+    """
+    Limita a frequência com que a janela é repintada e mede o custo da pintura.
+    
+    Como a janela é translúcida, cada repintura recompõe a janela inteira. Os
+    pedidos de repintura (QEvent.UpdateRequest) que chegam antes do intervalo
+    mínimo são adiados para o próximo quadro permitido, e nenhum é atendido
+    enquanto a pintura estiver suspensa.
+    """
+    def __init__(self, widget, max_fps=30):
+        super().__init__(widget)
+        self.widget = widget
+        self.suspended = False
+        self.last_frame = 0.0
+        self.frame_times = deque(maxlen=240)  # instantes dos últimos quadros
+        self.paint_times = deque(maxlen=240)  # duração (ms) das últimas pinturas
+        self.set_max_fps(max_fps)
+        
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.request_update)
+    
+    def set_max_fps(self, max_fps):
+        self.min_interval = 1.0 / max_fps if max_fps else 0.0
+    
+    def handle_update_request(self, paint):
+        """Chama `paint()` se o quadro couber no orçamento; caso contrário adia"""
+        window = self.widget.windowHandle()
+        if self.suspended or (window is not None and not window.isExposed()):
+            return True
+        
+        now = time.perf_counter()
+        wait = self.last_frame + self.min_interval - now
+        if wait > 0:
+            if not self.timer.isActive():
+                self.timer.start(int(wait * 1000) + 1)
+            return True
+        
+        self.last_frame = now
+        result = paint()
+        self.paint_times.append((time.perf_counter() - now) * 1000)
+        self.frame_times.append(now)
+        return result
+    
+    def request_update(self):
+        QtCore.QCoreApplication.postEvent(self.widget, QtCore.QEvent(QtCore.QEvent.UpdateRequest))
+    
+    def suspend(self):
+        self.suspended = True
+        self.timer.stop()
+    
+    def resume(self):
+        if self.suspended:
+            self.suspended = False
+            self.request_update()
+    
+    def stats(self):
+        """Quadros pintados no último segundo e tempo médio de pintura (ms)"""
+        now = time.perf_counter()
+        fps = sum(1 for t in self.frame_times if now - t <= 1.0)
+        recent = list(self.paint_times)[-fps:] if fps else []
+        paint_ms = sum(recent) / len(recent) if recent else 0.0
+        return {"fps": fps, "paint_ms": paint_ms}
+
+
+# Lê os contadores do script injetado para as métricas
+PAGE_STATS_SCRIPT = """
+(function() {
+    var state = window.__chatOverlay || {};
+    return {
+        messages: state.messageCount || 0,
+        now: Date.now(),
+        heap: (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0
+    };
+})();
+"""
+
+
+class MetricsExporter:
+    """
+    Exporta as amostras de métricas para um arquivo JSONL com rotação e/ou para
+    um endpoint HTTP local (GET /metrics com a última amostra de cada overlay).
+    """
+    def __init__(self, file_path="", max_bytes=5 * 1024 * 1024, port=0):
+        self.file_path = file_path
+        self.max_bytes = max_bytes
+        self.latest = {}
+        self._lock = threading.Lock()
+        self.server = None
+        if port:
+            self.start_server(port)
+    
+    def publish(self, name, sample):
+        with self._lock:
+            self.latest[name] = sample
+        if self.file_path:
+            self._append(sample)
+    
+    def _append(self, sample):
+        try:
+            if os.path.exists(self.file_path) and os.path.getsize(self.file_path) >= self.max_bytes:
+                os.replace(self.file_path, f"{self.file_path}.1")
+            with open(self.file_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(sample) + "\n")
+        except OSError as e:
+            print(f"Erro ao gravar métricas: {e}")
+    
+    def start_server(self, port):
+        import http.server
+        exporter = self
+        
+        class MetricsHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                with exporter._lock:
+                    body = json.dumps(exporter.latest).encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        try:
+            self.server = http.server.ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+        except OSError as e:
+            print(f"Erro ao iniciar o endpoint de métricas: {e}")
+            return
+        threading.Thread(target=self.server.serve_forever, name="Metrics", daemon=True).start()
+
+
+_metrics_exporter = None
+
+
+def get_metrics_exporter(config):
+    """Retorna o exportador de métricas, compartilhado por todos os overlays"""
+    global _metrics_exporter
+    if _metrics_exporter is None:
+        _metrics_exporter = MetricsExporter(
+            config.get("metrics_file"),
+            config.get("metrics_max_mb") * 1024 * 1024,
+            config.get("metrics_port")
+        )
+    return _metrics_exporter
+
+
+class OverlayMetrics(QtCore.QObject):
+    """
+    Coleta as métricas de um ChatOverlay uma vez por segundo.
+    
+    Só é criada com "metrics_enabled" ligado. Desligada, a janela não mantém
+    nenhum timer, consulta à página ou gravação de métricas.
+    """
+    INTERVAL_MS = 1000
+    
+    updated = QtCore.pyqtSignal(dict)
+    
+    def __init__(self, overlay, exporter, name):
+        super().__init__(overlay)
+        self.overlay = overlay
+        self.exporter = exporter
+        self.name = name
+        self.latest = {}
+        
+        self.page_load_ms = None
+        self.message_rate = 0.0
+        self.bridge_latency_ms = None
+        self.js_heap_mb = None
+        self.native_messages = 0
+        self._load_start = None
+        self._last_count = None
+        self._last_count_time = None
+        
+        self.timer = QtCore.QTimer(self)
+        self.timer.setInterval(self.INTERVAL_MS)
+        self.timer.timeout.connect(self.sample)
+        self.timer.start()
+    
+    def page_load_started(self):
+        self._load_start = time.perf_counter()
+    
+    def page_load_finished(self):
+        if self._load_start is not None:
+            self.page_load_ms = round((time.perf_counter() - self._load_start) * 1000, 1)
+            self._load_start = None
+    
+    def count_messages(self, count):
+        self.native_messages += count
+    
+    def sample(self):
+        overlay = self.overlay
+        if overlay.browser is not None:
+            overlay.browser.page().runJavaScript(PAGE_STATS_SCRIPT, self._on_page_stats)
+        else:
+            self._update_rate(self.native_messages, time.time() * 1000)
+        
+        render = overlay.render_budget.stats()
+        self.latest = {
+            "time": time.time(),
+            "overlay": self.name,
+            "message_rate": round(self.message_rate, 1),
+            "bridge_latency_ms": self.bridge_latency_ms,
+            "page_load_ms": self.page_load_ms,
+            "mode_switch_ms": round(overlay.mode_switch_times[-1], 2) if overlay.mode_switch_times else None,
+            "fps": render["fps"],
+            "paint_ms": round(render["paint_ms"], 2),
+            "renderer_rss_mb": self.renderer_rss_mb(),
+            "js_heap_mb": self.js_heap_mb,
+            "config_writes": overlay.config.write_count,
+            "watchdog_recoveries": overlay.watchdog.recoveries if overlay.watchdog else None,
+        }
+        self.exporter.publish(self.name, self.latest)
+        self.updated.emit(self.latest)
+    
+    def _on_page_stats(self, stats):
+        if not stats:
+            return
+        now_ms = time.time() * 1000
+        self.bridge_latency_ms = round(now_ms - stats["now"], 2)
+        self.js_heap_mb = round(stats["heap"] / (1024 * 1024), 1) if stats.get("heap") else None
+        self._update_rate(stats["messages"], now_ms)
+    
+    def _update_rate(self, count, now_ms):
+        if self._last_count is not None and count >= self._last_count:
+            elapsed = (now_ms - self._last_count_time) / 1000
+            if elapsed > 0:
+                self.message_rate = (count - self._last_count) / elapsed
+        self._last_count = count
+        self._last_count_time = now_ms
+    
+    def renderer_rss_mb(self):
+        """Memória do processo de renderização da página (Qt 5.15+)"""
+        browser = self.overlay.browser
+        if browser is None or not hasattr(browser.page(), "renderProcessPid"):
+            return None
+        pid = browser.page().renderProcessPid()
+        if not pid:
+            return None
+        return round(platform_backend.process_memory(pid) / (1024 * 1024), 1)
+
+
+class MetricsHud(QtWidgets.QLabel):
+    """Painel com as métricas, exibido sobre o chat no modo de edição"""
+    LABELS = (
+        ("message_rate", "Mensagens/s"),
+        ("bridge_latency_ms", "Latência JS→Python (ms)"),
+        ("page_load_ms", "Carregamento (ms)"),
+        ("mode_switch_ms", "Troca de modo (ms)"),
+        ("fps", "Quadros/s"),
+        ("paint_ms", "Pintura (ms)"),
+        ("renderer_rss_mb", "Renderizador (MB)"),
+        ("js_heap_mb", "Heap JS (MB)"),
+        ("config_writes", "Gravações de config."),
+    )
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents, True)
+        self.setStyleSheet(
+            "background-color: rgba(0, 0, 0, 170); color: white; "
+            "font-family: Consolas, monospace; font-size: 10px; padding: 4px;"
+        )
+        self.hide()
+    
+    def update_metrics(self, sample):
+        if not self.isVisible():
+            return
+        lines = []
+        for key, label in self.LABELS:
+            value = sample.get(key)
+            lines.append(f"{label}: {'-' if value is None else value}")
+        self.setText("\n".join(lines))
+        self.adjustSize()
+
+
+class ChatBridge(QtCore.QObject):
+    """
+    Objeto publicado na página pelo QWebChannel.
+    
+    O script injetado envia as mensagens novas em lotes (no máximo um a cada
+    `bridge_flush_ms`), e cada lote é reemitido como uma lista de ChatMessage.
+    """
+    messages_received = QtCore.pyqtSignal(list)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.received_count = 0
+        self.batch_count = 0
+        self.dropped_count = 0  # descartadas pela fila da página
+        self.chat_filter = None
+    
+    @QtCore.pyqtSlot('QVariantList', int)
+    def post_messages(self, records, dropped):
+        messages = []
+        for record in records:
+            if not isinstance(record, dict):
+                continue
+            messages.append(ChatMessage(
+                str(record.get("user", "")),
+                str(record.get("text", "")),
+                record.get("color") or "#ffffff",
+                record.get("time", time.time() * 1000) / 1000
+            ))
+        
+        self.batch_count += 1
+        self.received_count += len(messages)
+        self.dropped_count += dropped
+        if messages:
+            self.messages_received.emit(messages)
+    
+    @QtCore.pyqtSlot('QVariantList', result='QVariantList')
+    def filter_messages(self, records):
+        """Retorna [índice, ações] apenas das mensagens que casaram com alguma regra"""
+        if self.chat_filter is None:
+            return []
+        matches = []
+        for index, record in enumerate(records):
+            if not isinstance(record, dict):
+                continue
+            flags = self.chat_filter.match(str(record.get("user", "")), str(record.get("text", "")))
+            if flags:
+                matches.append([index, flags])
+        return matches
+
+
+# Filtro de mensagens: destaque, ocultação e usuários silenciados
+class ChatFilter:
+    """
+    Compila as regras de filtro de uma vez: as palavras vão para um único
+    autômato de Aho-Corasick e as expressões regulares para uma única
+    expressão por ação, então o custo por mensagem não cresce com o número
+    de regras de palavras. Expressões com grupos ou flags próprias, que
+    mudariam de sentido se fossem unidas às outras, são testadas à parte.
+    
+    Entradas entre barras (`/padrão/`) são expressões regulares; as demais são
+    palavras inteiras. Nenhuma diferencia maiúsculas de minúsculas.
+    """
+    HIGHLIGHT = 1
+    HIDE = 2
+    
+    def __init__(self, highlight=(), hide=(), muted_users=()):
+        self.muted_users = {user.strip().casefold() for user in muted_users or () if user.strip()}
+        
+        words = {}
+        sources = {self.HIGHLIGHT: [], self.HIDE: []}
+        for action, entries in ((self.HIGHLIGHT, highlight), (self.HIDE, hide)):
+            for entry in entries or ():
+                entry = entry.strip()
+                if len(entry) > 2 and entry.startswith("/") and entry.endswith("/"):
+                    sources[action].append(entry[1:-1])
+                elif entry:
+                    word = entry.casefold()
+                    words[word] = words.get(word, 0) | action
+        self.build_automaton(words)
+        
+        self.patterns = {}
+        for action, patterns in sources.items():
+            compiled = self.compile_patterns(patterns)
+            if compiled:
+                self.patterns[action] = compiled
+        
+        self.active = bool(self.muted_users or words or self.patterns)
+        self.hides = bool(
+            self.muted_users or self.HIDE in self.patterns
+            or any(action & self.HIDE for action in words.values())
+        )
+    
+    @staticmethod
+    def compile_patterns(patterns):
+        """
+        Lista de expressões compiladas para uma ação: as simples unidas em uma
+        só e as com grupos (referências como \\1 contam a partir de cada
+        expressão) ou flags próprias como `(?s)` separadas.
+        """
+        plain_flags = re.compile("", re.IGNORECASE).flags
+        simple = []
+        compiled = []
+        for pattern in patterns:
+            try:
+                rule = re.compile(pattern, re.IGNORECASE)
+            except re.error as e:
+                print(f"Erro na expressão do filtro {pattern!r}: {e}")
+                continue
+            if rule.groups or rule.flags != plain_flags:
+                compiled.append(rule)
+            else:
+                simple.append(rule)
+        
+        if len(simple) > 1:
+            try:
+                return [re.compile("|".join(f"(?:{rule.pattern})" for rule in simple), re.IGNORECASE)] + compiled
+            except re.error:
+                pass  # as expressões continuam valendo uma a uma
+        return simple + compiled
+    
+    @classmethod
+    def from_config(cls, config):
+        return cls(
+            config.get("filter_highlight"),
+            config.get("filter_hide"),
+            config.get("filter_muted_users")
+        )
+    
+    def build_automaton(self, words):
+        """Monta a trie das palavras com os links de falha de Aho-Corasick"""
+        goto = [{}]
+        outputs = [()]  # (tamanho, ação) das palavras que terminam em cada nó
+        for word, action in words.items():
+            node = 0
+            for char in word:
+                child = goto[node].get(char)
+                if child is None:
+                    child = len(goto)
+                    goto[node][char] = child
+                    goto.append({})
+                    outputs.append(())
+                node = child
+            outputs[node] = ((len(word), action),)
+        
+        fail = [0] * len(goto)
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                state = fail[node]
+                while state and char not in goto[state]:
+                    state = fail[state]
+                fail[child] = goto[state].get(char, 0)
+                outputs[child] += outputs[fail[child]]
+        
+        self.goto = goto
+        self.fail = fail
+        self.outputs = outputs
+    
+    def match_words(self, text):
+        """Ações das palavras inteiras encontradas no texto (já em casefold)"""
+        goto, fail, outputs = self.goto, self.fail, self.outputs
+        flags = 0
+        node = 0
+        for end, char in enumerate(text, 1):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, action in outputs[node]:
+                if not action & ~flags:
+                    continue
+                start = end - length
+                if (start == 0 or not text[start - 1].isalnum()) and \
+                        (end == len(text) or not text[end].isalnum()):
+                    flags |= action
+                    if flags == self.HIGHLIGHT | self.HIDE:
+                        return flags
+        return flags
+    
+    def match(self, user, text):
+        """Ações (HIGHLIGHT/HIDE) que se aplicam à mensagem, 0 se nenhuma"""
+        if user.casefold() in self.muted_users:
+            return self.HIDE
+        flags = self.match_words(text.casefold()) if len(self.goto) > 1 else 0
+        for action, patterns in self.patterns.items():
+            if not flags & action and any(pattern.search(text) for pattern in patterns):
+                flags |= action
+        return flags
+
+
+_qwebchannel_js = None
+
+
+def qwebchannel_js():
+    """Conteúdo do qwebchannel.js distribuído com o QtWebChannel"""
+    global _qwebchannel_js
+    if _qwebchannel_js is None:
+        qwebchannel_file = QtCore.QFile(":/qtwebchannel/qwebchannel.js")
+        if qwebchannel_file.open(QtCore.QIODevice.ReadOnly):
+            _qwebchannel_js = bytes(qwebchannel_file.readAll()).decode('utf-8')
+            qwebchannel_file.close()
+        else:
+            _qwebchannel_js = ""
+    return _qwebchannel_js
+
+
+WATCHDOG_SCRIPT = """
+(function() {
+    var state = window.__chatOverlay;
+    if (!state) return null;
+    return {
+        now: Date.now(),
+        heartbeat: state.heartbeat || 0,
+        attached: !!(state.target && state.target.isConnected),
+        lastMessage: state.lastMessage || 0
+    };
+})();
+"""
+
+
+class ChatWatchdog(QtCore.QObject):
+    """
+    Verifica periodicamente se a página do chat continua viva e a recupera com
+    a ação mais barata que resolver.
+    
+    A cada `interval_ms` lê o batimento mantido pelo script injetado, se o
+    contêiner de mensagens continua conectado e, com `stall_s`, há quanto
+    tempo não chega mensagem. Em caso de falha tenta, nesta ordem, reinjetar o
+    script, recarregar só o iframe e recarregar a página inteira, com um
+    intervalo entre tentativas que dobra a cada falha e tem variação
+    aleatória. Uma queda do processo de renderização vai direto para a
+    recarga completa, e um carregamento que não termina em `load_timeout_ms`
+    conta como mais uma falha.
+    
+    A recarga completa fica para a página travada ou caída. Um contêiner
+    desconectado com a página viva costuma ser o próprio widget sem chat (a
+    live acabou, o widget foi trocado) e uma recarga não resolve: depois de
+    reinjetar o script e recarregar o iframe, o watchdog só registra o estado
+    e continua verificando.
+    """
+    ACTIONS = ("inject", "iframe", "reload")
+    DETACHED_ACTIONS = ("inject", "iframe")
+    DETACHED = "chat desconectado"
+    LOAD_TIMEOUT_MS = 30000
+    
+    def __init__(self, overlay, interval_ms=5000, stall_s=0, max_backoff_s=300,
+                 load_timeout_ms=LOAD_TIMEOUT_MS):
+        super().__init__(overlay)
+        self.overlay = overlay
+        self.interval_ms = interval_ms
+        self.stall_s = stall_s
+        self.max_backoff_ms = max_backoff_s * 1000
+        self.failures = 0
+        self.failed_since = None
+        self.waiting = False  # aguardando a resposta da última verificação
+        self.loading = False
+        self.detached = False  # desconectado depois de esgotar as DETACHED_ACTIONS
+        self.recoveries = 0
+        self.recovery_times = deque(maxlen=100)  # ms entre a falha e a recuperação
+        
+        self.timer = QtCore.QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self.check)
         
-        current_hotkey_name = self.config.get("hotkey_name", "Control")
-        current_index = self.hotkey_combo.findText(current_hotkey_name)
-        if current_index >= 0:
-            self.hotkey_combo.setCurrentIndex(current_index)
+        self.load_timer = QtCore.QTimer(self)
+        self.load_timer.setSingleShot(True)
+        self.load_timer.setInterval(load_timeout_ms)
+        self.load_timer.timeout.connect(self.on_load_timeout)
         
-        hotkey_layout.addWidget(self.hotkey_combo)
-        layout.addLayout(hotkey_layout)
+        page = overlay.browser.page()
+        page.loadStarted.connect(self.on_load_started)
+        page.loadFinished.connect(self.on_load_finished)
+        page.renderProcessTerminated.connect(self.on_render_process_terminated)
+        self.timer.start(self.interval_ms)
+    
+    def stop(self):
+        self.timer.stop()
+        self.load_timer.stop()
+    
+    def on_load_started(self):
+        self.loading = True
+        self.load_timer.start()
+    
+    def on_load_finished(self, ok):
+        self.loading = False
+        self.load_timer.stop()
+    
+    def on_load_timeout(self):
+        # Sem isso, check() esperaria para sempre por um carregamento travado
+        self.loading = False
+        self.timer.stop()
+        self.waiting = False
+        self.recover("o carregamento não terminou")
+    
+    def check(self):
+        # Oculta, a página pode estar congelada ou descartada de propósito
+        if self.loading or not self.overlay.isVisible():
+            self.timer.start(self.interval_ms)
+            return
+        if self.waiting:
+            self.waiting = False
+            self.recover("a página não respondeu")
+            return
+        self.waiting = True
+        self.overlay.browser.page().runJavaScript(WATCHDOG_SCRIPT, self.on_heartbeat)
+        self.timer.start(self.interval_ms)
+    
+    def on_heartbeat(self, result):
+        self.waiting = False
+        problem = self.diagnose(result)
+        if problem is None:
+            self.healthy()
+        else:
+            self.recover(problem)
+    
+    def diagnose(self, result):
+        """Descrição da falha, ou None se a página estiver saudável"""
+        if not result:
+            return "script ausente"
+        if not result.get("attached"):
+            return self.DETACHED
+        if result["now"] - result["heartbeat"] > self.interval_ms * 2:
+            return "página travada"
+        if self.stall_s and result["now"] - result["lastMessage"] > self.stall_s * 1000:
+            return "sem mensagens"
+        return None
+    
+    def healthy(self):
+        if self.failed_since is not None:
+            self.recovery_times.append((time.perf_counter() - self.failed_since) * 1000)
+            self.recoveries += 1
+            self.failed_since = None
+        self.failures = 0
+        self.detached = False
+    
+    def recover(self, problem, action=None):
+        if self.failed_since is None:
+            self.failed_since = time.perf_counter()
+        if action is None and problem == self.DETACHED and self.failures >= len(self.DETACHED_ACTIONS):
+            if not self.detached:
+                self.detached = True
+                print(f"Chat com problema ({problem}); aguardando o widget sem recarregar a página")
+            self.timer.start(self.interval_ms)
+            return
+        action = action or self.ACTIONS[min(self.failures, len(self.ACTIONS) - 1)]
+        self.failures += 1
+        print(f"Chat com problema ({problem}), tentativa {self.failures}: {action}")
         
-        # Botões
-        buttons = QtWidgets.QDialogButtonBox(
-            QtWidgets.QDialogButtonBox.Ok | QtWidgets.QDialogButtonBox.Cancel
-        )
-        buttons.accepted.connect(self.accept)
-        buttons.rejected.connect(self.reject)
-        layout.addWidget(buttons)
+        # Fora do sinal atual: a página não pode ser recarregada de dentro do
+        # aviso de que o processo de renderização caiu
+        if action == "inject":
+            QtCore.QTimer.singleShot(0, self.overlay.inject_script)
+        elif action == "iframe":
+            QtCore.QTimer.singleShot(0, self.overlay.reload_iframe)
+        else:
+            QtCore.QTimer.singleShot(0, self.overlay.load_embedded_html)
+        self.timer.start(int(self.backoff_ms()))
+    
+    def backoff_ms(self):
+        """Espera até a próxima verificação: dobra a cada falha, com variação de ±50%"""
+        delay = min(self.max_backoff_ms, self.interval_ms * 2 ** (self.failures - 1))
+        return delay * random.uniform(0.5, 1.5)
+    
+    def on_render_process_terminated(self, status, exit_code):
+        page = self.overlay.browser.page()
+        if status == page.NormalTerminationStatus:
+            return
+        self.timer.stop()
+        self.waiting = False
+        self.recover(f"processo de renderização encerrado ({exit_code})", "reload")
+
+
+# Posição da janela em relação aos monitores
+class ScreenInfo:
+    """Área útil (x, y, largura, altura) e DPI de um monitor"""
+    __slots__ = ("id", "geometry", "dpi")
+    
+    def __init__(self, id, geometry, dpi=96.0):
+        self.id = id
+        self.geometry = geometry
+        self.dpi = dpi
+    
+    def __repr__(self):
+        return f"ScreenInfo({self.id!r}, {self.geometry!r}, {self.dpi!r})"
+
+
+class ScreenLayout(QtCore.QObject):
+    """
+    Disposição dos monitores, lida uma vez e atualizada só pelos sinais de
+    mudança do QScreen (monitor adicionado, removido, redimensionado ou com
+    outro DPI). O primeiro monitor da lista é o principal.
+    
+    A posição da janela é guardada como o monitor em que ela está, a fração do
+    espaço livre desse monitor à esquerda e acima dela, o tamanho e o DPI a
+    que esse tamanho corresponde. Assim a janela continua no mesmo canto
+    depois de uma mudança de resolução, mantém o tamanho físico se o DPI mudar
+    e, se o monitor sumir, vai para o principal em vez de ficar fora da tela.
+    """
+    SNAP_DISTANCE = 16  # px
+    
+    changed = QtCore.pyqtSignal()
+    
+    def __init__(self, screens=None, parent=None):
+        """`screens` (lista de ScreenInfo) substitui os monitores reais, para testes"""
+        super().__init__(parent)
+        self.screens = screens or []
+        if screens is None:
+            app = QtGui.QGuiApplication.instance()
+            app.screenAdded.connect(self.on_screen_added)
+            # O monitor removido ainda aparece na lista durante o sinal
+            app.screenRemoved.connect(lambda screen: QtCore.QTimer.singleShot(0, self.refresh))
+            app.primaryScreenChanged.connect(self.refresh)
+            for screen in app.screens():
+                self.watch(screen)
+            self.refresh()
+    
+    def watch(self, screen):
+        screen.availableGeometryChanged.connect(self.refresh)
+        screen.logicalDotsPerInchChanged.connect(self.refresh)
+    
+    def on_screen_added(self, screen):
+        self.watch(screen)
+        self.refresh()
+    
+    def refresh(self, *args):
+        app = QtGui.QGuiApplication.instance()
+        primary = app.primaryScreen()
+        screens = []
+        for screen in [primary] + [s for s in app.screens() if s is not primary]:
+            if screen is None:
+                continue
+            rect = screen.availableGeometry()
+            screens.append(ScreenInfo(
+                screen.serialNumber() or screen.name(),
+                (rect.x(), rect.y(), rect.width(), rect.height()),
+                screen.logicalDotsPerInch()
+            ))
+        if repr(screens) != repr(self.screens):
+            self.screens = screens
+            self.changed.emit()
+    
+    def screen_at(self, rect):
+        """Monitor com a maior área em comum com o retângulo (o principal se nenhum)"""
+        x, y, width, height = rect
+        best, best_area = None, 0
+        for screen in self.screens:
+            sx, sy, sw, sh = screen.geometry
+            overlap_w = min(x + width, sx + sw) - max(x, sx)
+            overlap_h = min(y + height, sy + sh) - max(y, sy)
+            if overlap_w > 0 and overlap_h > 0 and overlap_w * overlap_h > best_area:
+                best, best_area = screen, overlap_w * overlap_h
+        if best is None and self.screens:
+            return self.screens[0]
+        return best
+    
+    def fit(self, rect, screen):
+        """Mantém o retângulo dentro do monitor e o encosta nas bordas próximas"""
+        sx, sy, sw, sh = screen.geometry
+        x, y, width, height = rect
+        width = min(width, sw)
+        height = min(height, sh)
+        x = min(max(x, sx), sx + sw - width)
+        y = min(max(y, sy), sy + sh - height)
         
-        self.setLayout(layout)
+        if x - sx <= self.SNAP_DISTANCE:
+            x = sx
+        elif sx + sw - (x + width) <= self.SNAP_DISTANCE:
+            x = sx + sw - width
+        if y - sy <= self.SNAP_DISTANCE:
+            y = sy
+        elif sy + sh - (y + height) <= self.SNAP_DISTANCE:
+            y = sy + sh - height
+        return (x, y, width, height)
     
-    def accept(self):
-        # Salvar configurações
-        self.config.update({
-            "url": self.url_input.text(),
-            "width": self.width_input.value(),
-            "height": self.height_input.value(),
-            "opacity": self.opacity_slider.value(),
-            "enable_sound": self.sound_checkbox.isChecked(),
-            "sound_url": self.sound_url_input.text(),
-            "hotkey_name": self.hotkey_combo.currentText(),
-            "hotkey": self.hotkeys[self.hotkey_combo.currentText()]
-        })
+    def snap(self, rect):
+        screen = self.screen_at(rect)
+        return self.fit(rect, screen) if screen else rect
+    
+    def to_relative(self, rect):
+        """Posição salva do retângulo: monitor, frações do espaço livre, tamanho e DPI"""
+        screen = self.screen_at(rect)
+        if screen is None:
+            return {}
+        sx, sy, sw, sh = screen.geometry
+        x, y, width, height = rect
+        free_w = sw - width
+        free_h = sh - height
+        return {
+            "screen": screen.id,
+            "x": round((x - sx) / free_w, 4) if free_w > 0 else 0.0,
+            "y": round((y - sy) / free_h, 4) if free_h > 0 else 0.0,
+            "width": width,
+            "height": height,
+            "dpi": screen.dpi,
+        }
+    
+    def place(self, size, saved, fallback_position):
+        """
+        Retângulo (x, y, largura, altura) da janela a partir da posição salva,
+        ou de `fallback_position` em pixels se o monitor salvo não existir.
         
-        # Adicione um log para verificar se as configurações estão corretas
-        print("Salvando configurações:", self.config.config)
+        O tamanho salvo junto com a posição vale para o DPI salvo e é ajustado
+        ao DPI atual do monitor; `size` só é usado quando não há um.
+        """
+        width, height = size
+        screen = None
+        if saved:
+            screen = next((s for s in self.screens if s.id == saved.get("screen")), None)
+        if screen is None:
+            return self.snap((fallback_position[0], fallback_position[1], width, height))
+        
+        if saved.get("width") and saved.get("height"):
+            width, height = saved["width"], saved["height"]
+        scale = screen.dpi / saved["dpi"] if saved.get("dpi") else 1.0
+        width = round(width * scale)
+        height = round(height * scale)
+        sx, sy, sw, sh = screen.geometry
+        x = sx + round(saved.get("x", 0.0) * max(0, sw - width))
+        y = sy + round(saved.get("y", 0.0) * max(0, sh - height))
+        return self.fit((x, y, width, height), screen)
+
+
+_screen_layout = None
+
+
+def get_screen_layout():
+    """Retorna a disposição dos monitores, compartilhada por todos os overlays"""
+    global _screen_layout
+    if _screen_layout is None:
+        _screen_layout = ScreenLayout(parent=QtWidgets.QApplication.instance())
+    return _screen_layout
+
+
+# Com a janela oculta o Chromium atrasa os timers da página e rebaixa o
+# renderizador, o que para o feed do chat enquanto o overlay está na bandeja
+BACKGROUND_CHROMIUM_FLAGS = (
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+)
+
+
+def apply_chromium_flags(config_manager):
+    """
+    Acrescenta as BACKGROUND_CHROMIUM_FLAGS a QTWEBENGINE_CHROMIUM_FLAGS quando
+    algum overlay mantém a página ativa ao ser ocultado. Precisa ser chamada
+    antes de o QtWebEngine iniciar, já que as flags valem para o processo todo.
+    """
+    if not any(config.get("hidden_lifecycle") == "active" for config in config_manager.overlay_configs()):
+        return
+    flags = os.environ.get("QTWEBENGINE_CHROMIUM_FLAGS", "").split()
+    flags += [flag for flag in BACKGROUND_CHROMIUM_FLAGS if flag not in flags]
+    os.environ["QTWEBENGINE_CHROMIUM_FLAGS"] = " ".join(flags)
 
-        if self.config.save_config():
-            super().accept()  # Fecha o diálogo se a configuração for salva com sucesso
-        else:
-            QtWidgets.QMessageBox.warning(self, "Erro", "Não foi possível salvar as configurações.")
+
+def diff_config(old, new):
+    """Retorna o conjunto de chaves cujo valor mudou entre duas configurações"""
+    return {key for key in set(old) | set(new) if old.get(key) != new.get(key)}
 
 
 class ChatOverlay(QtWidgets.QMainWindow):
@@ -228,17 +3261,60 @@ class ChatOverlay(QtWidgets.QMainWindow):
     Permite alternar entre o modo de edição (para reposicionamento da janela)
     e o modo overlay (janela transparente e sem interação com o mouse) ao pressionar a tecla configurada.
     """
-    def __init__(self, config_manager):
+    # Chaves que só exigem reinjetar o script na página
+    SCRIPT_KEYS = {
+        "enable_sound", "sound_url", "sound_cooldown_ms", "sound_max_per_minute", "max_messages",
+        "bridge_flush_ms", "bridge_queue_size", "filter_highlight_color"
+    }
+    # Chaves que exigem recompilar o filtro
+    FILTER_KEYS = {"filter_highlight", "filter_hide", "filter_muted_users"}
+    
+    def __init__(self, config_manager, hotkey_backend=None, tray_icon=None, asset_cache=None):
+        """
+        `hotkey_backend`, `tray_icon` e `asset_cache` são passados pelo
+        OverlayManager para serem compartilhados; sem eles a janela cria os seus.
+        """
         super().__init__()
         
         self.config = config_manager
         self.edit_mode = False
+        self.asset_cache = asset_cache or AssetCache(
+            self.config.get("asset_cache_dir"),
+            self.config.get("asset_cache_max_mb") * 1024 * 1024
+        )
+        
+        # Duração (ms) das últimas trocas de modo
+        self.mode_switch_times = deque(maxlen=100)
+        
+        # Histórico do chat em disco (opcional)
+        self.recorder = get_chat_recorder(self.config) if self.config.get("recorder_enabled") else None
+        
+        # Regras de destaque e ocultação, recompiladas só quando mudam
+        self.chat_filter = ChatFilter.from_config(self.config)
+        
+        # Estágios de processamento das mensagens (opcionais)
+        self.pipeline = None
+        stages = load_pipeline_stages(self.config.get("pipeline_stages"))
+        if stages:
+            self.pipeline = MessagePipeline(stages, self)
+            self.pipeline.results_ready.connect(self.on_pipeline_results)
+        
+        # Limite de quadros por segundo da janela
+        self.render_budget = RenderBudget(self, self.config.get("max_fps"))
+        
+        # Mensagens recebidas com a janela oculta (modo nativo); as mais antigas
+        # seriam descartadas pelo limite de mensagens de qualquer forma
+        self.hidden_messages = deque(maxlen=self.config.get("max_messages") or None)
         
         # Carregar configurações
         self.load_configurations()
         
         # Configurar ícone da aplicação na bandeja do sistema
-        self.setup_tray()
+        self.owns_tray = tray_icon is None
+        if self.owns_tray:
+            self.setup_tray()
+        else:
+            self.tray_icon = tray_icon
         
         # Configurar a janela
         self.setup_window()
@@ -247,13 +3323,39 @@ class ChatOverlay(QtWidgets.QMainWindow):
         self.show()
         self.set_window_extras()
         
-        # Configurar timer para verificar a tecla de atalho
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.check_hotkey)
-        self.timer.start(100)
+        # Configurar a detecção da tecla de atalho
+        self.owns_hotkey_backend = hotkey_backend is None
+        self.hotkey_backend = hotkey_backend or create_hotkey_backend(
+            self.config.get("hotkey_backend"), self.hotkey, self
+        )
+        self.hotkey_backend.pressed.connect(self.switch_to_edit_mode)
+        self.hotkey_backend.released.connect(self.switch_to_overlay_mode)
+        
+        # Métricas (opcionais)
+        self.metrics = None
+        self.hud = None
+        if self.config.get("metrics_enabled"):
+            self.metrics = OverlayMetrics(
+                self, get_metrics_exporter(self.config), getattr(self.config, "name", "overlay")
+            )
+            if self.config.get("metrics_hud"):
+                self.hud = MetricsHud(self)
+                self.hud.move(4, 4)
+                self.metrics.updated.connect(self.hud.update_metrics)
         
         # Conectar eventos
-        self.browser.page().loadFinished.connect(self.on_load_finished)
+        if self.browser:
+            self.browser.page().loadFinished.connect(self.on_load_finished)
+        
+        # Recuperação automática da página do chat
+        self.watchdog = None
+        if self.browser and self.config.get("watchdog_enabled"):
+            self.watchdog = ChatWatchdog(
+                self,
+                self.config.get("watchdog_interval_ms"),
+                self.config.get("watchdog_stall_s"),
+                self.config.get("watchdog_max_backoff_s")
+            )
         
         # Para arrastar a janela
         self.offset = None
@@ -282,53 +3384,154 @@ class ChatOverlay(QtWidgets.QMainWindow):
         self.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)  # Mantenha a transparência
         self.setAttribute(QtCore.Qt.WA_NoSystemBackground, True)
         
-        self.resize(self.width, self.height)
-        self.move(self.position_x, self.position_y)
+        self.restore_geometry()
+        get_screen_layout().changed.connect(self.restore_geometry)
         
         self.setWindowOpacity(self.opacity)  # Aplique a opacidade
         self.setStyleSheet("background-color: transparent;")  # Mantenha a cor de fundo transparente
         
-        # Configurar o navegador
+        if self.config.get("render_mode") == "native":
+            self.setup_native_view()
+        else:
+            self.setup_browser()
+        
+        # Remover fundo
+        self.setStyleSheet("background-color: transparent;")
+    
+    def window_rect(self):
+        geometry = self.geometry()
+        return (geometry.x(), geometry.y(), geometry.width(), geometry.height())
+    
+    def restore_geometry(self):
+        """Posiciona a janela pela posição salva com um único setGeometry, só se algo mudar"""
+        rect = get_screen_layout().place(
+            (self.width, self.height),
+            self.config.get("screen_position"),
+            (self.position_x, self.position_y)
+        )
+        if rect != self.window_rect():
+            self.setGeometry(*rect)
+    
+    def save_geometry(self):
+        """Salva a posição atual, em pixels e em relação ao monitor, com o tamanho"""
+        rect = self.window_rect()
+        self.config.update({
+            "position_x": rect[0],
+            "position_y": rect[1],
+            "screen_position": get_screen_layout().to_relative(rect),
+        })
+    
+    def setup_native_view(self):
+        """Configura a lista nativa de mensagens no lugar do navegador"""
+        self.browser = None
+        self.bridge = None
+        self.chat_view = NativeChatView(self.config.get("max_messages"), self)
+        self.setCentralWidget(self.chat_view)
+        
+        self.chat_source = create_chat_source(self.config, self)
+        if self.chat_source:
+            self.chat_source.messages_received.connect(self.on_messages_received)
+            self.chat_source.start()
+    
+    def on_messages_received(self, messages):
+        """Exibe as mensagens, ou as guarda enquanto a janela estiver oculta"""
+        if self.metrics:
+            self.metrics.count_messages(len(messages))
+        if self.recorder:
+            self.recorder.record(messages)
+        if self.pipeline:
+            self.pipeline.submit(messages)
+        if self.chat_filter.hides:
+            messages = [
+                message for message in messages
+                if not self.chat_filter.match(message.user, message.text) & ChatFilter.HIDE
+            ]
+        if self.isVisible():
+            self.chat_view.add_messages(messages)
+        else:
+            self.hidden_messages.extend(messages)
+    
+    def on_pipeline_results(self, batch):
+        """Entrega a cada estágio os seus resultados, já na thread da interface"""
+        for stage, results in batch:
+            try:
+                stage.on_results(self, results)
+            except Exception as e:
+                print(f"Erro ao aplicar os resultados do estágio {stage.name}: {e}")
+    
+    def setup_browser(self):
+        """Configura o navegador que exibe o widget do Streamlabs"""
+        self.bridge = None
+        
+        # Importado só aqui para não atrasar a inicialização (ex.: diálogo da primeira execução)
+        from PyQt5 import QtWebEngineWidgets
+        
+        self.chat_view = None
+        self.chat_source = None
+        
+        # Configurar o navegador com o perfil persistente
+        self.profile = get_web_profile(self.config)
         self.browser = QtWebEngineWidgets.QWebEngineView(self)
+        self.browser.setPage(QtWebEngineWidgets.QWebEnginePage(self.profile, self.browser))
         self.browser.setAttribute(QtCore.Qt.WA_TranslucentBackground, True)
         self.browser.setStyleSheet("background:transparent;")
         self.browser.page().setBackgroundColor(QtCore.Qt.transparent)
+        # O som de notificação toca sem interação do usuário com a página
+        settings = self.browser.settings()
+        settings.setAttribute(QtWebEngineWidgets.QWebEngineSettings.PlaybackRequiresUserGesture, False)
+        # A página é servida a partir do diretório do cache e lê os arquivos locais
+        settings.setAttribute(QtWebEngineWidgets.QWebEngineSettings.LocalContentCanAccessFileUrls, True)
+        settings.setAttribute(QtWebEngineWidgets.QWebEngineSettings.LocalContentCanAccessRemoteUrls, True)
+        
+        # Ponte com a página (também usada pelo histórico e pelo filtro)
+        if self.bridge_batches() or self.chat_filter.active:
+            self.setup_bridge()
         
         self.setCentralWidget(self.browser)
+    
+    def bridge_batches(self):
+        """Se a página deve enviar todas as mensagens ao Python em lotes"""
+        return bool(self.config.get("bridge_enabled") or self.recorder or self.pipeline)
+    
+    def setup_bridge(self):
+        """Publica o ChatBridge na página; ele chega ao script na próxima navegação"""
+        from PyQt5 import QtWebChannel
         
-        # Remover fundo
-        self.setStyleSheet("background-color: transparent;")
+        self.bridge = ChatBridge(self)
+        self.bridge.chat_filter = self.chat_filter
+        self.channel = QtWebChannel.QWebChannel(self.browser.page())
+        self.channel.registerObject("chatBridge", self.bridge)
+        self.browser.page().setWebChannel(self.channel)
+        if self.recorder:
+            self.bridge.messages_received.connect(self.recorder.record)
+        if self.pipeline:
+            self.bridge.messages_received.connect(self.pipeline.submit)
     
     def setup_tray(self):
         """Configura o ícone na bandeja do sistema e seu menu"""
-        self.tray_icon = QtWidgets.QSystemTrayIcon(self)
-        
-        # Criar ícone padrão se não tiver um personalizado
-        icon = QtGui.QIcon()
-        pixmap = QtGui.QPixmap(16, 16)
-        pixmap.fill(QtGui.QColor(0, 120, 215))
-        icon.addPixmap(pixmap)
-        self.tray_icon.setIcon(icon)
+        self.tray_icon = create_tray_icon(self)
         
         # Menu
         tray_menu = QtWidgets.QMenu()
-        
-        open_config_action = tray_menu.addAction("Configurações")
-        open_config_action.triggered.connect(self.open_config_dialog)
-        
-        toggle_visibility = tray_menu.addAction("Mostrar/Ocultar")
-        toggle_visibility.triggered.connect(self.toggle_visibility)
-        
-        reload_action = tray_menu.addAction("Recarregar Chat")
-        reload_action.triggered.connect(self.reload_chat)
+        self.add_menu_actions(tray_menu)
         
         exit_action = tray_menu.addAction("Sair")
         exit_action.triggered.connect(self.close_application)
         
         self.tray_icon.setContextMenu(tray_menu)
-        self.tray_icon.setToolTip("Chat Overlay")
         self.tray_icon.show()
     
+    def add_menu_actions(self, menu):
+        """Adiciona ao menu as ações específicas desta janela"""
+        open_config_action = menu.addAction("Configurações")
+        open_config_action.triggered.connect(self.open_config_dialog)
+        
+        toggle_visibility = menu.addAction("Mostrar/Ocultar")
+        toggle_visibility.triggered.connect(self.toggle_visibility)
+        
+        reload_action = menu.addAction("Recarregar Chat")
+        reload_action.triggered.connect(self.reload_chat)
+    
     def toggle_visibility(self):
         """Alterna a visibilidade da janela"""
         if self.isVisible():
@@ -337,52 +3540,182 @@ class ChatOverlay(QtWidgets.QMainWindow):
             self.show()
             self.activateWindow()
     
+    def event(self, event):
+        if event.type() == QtCore.QEvent.UpdateRequest and hasattr(self, "render_budget"):
+            return self.render_budget.handle_update_request(lambda: super(ChatOverlay, self).event(event))
+        return super().event(event)
+    
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.render_budget.resume()
+        self.set_page_lifecycle("active")
+        self.set_page_hidden(False)
+        
+        # Exibir de uma vez o que chegou enquanto a janela estava oculta
+        if self.hidden_messages:
+            self.chat_view.add_messages(list(self.hidden_messages))
+            self.hidden_messages.clear()
+    
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.render_budget.suspend()
+        self.set_page_hidden(True)
+        # A página só pode ser congelada depois que a view estiver oculta
+        QtCore.QTimer.singleShot(0, lambda: self.set_page_lifecycle(self.config.get("hidden_lifecycle")))
+    
+    def set_page_hidden(self, hidden):
+        """Avisa o script injetado que a janela foi ocultada ou exibida"""
+        if self.browser is None:
+            return
+        self.browser.page().runJavaScript(
+            f"window.__chatOverlay && window.__chatOverlay.setHidden({'true' if hidden else 'false'});"
+        )
+    
+    def set_page_lifecycle(self, state):
+        """Aplica o estado de ciclo de vida (active, frozen, discarded) à página"""
+        if self.browser is None:
+            return
+        page = self.browser.page()
+        if not hasattr(page, "setLifecycleState"):  # Qt < 5.14
+            return
+        states = {
+            "active": page.LifecycleState.Active,
+            "frozen": page.LifecycleState.Frozen,
+            "discarded": page.LifecycleState.Discarded,
+        }
+        lifecycle = states.get(state, page.LifecycleState.Active)
+        if lifecycle != page.LifecycleState.Active and self.isVisible():
+            return
+        if page.lifecycleState() != lifecycle:
+            page.setLifecycleState(lifecycle)
+    
     def reload_chat(self):
         """Recarrega o chat"""
         self.load_embedded_html()
     
+    def reload_iframe(self):
+        """Recarrega só o iframe do chat; o script se reconecta quando ele carregar"""
+        if self.browser is None:
+            return
+        self.browser.page().runJavaScript(
+            "var frame = document.getElementById('chatFrame'); if (frame) { frame.src = frame.src; }"
+        )
+    
     def close_application(self):
         """Fecha a aplicação completamente"""
-        # Salvar posição atual
-        self.config.set("position_x", self.x())
-        self.config.set("position_y", self.y())
+        self.shutdown()
         self.config.save_config()
         
         # Fechar a aplicação
         QtWidgets.QApplication.quit()
     
+    def shutdown(self):
+        """Salva a posição atual e para o que esta janela mantém em execução"""
+        self.save_geometry()
+        
+        if self.owns_hotkey_backend:
+            self.hotkey_backend.stop()
+        if self.chat_source:
+            self.chat_source.stop()
+        if self.recorder:
+            self.recorder.close()
+        if self.watchdog:
+            self.watchdog.stop()
+        if self.pipeline:
+            self.pipeline.stop()
+        self.asset_cache.flush()
+    
     def open_config_dialog(self):
         """Abre o diálogo de configuração"""
+        previous_config = dict(self.config.config)
         dialog = ConfigDialog(self.config, self)
         if dialog.exec_() == QtWidgets.QDialog.Accepted:
-            # Recarregar configurações
-            self.url = self.config.get("url")
-            self.width = self.config.get("width")
-            self.height = self.config.get("height")
-            self.opacity = self.config.get("opacity") / 100
-            self.enable_sound = self.config.get("enable_sound")
-            self.sound_url = self.config.get("sound_url")
-            self.hotkey = self.config.get("hotkey")
-            
-            # Aplicar mudanças
-            self.resize(self.width, self.height)
-            self.setWindowOpacity(self.opacity)
-            self.reload_chat()
+            self.apply_config_changes(diff_config(previous_config, self.config.config))
+    
+    def apply_config_changes(self, changed):
+        """
+        Aplica as chaves alteradas sem recarregar a página quando possível.
+        
+        Retorna a ação executada na página: "reload" (nova navegação),
+        "inject" (apenas o script foi reinjetado) ou None.
+        """
+        self.load_configurations()
+        
+        if changed & {"width", "height"}:
+            # O novo tamanho vale para o DPI do monitor atual e passa a ser o salvo
+            x, y = self.window_rect()[:2]
+            self.setGeometry(*get_screen_layout().snap((x, y, self.width, self.height)))
+            self.save_geometry()
+        if "opacity" in changed and not self.edit_mode:
+            self.apply_opacity(self.opacity)
+        if "hotkey" in changed:
+            self.hotkey_backend.set_key(self.hotkey)
+        if "max_fps" in changed:
+            self.render_budget.set_max_fps(self.config.get("max_fps"))
+        if "max_messages" in changed:
+            max_messages = self.config.get("max_messages")
+            self.hidden_messages = deque(self.hidden_messages, maxlen=max_messages or None)
+            if self.chat_view:
+                self.chat_view.chat_model.max_messages = max_messages
+        
+        if changed & self.FILTER_KEYS:
+            self.chat_filter = ChatFilter.from_config(self.config)
+            if self.bridge:
+                self.bridge.chat_filter = self.chat_filter
+        
+        if self.browser is None:
+            # Modo nativo: não há página para recarregar nem script para injetar
+            return None
+        
+        reload_page = "url" in changed
+        if changed & self.FILTER_KEYS and not self.bridge and self.chat_filter.active:
+            self.setup_bridge()
+            reload_page = True
+        
+        if reload_page:
+            # on_load_finished reinjeta o script após a navegação
+            self.load_embedded_html()
+            return "reload"
+        if changed & (self.SCRIPT_KEYS | self.FILTER_KEYS):
+            self.inject_script()
+            return "inject"
+        return None
     
     def set_window_extras(self):
         """Aplica propriedades avançadas da janela"""
-        hwnd = self.winId().__int__()
+        self.set_click_through(True)
         
-        ex_style = GetWindowLong(hwnd, GWL_EXSTYLE)
+        # Aplicar opacidade
+        self.apply_opacity(self.opacity)
+    
+    def set_click_through(self, enabled):
+        """
+        Liga ou desliga WS_EX_TRANSPARENT na janela nativa existente.
+        
+        Os demais estilos estendidos são reaplicados caso tenham sido perdidos,
+        e SetWindowLong só é chamado quando algo realmente muda.
+        """
+        hwnd = self.winId().__int__()
         
-        ex_style |= WS_EX_LAYERED | WS_EX_TRANSPARENT | WS_EX_TOOLWINDOW | WS_EX_NOACTIVATE
-        SetWindowLong(hwnd, GWL_EXSTYLE, ex_style)
+        ex_style = platform_backend.get_window_long(hwnd, GWL_EXSTYLE)
+        new_style = ex_style | WS_EX_LAYERED | WS_EX_TOOLWINDOW | WS_EX_NOACTIVATE
+        if enabled:
+            new_style |= WS_EX_TRANSPARENT
+        else:
+            new_style &= ~WS_EX_TRANSPARENT
         
-        # Aplicar opacidade
-        SetLayeredWindowAttributes(hwnd, 0, int(255 * self.opacity), 0x02)
+        if new_style != ex_style:
+            platform_backend.set_window_long(hwnd, GWL_EXSTYLE, new_style)
+    
+    def apply_opacity(self, opacity):
+        """Aplica a opacidade (0.0-1.0) à janela"""
+        self.setWindowOpacity(opacity)
+        platform_backend.set_layered_window_attributes(self.winId().__int__(), 0, int(255 * opacity), 0x02)
 
     def load_embedded_html(self):
         """Carrega o HTML com o iframe do chat incorporado"""
+        if self.browser is None:
+            return
         
         html = f"""
         <!DOCTYPE html>
@@ -415,114 +3748,91 @@ class ChatOverlay(QtWidgets.QMainWindow):
         </body>
         </html>
         """
-        self.browser.setHtml(html, QtCore.QUrl(""))
+        if self.metrics:
+            self.metrics.page_load_started()
+        base_url = QtCore.QUrl.fromLocalFile(os.path.abspath(self.asset_cache.cache_dir) + os.sep)
+        self.browser.setHtml(html, base_url)
 
     def switch_to_edit_mode(self):
         """Ativa o modo de edição, permitindo interação com a janela"""
         if self.edit_mode:
             return  
 
+        start = time.perf_counter()
         self.edit_mode = True
 
-        # Permitir interação com o mouse
+        # Permitir interação com o mouse, sem recriar a janela nativa
         self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents, False)
-
-        # Mudar flags da janela
-        self.setWindowFlags(
-            QtCore.Qt.WindowStaysOnTopHint |
-            QtCore.Qt.Window |  
-            QtCore.Qt.Tool
-        )
+        self.set_click_through(False)
 
         # Aumentar a opacidade para melhor visualização
-        self.setWindowOpacity(1.0)
+        self.apply_opacity(1.0)
 
-        # Manter fundo transparente
-        self.setStyleSheet("background-color: transparent;")
+        self.record_mode_switch("edição", start)
 
-        # Reexibir com as novas configurações
-        self.show()
+        if self.hud:
+            self.hud.show()
+            self.hud.raise_()
+            self.hud.update_metrics(self.metrics.latest)
 
     def switch_to_overlay_mode(self):
         """Retorna ao modo overlay, com transparência e sem interação com o mouse"""
         if not self.edit_mode:
             return  
 
+        start = time.perf_counter()
         self.edit_mode = False
 
         # Desabilitar interação com o mouse
         self.setAttribute(QtCore.Qt.WA_TransparentForMouseEvents, True)
-
-        # Restaurar flags da janela
-        self.setWindowFlags(
-            QtCore.Qt.WindowStaysOnTopHint |
-            QtCore.Qt.FramelessWindowHint |
-            QtCore.Qt.Tool
-        )
+        self.set_click_through(True)
 
         # Restaurar opacidade configurada
-        self.setWindowOpacity(self.opacity)
+        self.apply_opacity(self.opacity)
 
-        # Reexibir com as novas configurações
-        self.show()
+        self.record_mode_switch("overlay", start)
 
-    def check_hotkey(self):
-        """
-        Verifica se a tecla configurada está pressionada e alterna entre o modo de edição
-        e o modo overlay.
-        """
-        is_key_pressed = bool(GetAsyncKeyState(self.hotkey) & 0x8000)
-        if is_key_pressed and not self.edit_mode:
-            self.switch_to_edit_mode()
-        elif not is_key_pressed and self.edit_mode:
-            self.switch_to_overlay_mode()
+        if self.hud:
+            self.hud.hide()
+
+    def record_mode_switch(self, mode, start):
+        """Registra a duração da troca de modo e avisa se passar de um quadro"""
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self.mode_switch_times.append(elapsed_ms)
+        if elapsed_ms > FRAME_BUDGET_MS:
+            print(f"Troca para o modo {mode} levou {elapsed_ms:.1f} ms")
 
     def on_load_finished(self):
         """Executado quando o carregamento do HTML é concluído"""
-        
-        # Só adiciona o som se estiver habilitado
-        if not self.enable_sound:
+        if self.metrics:
+            self.metrics.page_load_finished()
+        self.inject_script()
+
+    def script_options(self):
+        """Opções repassadas ao script injetado na página"""
+        return {
+            "enableSound": self.enable_sound,
+            "soundUrl": self.asset_cache.resolve(self.sound_url) if self.enable_sound else None,
+            "soundCooldownMs": self.config.get("sound_cooldown_ms"),
+            "soundMaxPerMinute": self.config.get("sound_max_per_minute"),
+            "maxMessages": self.config.get("max_messages"),
+            "bridge": self.bridge is not None,
+            "bridgeBatches": self.bridge_batches(),
+            "bridgeFlushMs": self.config.get("bridge_flush_ms"),
+            "bridgeQueueSize": self.config.get("bridge_queue_size"),
+            "filter": self.chat_filter.active,
+            "filterHide": self.chat_filter.hides,
+            "highlightColor": self.config.get("filter_highlight_color"),
+            "watchdog": self.watchdog is not None,
+        }
+
+    def inject_script(self):
+        """Injeta (ou reinjeta) o script de notificação sem recarregar a página"""
+        if self.browser is None:
             return
-        
-        js = f"""
-        (function() {{
-            // Aguardar o iframe carregar
-            var iframe = document.getElementById('chatFrame');
-            if (!iframe) return;
-
-            iframe.onload = function() {{
-                try {{
-                    var iframeDoc = iframe.contentDocument || iframe.contentWindow.document;
-
-                    // Adicionar elemento de áudio
-                    var audio = iframeDoc.createElement('audio');
-                    audio.src = '{self.sound_url}';
-                    audio.id = 'notificationSound';
-                    iframeDoc.body.appendChild(audio);
-
-                    // Configurar MutationObserver
-                    var observer = new MutationObserver(function(mutations) {{
-                        mutations.forEach(function(mutation) {{
-                            if (mutation.addedNodes.length) {{
-                                var sound = iframeDoc.getElementById('notificationSound');
-                                if (sound) {{
-                                    sound.play();
-                                }}
-                            }}
-                        }});
-                    }});
-
-                    // Observar mudanças no contêiner de mensagens
-                    var target = iframeDoc.getElementById('log');
-                    if (target) {{
-                        observer.observe(target, {{ childList: true }});
-                    }}
-                }} catch (e) {{
-                    console.log('Erro ao acessar o conteúdo do iframe:', e);
-                }}
-            }};
-        }})();
-        """
+        js = OVERLAY_SCRIPT.replace("__OPTIONS__", json.dumps(self.script_options()))
+        if self.bridge is not None:
+            js = f"if (typeof QWebChannel === 'undefined') {{\n{qwebchannel_js()}\n}}\n{js}"
         self.browser.page().runJavaScript(js)
 
     def mousePressEvent(self, event):
@@ -542,10 +3852,13 @@ class ChatOverlay(QtWidgets.QMainWindow):
             return
         self.offset = None
         
-        # Salvar a nova posição
-        self.config.set("position_x", self.x())
-        self.config.set("position_y", self.y())
-        self.config.save_config()
+        # Manter dentro do monitor e encostar nas bordas próximas
+        rect = get_screen_layout().snap(self.window_rect())
+        if rect != self.window_rect():
+            self.setGeometry(*rect)
+        
+        # Salvar a nova posição (gravada em segundo plano)
+        self.save_geometry()
 
     def closeEvent(self, event):
         """Intercepta o evento de fechamento para minimizar para a bandeja do sistema"""
@@ -565,13 +3878,122 @@ class ChatOverlay(QtWidgets.QMainWindow):
             self.close_notification_shown = True
 
 
+def create_tray_icon(parent):
+    """Cria o ícone da bandeja do sistema"""
+    tray_icon = QtWidgets.QSystemTrayIcon(parent)
+    
+    # Criar ícone padrão se não tiver um personalizado
+    icon = QtGui.QIcon()
+    pixmap = QtGui.QPixmap(16, 16)
+    pixmap.fill(QtGui.QColor(0, 120, 215))
+    icon.addPixmap(pixmap)
+    tray_icon.setIcon(icon)
+    tray_icon.setToolTip("Chat Overlay")
+    return tray_icon
+
+
+class OverlayManager(QtCore.QObject):
+    """
+    Mantém várias janelas ChatOverlay no mesmo processo.
+    
+    Todas compartilham a QApplication, o perfil do QtWebEngine, o backend da
+    tecla de atalho, o cache de arquivos e um único ícone na bandeja, onde
+    cada overlay tem seu próprio submenu.
+    """
+    def __init__(self, config_manager, parent=None):
+        super().__init__(parent)
+        self.config = config_manager
+        
+        self.hotkey_backend = create_hotkey_backend(
+            self.config.get("hotkey_backend"), self.config.get("hotkey"), self
+        )
+        self.asset_cache = AssetCache(
+            self.config.get("asset_cache_dir"),
+            self.config.get("asset_cache_max_mb") * 1024 * 1024
+        )
+        self.tray_icon = create_tray_icon(self)
+        
+        self.overlays = [
+            ChatOverlay(
+                overlay_config,
+                hotkey_backend=self.hotkey_backend,
+                tray_icon=self.tray_icon,
+                asset_cache=self.asset_cache
+            )
+            for overlay_config in self.config.overlay_configs()
+        ]
+        self.setup_tray_menu()
+    
+    def setup_tray_menu(self):
+        self.tray_menu = QtWidgets.QMenu()
+        if len(self.overlays) == 1:
+            self.overlays[0].add_menu_actions(self.tray_menu)
+        else:
+            for overlay in self.overlays:
+                submenu = self.tray_menu.addMenu(overlay.config.name)
+                overlay.add_menu_actions(submenu)
+        
+        exit_action = self.tray_menu.addAction("Sair")
+        exit_action.triggered.connect(self.close_application)
+        
+        self.tray_icon.setContextMenu(self.tray_menu)
+        self.tray_icon.show()
+    
+    def close_application(self):
+        """Fecha todos os overlays e a aplicação"""
+        for overlay in self.overlays:
+            overlay.shutdown()
+        self.hotkey_backend.stop()
+        self.config.save_config()
+        
+        QtWidgets.QApplication.quit()
+
+
 def main():
-    app = QtWidgets.QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(False)  # Permite que o app continue rodando com janelas fechadas
+    # Estágios com processes=True usam processos filhos, que no executável
+    # do PyInstaller precisam passar por aqui antes de qualquer outra coisa
+    import multiprocessing
+    multiprocessing.freeze_support()
+    
+    parser = argparse.ArgumentParser(description="Chat Overlay")
+    parser.add_argument("--replay", metavar="LOG",
+                        help="em vez de abrir o overlay, reproduz um log de chat como servidor local")
+    parser.add_argument("--port", type=int, default=9000, help="porta do servidor de reprodução")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="velocidade da reprodução (0 = o mais rápido possível)")
+    parser.add_argument("--history", action="store_true",
+                        help="em vez de abrir o overlay, imprime o histórico gravado (um JSON por linha)")
+    parser.add_argument("--user", help="filtra o histórico por usuário")
+    parser.add_argument("--since", type=float, help="timestamp inicial do histórico")
+    parser.add_argument("--until", type=float, help="timestamp final do histórico")
+    args, qt_args = parser.parse_known_args()
+    
+    if args.replay:
+        ChatReplayServer(args.replay, port=args.port, speed=args.speed).run()
+        return
+    
+    if args.history:
+        # Só consulta: o overlay pode estar gravando no último segmento agora mesmo
+        recorder = ChatRecorder(ConfigManager().get("recorder_dir"), recover=False)
+        for message in recorder.query(args.since, args.until, args.user):
+            print(json.dumps(message.to_record(), ensure_ascii=False))
+        return
     
     # Carregar configurações
     config_manager = ConfigManager()
     
+    # Esquemas de URL próprios e flags do Chromium precisam vir antes da QApplication
+    if config_manager.get("image_cache_enabled"):
+        register_image_scheme()
+    apply_chromium_flags(config_manager)
+    
+    # Permite importar o QtWebEngine depois de criar a QApplication
+    QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    app.setQuitOnLastWindowClosed(False)  # Permite que o app continue rodando com janelas fechadas
+    
+    app.aboutToQuit.connect(config_manager.save_config)
+    
     # Verificar se é a primeira execução
     if not os.path.exists(config_manager.config_file):
         # Exibir diálogo de configuração
@@ -579,8 +4001,8 @@ def main():
         if dialog.exec_() != QtWidgets.QDialog.Accepted:
             sys.exit("Configuração cancelada. Encerrando o programa.")
     
-    # Criar e exibir o overlay
-    overlay = ChatOverlay(config_manager)
+    # Criar e exibir os overlays
+    manager = OverlayManager(config_manager)
     sys.exit(app.exec_())
 
 
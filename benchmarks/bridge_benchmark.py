@@ -0,0 +1,118 @@
+import sys
+import argparse
+import json
+import os
+import time
+from PyQt5 import QtCore, QtWidgets, QtWebChannel
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chat import ChatBridge
+
+
+class LoopbackTransport(QtWebChannel.QWebChannelAbstractTransport):
+    """
+    Transporte do QWebChannel dentro do próprio processo, no lugar do
+    qt.webChannelTransport da página: recebe o texto JSON que o qwebchannel.js
+    enviaria, decodifica como o transporte do QtWebEngine faz e entrega ao canal.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.replies = 0
+        self._next_id = 0
+    
+    def sendMessage(self, message):
+        self.replies += 1
+    
+    def send_text(self, text):
+        document = QtCore.QJsonDocument.fromJson(text.encode('utf-8'))
+        self.messageReceived.emit(document.object(), self)
+    
+    def invoke(self, object_name, method, args):
+        """Chama `method` do objeto publicado, como o `chatBridge.post_messages(...)` da página"""
+        self._next_id += 1
+        self.send_text(json.dumps({
+            "type": 6, "object": object_name, "method": method, "args": args, "id": self._next_id
+        }))
+
+
+def connect_bridge(bridge):
+    """Publica o `bridge` num QWebChannel ligado a um LoopbackTransport já inicializado"""
+    channel = QtWebChannel.QWebChannel(bridge)
+    channel.registerObject("chatBridge", bridge)
+    transport = LoopbackTransport(bridge)
+    channel.connectTo(transport)
+    transport.send_text(json.dumps({"type": 3, "id": 0}))  # init, como o qwebchannel.js
+    return transport
+
+
+def chat_records(count):
+    return [
+        {"user": f"usuario{i % 50}", "text": f"Mensagem de teste {i}", "color": "#1e90ff", "time": 1000000.0 + i}
+        for i in range(count)
+    ]
+
+
+def measure(app, bridge, post, records, batch_size):
+    """Envia `records` em lotes de `batch_size` por `post` e mede até todos chegarem"""
+    expected = bridge.received_count + len(records)
+    start = time.perf_counter()
+    for index in range(0, len(records), batch_size):
+        post(records[index:index + batch_size])
+    while bridge.received_count < expected:
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    return {
+        "messages_per_s": round(len(records) / elapsed),
+        "us_per_message": round(elapsed * 1e6 / len(records), 2),
+    }
+
+
+def run_bridge_benchmark(args):
+    """
+    Mede as mensagens por segundo que passam pelo ChatBridge.post_messages,
+    uma chamada por mensagem contra chamadas em lote. "direct" chama o slot
+    em Python; "channel" passa pelo QWebChannel, com a decodificação do JSON
+    e a conversão dos argumentos que cada chamada da página custa.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication(sys.argv[:1])
+    
+    bridge = ChatBridge()
+    bridge.messages_received.connect(lambda messages: None)
+    transport = connect_bridge(bridge)
+    paths = {
+        "direct": lambda batch: bridge.post_messages(batch, 0),
+        "channel": lambda batch: transport.invoke("chatBridge", "post_messages", [batch, 0]),
+    }
+    
+    records = chat_records(args.messages)
+    report = {"messages": args.messages}
+    for name, post in paths.items():
+        measure(app, bridge, post, records[:1000], 50)  # aquecimento
+        results = {}
+        for batch_size in args.batch_sizes:
+            results[f"batch_{batch_size}"] = measure(app, bridge, post, records, batch_size)
+        per_message = results.get("batch_1")
+        if per_message:
+            for batch_size in args.batch_sizes:
+                batched = results[f"batch_{batch_size}"]
+                batched["speedup"] = round(batched["messages_per_s"] / per_message["messages_per_s"], 1)
+        report[name] = results
+    
+    print(json.dumps(report, indent=4))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o ChatBridge.post_messages com uma chamada por mensagem e em lotes")
+    parser.add_argument("--messages", type=int, default=20000, help="mensagens enviadas em cada medição")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 50, 200],
+                        help="mensagens por chamada (1 = uma chamada por mensagem)")
+    args = parser.parse_args()
+    sys.exit(run_bridge_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import sys
+import argparse
+import json
+import os
+import random
+import re
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chat import ChatFilter
+
+
+def make_rules(count, regex_share, rng):
+    """`count` regras divididas entre destaque e ocultação, parte delas expressões regulares"""
+    highlight, hide = [], []
+    for i in range(count):
+        if rng.random() < regex_share:
+            rule = f"/regra{i}\\d+/" if i % 4 else f"/(regra{i})-\\1/"  # algumas com grupos
+        else:
+            rule = f"palavra{i}"
+        (highlight if i % 2 else hide).append(rule)
+    return highlight, hide
+
+
+def make_messages(count, rule_count, match_share, rng):
+    """Mensagens de chat; `match_share` delas contém uma palavra de alguma regra"""
+    filler = "oi tudo bem com vocês hoje a live está muito boa parabéns pelo conteúdo".split()
+    messages = []
+    for i in range(count):
+        words = rng.sample(filler, 8)
+        if rng.random() < match_share:
+            words.insert(rng.randrange(len(words)), f"palavra{rng.randrange(rule_count)}")
+        messages.append((f"usuario{i % 500}", " ".join(words)))
+    return messages
+
+
+def time_per_message(match, messages, repeat):
+    """Melhor tempo (µs) por mensagem entre `repeat` passadas pelo corpus"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for user, text in messages:
+            match(user, text)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best * 1e6 / len(messages), 2)
+
+
+def naive_filter(highlight, hide):
+    """Uma expressão por regra, testadas uma a uma, para comparação"""
+    rules = []
+    for action, entries in ((ChatFilter.HIGHLIGHT, highlight), (ChatFilter.HIDE, hide)):
+        for entry in entries:
+            if entry.startswith("/") and entry.endswith("/"):
+                rules.append((re.compile(entry[1:-1], re.IGNORECASE), action))
+            else:
+                rules.append((re.compile(rf"\b{re.escape(entry)}\b", re.IGNORECASE), action))
+    
+    def match(user, text):
+        flags = 0
+        for rule, action in rules:
+            if rule.search(text):
+                flags |= action
+        return flags
+    return match
+
+
+def run_filter_benchmark(args):
+    """
+    Mede o ChatFilter.match com 10 a 10.000 regras: o custo por mensagem não
+    deveria crescer com o número de palavras. Para comparação, mede também
+    uma regra por expressão testada em sequência, numa amostra menor.
+    """
+    rng = random.Random(1)
+    report = []
+    for count in args.rules:
+        highlight, hide = make_rules(count, args.regex_share, rng)
+        messages = make_messages(args.messages, count, args.match_share, rng)
+        
+        start = time.perf_counter()
+        chat_filter = ChatFilter(highlight, hide)
+        build_ms = (time.perf_counter() - start) * 1000
+        
+        matched = sum(1 for user, text in messages if chat_filter.match(user, text))
+        result = {
+            "rules": count,
+            "build_ms": round(build_ms, 2),
+            "us_per_message": time_per_message(chat_filter.match, messages, args.repeat),
+            "matched_share": round(matched / len(messages), 3),
+        }
+        if not args.skip_naive:
+            sample = messages[:max(1, args.messages * 10 // count)]
+            result["naive_us_per_message"] = time_per_message(naive_filter(highlight, hide), sample, 1)
+        report.append(result)
+    
+    print(json.dumps(report, indent=4))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede o ChatFilter.match com números crescentes de regras")
+    parser.add_argument("--rules", type=int, nargs="+", default=[10, 100, 1000, 10000],
+                        help="números de regras a medir")
+    parser.add_argument("--messages", type=int, default=5000, help="mensagens no corpus")
+    parser.add_argument("--regex-share", type=float, default=0.1, help="fração das regras que são expressões")
+    parser.add_argument("--match-share", type=float, default=0.1, help="fração das mensagens que casam")
+    parser.add_argument("--repeat", type=int, default=3, help="passadas pelo corpus (vale a melhor)")
+    parser.add_argument("--skip-naive", action="store_true", help="não mede a comparação ingênua")
+    args = parser.parse_args()
+    sys.exit(run_filter_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import sys
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from PyQt5 import QtCore, QtWidgets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Chat
+from Chat import (
+    VK_CONTROL, WM_KEYDOWN, WM_KEYUP, ChatOverlay, ConfigManager, FakeHotkeyBackend, FakePlatform,
+    HookHotkeyBackend, PollingHotkeyBackend
+)
+
+
+class TimerCounter(QtCore.QObject):
+    """Conta os eventos de timer entregues pela aplicação, isto é, os despertares do laço"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.count = 0
+    
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Timer:
+            self.count += 1
+        return False
+
+
+def idle(app, seconds):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        app.processEvents(QtCore.QEventLoop.AllEvents, 10)
+        time.sleep(0.001)
+
+
+def wait_for(app, predicate, timeout=2.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            return False
+        app.processEvents(QtCore.QEventLoop.AllEvents)
+    return True
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * fraction))], 3) if values else None
+
+
+def create_backend(name):
+    """
+    Backend e as funções que simulam apertar e soltar a tecla. O hook é
+    simulado chamando o próprio callback, como o Windows faria.
+    """
+    if name == "polling":
+        backend = PollingHotkeyBackend(VK_CONTROL)
+        backend.start()
+        keys = Chat.platform_backend.key_states
+        return backend, lambda: keys.__setitem__(VK_CONTROL, True), lambda: keys.__setitem__(VK_CONTROL, False)
+    if name == "hook":
+        backend = HookHotkeyBackend(VK_CONTROL)
+        return (backend, lambda: backend._hook_proc(0, WM_KEYDOWN, VK_CONTROL),
+                lambda: backend._hook_proc(0, WM_KEYUP, VK_CONTROL))
+    backend = FakeHotkeyBackend(VK_CONTROL)
+    return backend, backend.press, backend.release
+
+
+def measure_backend(app, config, name, idle_seconds, presses):
+    counter = TimerCounter()
+    app.installEventFilter(counter)
+    
+    backend, press, release = create_backend(name)
+    overlay = ChatOverlay(config, hotkey_backend=backend)
+    idle(app, 0.2)
+    
+    # Sem teclas pressionadas: tudo o que acordar o laço de eventos
+    counter.count = 0
+    idle(app, idle_seconds)
+    wakeups = counter.count / idle_seconds
+    
+    latencies = []
+    for _ in range(presses):
+        for action, mode in ((press, True), (release, False)):
+            # Fase aleatória em relação ao timer de consulta
+            idle(app, random.uniform(0, 0.1))
+            start = time.perf_counter()
+            action()
+            if wait_for(app, lambda: overlay.edit_mode == mode):
+                latencies.append((time.perf_counter() - start) * 1000)
+    
+    app.removeEventFilter(counter)
+    backend.stop()
+    overlay.shutdown()
+    overlay.deleteLater()
+    return {
+        "backend": name,
+        "idle_wakeups_per_s": round(wakeups, 1),
+        "switch_ms_median": percentile(latencies, 0.5),
+        "switch_ms_p95": percentile(latencies, 0.95),
+        "switch_ms_max": percentile(latencies, 1.0),
+        "switches": len(latencies),
+    }
+
+
+def run_hotkey_benchmark(args):
+    """
+    Mede, para cada backend de tecla de atalho, os despertares por segundo com
+    o app ocioso e o tempo entre a tecla e a troca de modo do overlay.
+    """
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication(sys.argv[:1])
+    # As chamadas ao sistema são simuladas, para comparar só o custo de cada backend
+    Chat.platform_backend = FakePlatform()
+    
+    report = []
+    with tempfile.TemporaryDirectory() as work_dir:
+        config = ConfigManager(os.path.join(work_dir, "config.json"))
+        config.update({
+            "render_mode": "native",
+            "hotkey": VK_CONTROL,
+            "asset_cache_dir": os.path.join(work_dir, "asset_cache"),
+            "recorder_dir": os.path.join(work_dir, "chat_history"),
+        })
+        
+        # Despertares sem backend nenhum, descontados dos demais
+        counter = TimerCounter()
+        app.installEventFilter(counter)
+        idle(app, args.idle)
+        app.removeEventFilter(counter)
+        report.append({"backend": "none", "idle_wakeups_per_s": round(counter.count / args.idle, 1)})
+        
+        for name in args.backends:
+            report.append(measure_backend(app, config, name, args.idle, args.presses))
+        config.save_config()
+    
+    print(json.dumps(report, indent=4))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara os backends de tecla de atalho: despertares ociosos e latência da troca de modo")
+    parser.add_argument("--idle", type=float, default=5, help="segundos de medição com o app ocioso")
+    parser.add_argument("--presses", type=int, default=50, help="quantas vezes apertar e soltar a tecla")
+    parser.add_argument("--backends", nargs="+", default=["polling", "hook", "fake"],
+                        choices=["polling", "hook", "fake"], help="backends a comparar")
+    args = parser.parse_args()
+    sys.exit(run_hotkey_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import sys
+import argparse
+import json
+import os
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos que só as funções opcionais usam e que o Chat importa sob demanda:
+# carregá-los na importação atrasa a partida de todo mundo
+LAZY_MODULES = {
+    "asyncio",
+    "concurrent.futures",
+    "http.server",
+    "multiprocessing",
+    "urllib.request",
+}
+
+
+def import_times(python=sys.executable):
+    """
+    Importa o Chat num processo novo com `-X importtime` e devolve
+    {módulo: (tempo próprio, tempo acumulado)}, em microssegundos
+    """
+    process = subprocess.run(
+        [python, "-X", "importtime", "-c", "import Chat"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True, check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # cabeçalho
+        times[fields[2].strip()] = (int(fields[0]), int(fields[1]))
+    return times
+
+
+def run_import_benchmark(args):
+    """Mede a importação do Chat e falha se ficar lenta ou carregar módulos opcionais"""
+    runs = [import_times() for _ in range(args.runs)]
+    totals = sorted(times["Chat"][1] / 1000 for times in runs)
+    times = runs[-1]
+    lazy_loaded = sorted(LAZY_MODULES & times.keys())
+    slowest = sorted(times.items(), key=lambda item: item[1][0], reverse=True)[:args.top]
+    report = {
+        "import_ms_median": round(totals[len(totals) // 2], 1),
+        "import_ms_min": round(totals[0], 1),
+        "modules": len(times),
+        "slowest_self_ms": {name: round(self_us / 1000, 1) for name, (self_us, _) in slowest},
+        "lazy_modules_loaded": lazy_loaded,
+    }
+    print(json.dumps(report, indent=4))
+    
+    failed = False
+    if lazy_loaded:
+        print(f"Regressão: módulos opcionais importados com o Chat: {', '.join(lazy_loaded)}")
+        failed = True
+    if report["import_ms_median"] > args.max_ms:
+        print(f"Regressão: importação levou {report['import_ms_median']} ms (limite {args.max_ms} ms)")
+        failed = True
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede a importação do Chat com -X importtime e acusa regressões")
+    parser.add_argument("--runs", type=int, default=5, help="importações medidas (vale a mediana)")
+    parser.add_argument("--max-ms", type=float, default=200, help="tempo máximo aceito para importar o Chat")
+    parser.add_argument("--top", type=int, default=10, help="módulos mais lentos listados")
+    args = parser.parse_args()
+    sys.exit(run_import_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import sys
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+from PyQt5 import QtCore, QtWidgets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chat import OverlayManager, platform_backend
+from overlay_benchmark import BenchmarkWidgetServer, benchmark_config
+
+
+class OverlayManagerRun(QtCore.QObject):
+    """
+    Abre `count` overlays num único OverlayManager e, depois de as páginas
+    carregarem e o processo assentar, mede o RSS do próprio processo e dos
+    processos de renderização das páginas.
+    """
+    LOAD_TIMEOUT_MS = 30000
+    
+    finished = QtCore.pyqtSignal(dict)
+    
+    def __init__(self, config, count, mode, url, settle, parent=None):
+        super().__init__(parent)
+        self.settle = settle
+        self.measured = False
+        options = {"render_mode": mode, "hotkey_backend": "fake", "enable_sound": False, "url": url}
+        if mode == "native":
+            options.update({"chat_source": "synthetic", "synthetic_rate": 10})
+        config.update(options)
+        # Um perfil por overlay, em posições diferentes da tela
+        config.update({"overlays": [
+            {"name": f"Overlay {i + 1}", "x": 100 + 40 * i, "y": 100 + 40 * i} for i in range(count)
+        ]})
+        
+        self.manager = OverlayManager(config)
+        self.pending = set()
+        if mode != "native":
+            for overlay in self.manager.overlays:
+                page = overlay.browser.page()
+                self.pending.add(page)
+                page.loadFinished.connect(lambda ok, page=page: self.on_load_finished(page))
+            QtCore.QTimer.singleShot(self.LOAD_TIMEOUT_MS, self.measure)
+        if not self.pending:
+            QtCore.QTimer.singleShot(int(self.settle * 1000), self.measure)
+    
+    def on_load_finished(self, page):
+        if page in self.pending:
+            self.pending.discard(page)
+            if not self.pending:
+                QtCore.QTimer.singleShot(int(self.settle * 1000), self.measure)
+    
+    def measure(self):
+        if self.measured:
+            return
+        self.measured = True
+        
+        pids = {os.getpid()}
+        for overlay in self.manager.overlays:
+            page = overlay.browser.page() if getattr(overlay, "browser", None) else None
+            pid = page.renderProcessPid() if page is not None and hasattr(page, "renderProcessPid") else 0
+            if pid:
+                pids.add(pid)
+        results = {
+            "overlays": len(self.manager.overlays),
+            "rss_bytes": {str(pid): platform_backend.process_memory(pid) for pid in sorted(pids)},
+        }
+        if self.pending:
+            results["error"] = "nem todas as páginas carregaram"
+        
+        for overlay in self.manager.overlays:
+            overlay.shutdown()
+        self.manager.hotkey_backend.stop()
+        self.finished.emit(results)
+
+
+def run_child(args, qt_args):
+    """Um processo com `args.count` overlays; imprime o RSS medido em JSON"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    results = {}
+    
+    def on_finished(run_results):
+        results.update(run_results)
+        app.quit()
+    
+    run = OverlayManagerRun(benchmark_config(args.work_dir), args.count, args.mode, args.url, args.settle)
+    run.finished.connect(on_finished)
+    app.exec_()
+    print(json.dumps(results))
+    return 2 if "error" in results else 0
+
+
+def run_processes(counts, args, url, work_dir, qt_args):
+    """
+    Roda ao mesmo tempo um processo por item de `counts`, cada um com esse
+    número de overlays e seu próprio perfil, e soma o RSS informado por eles
+    """
+    processes = []
+    for index, count in enumerate(counts):
+        child_dir = os.path.join(work_dir, f"process{index}")
+        os.makedirs(child_dir)
+        processes.append(subprocess.Popen(
+            [sys.executable, os.path.abspath(__file__), "--child", "--count", str(count),
+             "--mode", args.mode, "--url", url, "--settle", str(args.settle),
+             "--work-dir", child_dir] + qt_args,
+            stdout=subprocess.PIPE, universal_newlines=True,
+        ))
+    
+    summary = {"processes": len(processes), "overlays": sum(counts), "rss_mb": 0.0, "process_rss_mb": []}
+    for process in processes:
+        output, _ = process.communicate()
+        lines = output.strip().splitlines()
+        try:
+            results = json.loads(lines[-1])
+        except (IndexError, ValueError):
+            results = {"error": f"o processo terminou com o código {process.returncode}"}
+        if "error" in results:
+            summary["error"] = results["error"]
+        rss_mb = sum(results.get("rss_bytes", {}).values()) / (1024 * 1024)
+        summary["process_rss_mb"].append(round(rss_mb, 1))
+        summary["rss_mb"] += rss_mb
+    summary["rss_mb"] = round(summary["rss_mb"], 1)
+    return summary
+
+
+def run_multi_overlay_benchmark(args, qt_args):
+    """
+    Compara N overlays num único OverlayManager com N processos de um overlay
+    cada, pelo RSS total (processo do overlay mais os de renderização)
+    """
+    server = BenchmarkWidgetServer(args.rate)
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            shared = run_processes([args.count], args, server.url, os.path.join(work_dir, "shared"), qt_args)
+            separate = run_processes([1] * args.count, args, server.url, os.path.join(work_dir, "separate"), qt_args)
+    finally:
+        server.stop()
+    
+    report = {"mode": args.mode, "count": args.count, "shared": shared, "separate": separate}
+    if "error" not in shared and "error" not in separate:
+        report["saving_mb"] = round(separate["rss_mb"] - shared["rss_mb"], 1)
+    print(json.dumps(report, indent=4))
+    return 2 if "error" in shared or "error" in separate else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara o RSS total de N overlays num processo com N processos de um overlay")
+    parser.add_argument("--count", type=int, default=3, help="número de overlays")
+    parser.add_argument("--mode", default="web", choices=["native", "web"], help="modo de renderização")
+    parser.add_argument("--rate", type=float, default=20, help="mensagens por segundo do widget local")
+    parser.add_argument("--settle", type=float, default=5, help="espera (s) após carregar, antes de medir")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args, qt_args = parser.parse_known_args()
+    if args.child:
+        sys.exit(run_child(args, qt_args))
+    sys.exit(run_multi_overlay_benchmark(args, qt_args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,440 @@
+import time
+
+# Medido antes de importar o Chat, para que o tempo de inicialização inclua a importação
+start_time = time.perf_counter()
+
+import sys
+import argparse
+import http.server
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from PyQt5 import QtCore, QtWidgets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chat import ChatOverlay, ConfigManager, PAGE_STATS_SCRIPT, apply_chromium_flags, platform_backend
+
+
+# Medição de desempenho sem Windows nem Streamlabs
+class BenchmarkWidgetServer:
+    """
+    Servidor local que imita o widget de chat: a página tem o mesmo `#log` do
+    Streamlabs e acrescenta mensagens a uma taxa fixa (mensagens por segundo).
+    
+    Como no widget real, o código fica num script à parte (`widget.js`),
+    grande e servido com cache longo, enquanto a página é revalidada a cada
+    carga. `bundle_delay` simula a rede até o CDN, e `requests` conta os
+    pedidos por caminho, para saber o que veio do cache do perfil.
+    """
+    PAGE = """<!DOCTYPE html>
+<html>
+<body>
+<div id="log"></div>
+<script src="widget.js"></script>
+</body>
+</html>
+"""
+    SCRIPT = """var rate = __RATE__;
+var log = document.getElementById('log');
+var colors = ['#ff7f50', '#9acd32', '#1e90ff', '#ff69b4', '#daa520'];
+var count = 0;
+var due = 0;
+setInterval(function() {
+    due += rate / 20;
+    for (; due >= 1; due--) {
+        count++;
+        var line = document.createElement('div');
+        var name = document.createElement('span');
+        name.className = 'name';
+        name.style.color = colors[count % colors.length];
+        name.textContent = 'usuario' + (count % 50);
+        var message = document.createElement('span');
+        message.className = 'message';
+        message.textContent = 'Mensagem de teste ' + count;
+        line.appendChild(name);
+        line.appendChild(message);
+        log.appendChild(line);
+    }
+}, 50);
+"""
+    BUNDLE_SIZE = 512 * 1024  # tamanho aproximado do bundle do widget real
+    
+    def __init__(self, rate, bundle_delay=0.0):
+        page = self.PAGE.encode('utf-8')
+        script = self.SCRIPT.replace("__RATE__", json.dumps(rate)).encode('utf-8')
+        script += b"/*" + b" " * max(0, self.BUNDLE_SIZE - len(script) - 4) + b"*/"
+        requests = self.requests = {}
+        
+        class WidgetHandler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?")[0]
+                requests[path] = requests.get(path, 0) + 1
+                if path == "/widget.js":
+                    time.sleep(bundle_delay)
+                    body, content_type, cache = script, "application/javascript", "public, max-age=86400"
+                else:
+                    body, content_type, cache = page, "text/html; charset=utf-8", "no-cache"
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("Cache-Control", cache)
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), WidgetHandler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/"
+        threading.Thread(target=self.server.serve_forever, name="BenchmarkWidget", daemon=True).start()
+    
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class OverlayBenchmark(QtCore.QObject):
+    """
+    Mede um ChatOverlay na plataforma offscreen do Qt, com o FakePlatform, o
+    backend de tecla falso e o BenchmarkWidgetServer no lugar do Streamlabs.
+    
+    Emite `finished` com o tempo de inicialização, o carregamento da página, a
+    CPU do processo de renderização por mensagem, o crescimento da memória
+    durante a medição e a duração das trocas de modo.
+    """
+    WARMUP_MS = 1000
+    LOAD_TIMEOUT_MS = 30000
+    MODE_SWITCHES = 50
+    
+    finished = QtCore.pyqtSignal(dict)
+    
+    def __init__(self, config, rate, duration, start_time, parent=None):
+        super().__init__(parent)
+        self.duration = duration
+        self.loaded = False
+        self.done = False
+        self.cpu_start = 0.0
+        self.cpu_seconds = None
+        self.memory_start = 0
+        self.messages_start = 0
+        self.results = {"rate": rate, "duration_s": duration}
+        
+        self.server = BenchmarkWidgetServer(rate)
+        config.update({
+            "url": self.server.url,
+            "render_mode": "web",
+            "hotkey_backend": "fake",
+            "enable_sound": False,
+            "metrics_enabled": True,
+            "metrics_hud": False,
+        })
+        
+        self.overlay = ChatOverlay(config)
+        self.results["startup_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+        self.overlay.browser.page().loadFinished.connect(self.on_load_finished)
+        QtCore.QTimer.singleShot(self.LOAD_TIMEOUT_MS, self.on_timeout)
+    
+    def renderer_pid(self):
+        page = self.overlay.browser.page()
+        return page.renderProcessPid() if hasattr(page, "renderProcessPid") else 0
+    
+    def on_load_finished(self, ok):
+        if self.loaded:
+            return
+        self.loaded = True
+        self.results["page_load_ms"] = self.overlay.metrics.page_load_ms
+        QtCore.QTimer.singleShot(self.WARMUP_MS, self.start_measuring)
+    
+    def on_timeout(self):
+        if not self.loaded:
+            self.results["error"] = "a página não carregou"
+            self.finish()
+    
+    def start_measuring(self):
+        pid = self.renderer_pid()
+        if pid:
+            self.cpu_start = platform_backend.process_cpu_time(pid)
+            self.memory_start = platform_backend.process_memory(pid)
+        self.overlay.browser.page().runJavaScript(PAGE_STATS_SCRIPT, self.on_start_stats)
+        QtCore.QTimer.singleShot(int(self.duration * 1000), self.stop_measuring)
+    
+    def on_start_stats(self, stats):
+        self.messages_start = stats["messages"] if stats else 0
+    
+    def stop_measuring(self):
+        pid = self.renderer_pid()
+        if pid:
+            self.cpu_seconds = platform_backend.process_cpu_time(pid) - self.cpu_start
+            memory = platform_backend.process_memory(pid)
+            self.results["renderer_rss_mb"] = round(memory / (1024 * 1024), 1)
+            self.results["memory_growth_mb"] = round((memory - self.memory_start) / (1024 * 1024), 1)
+        self.overlay.browser.page().runJavaScript(PAGE_STATS_SCRIPT, self.on_stop_stats)
+    
+    def on_stop_stats(self, stats):
+        messages = (stats["messages"] if stats else 0) - self.messages_start
+        self.results["messages"] = messages
+        if messages and self.cpu_seconds is not None:
+            self.results["renderer_cpu_ms_per_message"] = round(self.cpu_seconds * 1000 / messages, 3)
+        self.measure_mode_switches()
+    
+    def measure_mode_switches(self):
+        backend = self.overlay.hotkey_backend
+        self.overlay.mode_switch_times.clear()
+        for _ in range(self.MODE_SWITCHES):
+            backend.press()
+            backend.release()
+        
+        times = sorted(self.overlay.mode_switch_times)
+        if times:
+            self.results["mode_switch_ms_median"] = round(times[len(times) // 2], 3)
+            self.results["mode_switch_ms_p95"] = round(times[min(len(times) - 1, int(len(times) * 0.95))], 3)
+        self.finish()
+    
+    def finish(self):
+        if self.done:
+            return
+        self.done = True
+        self.overlay.shutdown()
+        self.server.stop()
+        self.finished.emit(self.results)
+
+
+class FirstPaintBenchmark(QtCore.QObject):
+    """
+    Mede o tempo até a primeira mensagem aparecer no overlay: do início do
+    processo (antes de importar o Chat) até a página ter uma linha no `#log`.
+    Inclui iniciar o QtWebEngine, abrir o perfil, carregar a página e o bundle
+    do widget, que é o que o cache do perfil pode encurtar.
+    """
+    POLL_MS = 10
+    LOAD_TIMEOUT_MS = 30000
+    
+    finished = QtCore.pyqtSignal(dict)
+    
+    def __init__(self, config, url, start_time, parent=None):
+        super().__init__(parent)
+        self.start_time = start_time
+        self.done = False
+        self.results = {}
+        config.update({
+            "url": url,
+            "render_mode": "web",
+            "hotkey_backend": "fake",
+            "enable_sound": False,
+            "metrics_enabled": True,
+            "metrics_hud": False,
+        })
+        
+        self.overlay = ChatOverlay(config)
+        self.results["startup_ms"] = round((time.perf_counter() - start_time) * 1000, 1)
+        self.overlay.browser.page().loadFinished.connect(self.on_load_finished)
+        QtCore.QTimer.singleShot(self.LOAD_TIMEOUT_MS, self.on_timeout)
+    
+    def on_load_finished(self, ok):
+        if "page_load_ms" in self.results:
+            return
+        self.results["page_load_ms"] = self.overlay.metrics.page_load_ms
+        self.poll()
+    
+    def poll(self):
+        if not self.done:
+            self.overlay.browser.page().runJavaScript(PAGE_STATS_SCRIPT, self.on_stats)
+    
+    def on_stats(self, stats):
+        if self.done:
+            return
+        if stats and stats["messages"]:
+            self.results["first_paint_ms"] = round((time.perf_counter() - self.start_time) * 1000, 1)
+            self.finish()
+        else:
+            QtCore.QTimer.singleShot(self.POLL_MS, self.poll)
+    
+    def on_timeout(self):
+        if "first_paint_ms" not in self.results:
+            self.results["error"] = "nenhuma mensagem apareceu na página"
+            self.finish()
+    
+    def finish(self):
+        if self.done:
+            return
+        self.done = True
+        self.overlay.shutdown()
+        self.finished.emit(self.results)
+
+
+# Folga de cada métrica antes de considerar uma regressão: tolerância
+# relativa sobre a linha de base mais este valor absoluto
+BENCHMARK_SLACK = {
+    "startup_ms": 50,
+    "page_load_ms": 50,
+    "renderer_cpu_ms_per_message": 0.05,
+    "memory_growth_mb": 2,
+    "mode_switch_ms_median": 0.5,
+    "mode_switch_ms_p95": 1,
+}
+
+
+def compare_benchmark(results, baseline, tolerance):
+    """Lista as métricas que pioraram além da tolerância em relação à linha de base"""
+    regressions = []
+    for key, slack in BENCHMARK_SLACK.items():
+        value = results.get(key)
+        reference = baseline.get(key)
+        if value is None or reference is None:
+            continue
+        limit = max(reference, 0) * (1 + tolerance) + slack
+        if value > limit:
+            regressions.append(f"{key}: {value} (linha de base {reference}, limite {limit:.3f})")
+    return regressions
+
+
+def benchmark_config(work_dir):
+    """Configuração com perfil, caches e histórico dentro de `work_dir`"""
+    config = ConfigManager(os.path.join(work_dir, "config.json"))
+    config.update({
+        "asset_cache_dir": os.path.join(work_dir, "asset_cache"),
+        "image_cache_dir": os.path.join(work_dir, "image_cache"),
+        "web_profile_name": "ChatOverlayBenchmark",
+        "web_profile_dir": os.path.join(work_dir, "web_profile"),
+        "recorder_dir": os.path.join(work_dir, "chat_history"),
+    })
+    # Lidas quando o QtWebEngine inicia, na criação do primeiro overlay
+    apply_chromium_flags(config)
+    return config
+
+
+def create_app(qt_args):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
+    return QtWidgets.QApplication(sys.argv[:1] + qt_args)
+
+
+def run_benchmark(args, start_time, qt_args):
+    """Roda o OverlayBenchmark e compara com a linha de base; retorna o código de saída"""
+    app = create_app(qt_args)
+    
+    results = {}
+    
+    def on_finished(benchmark_results):
+        results.update(benchmark_results)
+        app.quit()
+    
+    # Configuração, perfil e caches descartáveis, para medir sempre a partir do zero
+    with tempfile.TemporaryDirectory() as work_dir:
+        config = benchmark_config(work_dir)
+        benchmark = OverlayBenchmark(config, args.rate, args.duration, start_time)
+        benchmark.finished.connect(on_finished)
+        app.exec_()
+        config.save_config()
+    
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+    if "error" in results:
+        return 2
+    
+    if not os.path.exists(args.baseline):
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+        print(f"Linha de base gravada em {args.baseline}")
+        return 0
+    
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_benchmark(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"Regressão: {regression}")
+    return 1 if regressions else 0
+
+
+def run_first_paint(args, start_time, qt_args):
+    """
+    Uma única partida do overlay com o perfil em `args.work_dir`, rodada num
+    processo próprio pelo run_startup_benchmark; imprime o resultado em JSON
+    """
+    app = create_app(qt_args)
+    results = {}
+    
+    def on_finished(benchmark_results):
+        results.update(benchmark_results)
+        app.quit()
+    
+    config = benchmark_config(args.work_dir)
+    benchmark = FirstPaintBenchmark(config, args.url, start_time)
+    benchmark.finished.connect(on_finished)
+    app.exec_()
+    config.save_config()
+    print(json.dumps(results))
+    return 2 if "error" in results else 0
+
+
+def run_startup_benchmark(args, qt_args):
+    """
+    Mede o tempo até a primeira mensagem numa partida a frio (perfil vazio) e
+    numa partida a quente, que reaproveita o mesmo `web_profile_dir` e portanto
+    o cache HTTP, os cookies e o cache de scripts do perfil. Cada partida roda
+    num processo novo, como o usuário abrindo o overlay de novo.
+    """
+    server = BenchmarkWidgetServer(args.rate, args.bundle_delay)
+    results = {"rate": args.rate, "bundle_delay_s": args.bundle_delay}
+    try:
+        with tempfile.TemporaryDirectory() as work_dir:
+            for run in ("cold", "warm"):
+                requests_before = server.requests.get("/widget.js", 0)
+                process = subprocess.run(
+                    [sys.executable, os.path.abspath(__file__), "--first-paint",
+                     "--url", server.url, "--work-dir", work_dir] + qt_args,
+                    stdout=subprocess.PIPE, universal_newlines=True,
+                )
+                lines = process.stdout.strip().splitlines()
+                try:
+                    run_results = json.loads(lines[-1])
+                except (IndexError, ValueError):
+                    run_results = {"error": f"a partida terminou com o código {process.returncode}"}
+                run_results["bundle_requests"] = server.requests.get("/widget.js", 0) - requests_before
+                results[run] = run_results
+    finally:
+        server.stop()
+    
+    cold, warm = results["cold"], results["warm"]
+    if "first_paint_ms" in cold and "first_paint_ms" in warm:
+        results["warm_saving_ms"] = round(cold["first_paint_ms"] - warm["first_paint_ms"], 1)
+    
+    print(json.dumps(results, indent=4))
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=4)
+    return 2 if "error" in cold or "error" in warm else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o overlay sem janela contra um widget local e compara com a linha de base")
+    parser.add_argument("--rate", type=float, default=20, help="mensagens por segundo do widget local")
+    parser.add_argument("--duration", type=float, default=30, help="duração da medição, em segundos")
+    parser.add_argument("--baseline", default="benchmark_baseline.json",
+                        help="linha de base do benchmark (criada se não existir)")
+    parser.add_argument("--output", help="arquivo JSON para o resultado do benchmark")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="piora relativa aceita antes de acusar uma regressão")
+    parser.add_argument("--startup", action="store_true",
+                        help="mede a primeira mensagem numa partida a frio e numa a quente, em vez do regime")
+    parser.add_argument("--bundle-delay", type=float, default=0.2,
+                        help="atraso (s) ao servir o bundle do widget, para simular a rede (--startup)")
+    parser.add_argument("--first-paint", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--work-dir", help=argparse.SUPPRESS)
+    args, qt_args = parser.parse_known_args()
+    if args.first_paint:
+        sys.exit(run_first_paint(args, start_time, qt_args))
+    if args.startup:
+        sys.exit(run_startup_benchmark(args, qt_args))
+    sys.exit(run_benchmark(args, start_time, qt_args))
+
+
+if __name__ == "__main__":
+    main()
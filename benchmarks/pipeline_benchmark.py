@@ -0,0 +1,92 @@
+import sys
+import argparse
+import json
+import os
+import time
+from PyQt5 import QtCore
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chat import MessagePipeline, PipelineStage, SyntheticChatSource
+
+
+class BusyStage(PipelineStage):
+    """Estágio que só gasta CPU, usado para medir o MessagePipeline"""
+    name = "busy"
+    processes = True
+    work = 20000
+    
+    def process(self, messages):
+        return [sum(i * i for i in range(self.work)) for _ in messages]
+
+
+def run_pipeline_benchmark(args):
+    """
+    Envia mensagens sintéticas a taxas crescentes por um BusyStage e mede o
+    atraso da thread da interface com um timer de 10 ms.
+    """
+    app = QtCore.QCoreApplication(sys.argv[:1])
+    rates = [50, 200, 1000, 5000]
+    step_ms = int(max(1.0, args.duration / len(rates)) * 1000)
+    tick_ms = 10
+    
+    pipeline = MessagePipeline([BusyStage()])
+    source = SyntheticChatSource(rates[0])
+    source.messages_received.connect(pipeline.submit)
+    
+    step = {"index": 0, "delays": [], "results": 0, "last_tick": time.perf_counter()}
+    report = []
+    
+    def on_results(batch):
+        step["results"] += sum(len(results) for _, results in batch)
+    
+    def on_tick():
+        now = time.perf_counter()
+        step["delays"].append(max(0.0, (now - step["last_tick"]) * 1000 - tick_ms))
+        step["last_tick"] = now
+    
+    def next_step():
+        delays = sorted(step["delays"])
+        stats = pipeline.stats()["busy"]
+        report.append({
+            "rate": source.rate,
+            "gui_delay_ms_p50": round(delays[len(delays) // 2], 2) if delays else None,
+            "gui_delay_ms_p95": round(delays[int(len(delays) * 0.95)], 2) if delays else None,
+            "gui_delay_ms_max": round(delays[-1], 2) if delays else None,
+            "results": step["results"],
+            "dropped": stats["dropped"],
+        })
+        step["index"] += 1
+        if step["index"] >= len(rates):
+            source.stop()
+            pipeline.stop()
+            app.quit()
+            return
+        source.rate = rates[step["index"]]
+        step["delays"] = []
+        step["results"] = 0
+        QtCore.QTimer.singleShot(step_ms, next_step)
+    
+    pipeline.results_ready.connect(on_results)
+    ticker = QtCore.QTimer()
+    ticker.setInterval(tick_ms)
+    ticker.timeout.connect(on_tick)
+    ticker.start()
+    source.start()
+    QtCore.QTimer.singleShot(step_ms, next_step)
+    app.exec_()
+    
+    print(json.dumps(report, indent=4))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede o atraso da interface com o pipeline de mensagens sob carga crescente")
+    parser.add_argument("--duration", type=float, default=30, help="duração da medição, em segundos")
+    args = parser.parse_args()
+    sys.exit(run_pipeline_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import sys
+import argparse
+import json
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chat import ChatMessage, ChatRecorder
+
+
+def directory_size(directory):
+    return sum(entry.stat().st_size for entry in os.scandir(directory) if entry.is_file())
+
+
+def measure_query(recorder, repeat, **options):
+    """Mediana do tempo (ms) de `repeat` consultas iguais e o número de mensagens devolvidas"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = recorder.query(**options)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return {"ms_median": round(times[len(times) // 2], 2), "ms_max": round(times[-1], 2), "results": len(results)}
+
+
+def run_recorder_benchmark(args):
+    """
+    Grava um histórico sintético com milhões de mensagens (uma taxa de chat
+    fixa, `--users` usuários comuns e um usuário raro) e mede a vazão da
+    gravação e a latência das consultas típicas sobre ele, com o histórico
+    aberto só para consulta, como no `--history`.
+    """
+    rate = 100  # mensagens por segundo de chat simulado
+    base = 1700000000.0
+    rare_every = 100000  # o usuário raro aparece uma vez a cada tantas mensagens
+    
+    def message(i):
+        user = "raro" if i % rare_every == 0 else f"usuario{i % args.users}"
+        return ChatMessage(user, f"Mensagem de teste número {i}", "#1e90ff", base + i / rate)
+    
+    report = {"messages": args.messages}
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = ChatRecorder(directory, args.segment_messages, args.commit_ms / 1000)
+        start = time.perf_counter()
+        for first in range(0, args.messages, args.chunk):
+            recorder.record([message(i) for i in range(first, min(first + args.chunk, args.messages))])
+            # Não deixa a fila passar de um segmento se a gravação ficar para trás
+            while first - recorder.written_count > args.segment_messages:
+                time.sleep(0.005)
+        recorder.close()
+        write_s = time.perf_counter() - start
+        
+        disk_bytes = directory_size(directory)
+        report.update({
+            "write_s": round(write_s, 2),
+            "write_messages_per_s": round(args.messages / write_s),
+            "commits": recorder.commit_count,
+            "segments": len(recorder.segment_ids()),
+            "disk_mb": round(disk_bytes / (1024 * 1024), 1),
+            "disk_bytes_per_message": round(disk_bytes / args.messages, 1),
+        })
+        
+        start = time.perf_counter()
+        reader = ChatRecorder(directory, recover=False)
+        report["open_ms"] = round((time.perf_counter() - start) * 1000, 2)
+        
+        end = base + args.messages / rate
+        middle = base + args.messages / rate / 2
+        report["queries"] = {
+            "last_minute": measure_query(reader, args.repeat, start=end - 60),
+            "minute_in_the_middle": measure_query(reader, args.repeat, start=middle, end=middle + 60),
+            "rare_user": measure_query(reader, args.repeat, user="raro"),
+            "common_user_first_100": measure_query(reader, args.repeat, user="usuario1", limit=100),
+            "first_100": measure_query(reader, args.repeat, limit=100),
+        }
+    
+    print(json.dumps(report, indent=4))
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Mede a gravação e as consultas do ChatRecorder num histórico com milhões de mensagens")
+    parser.add_argument("--messages", type=int, default=2000000, help="mensagens gravadas")
+    parser.add_argument("--users", type=int, default=5000, help="usuários comuns distintos")
+    parser.add_argument("--chunk", type=int, default=1000, help="mensagens por chamada de record()")
+    parser.add_argument("--segment-messages", type=int, default=100000, help="mensagens por segmento")
+    parser.add_argument("--commit-ms", type=float, default=500, help="intervalo da gravação em grupo")
+    parser.add_argument("--repeat", type=int, default=5, help="repetições de cada consulta")
+    args = parser.parse_args()
+    sys.exit(run_recorder_benchmark(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+import sys
+import argparse
+import json
+import os
+import subprocess
+import tempfile
+from PyQt5 import QtCore, QtWidgets
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Chat import ChatOverlay, PAGE_STATS_SCRIPT, platform_backend
+from overlay_benchmark import BenchmarkWidgetServer, benchmark_config
+
+
+class RenderModeRun(QtCore.QObject):
+    """
+    Mede um overlay num modo de renderização a uma taxa fixa de mensagens.
+    
+    No modo "native" as mensagens vêm do SyntheticChatSource e todo o custo
+    fica no próprio processo. No modo "web" elas vêm do BenchmarkWidgetServer,
+    e o custo é o do próprio processo somado ao do processo de renderização do
+    Chromium. A memória é o RSS ao final da medição; a CPU é a consumida
+    durante a medição, dividida pelas mensagens exibidas nesse intervalo.
+    """
+    WARMUP_MS = 2000
+    LOAD_TIMEOUT_MS = 30000
+    
+    finished = QtCore.pyqtSignal(dict)
+    
+    def __init__(self, config, mode, rate, duration, parent=None):
+        super().__init__(parent)
+        self.mode = mode
+        self.duration = duration
+        self.server = None
+        self.done = False
+        self.started = False
+        self.cpu_start = 0.0
+        self.cpu_seconds = 0.0
+        self.messages_start = 0
+        self.results = {"mode": mode, "rate": rate, "duration_s": duration}
+        
+        options = {"render_mode": mode, "hotkey_backend": "fake", "enable_sound": False}
+        if mode == "native":
+            options.update({"chat_source": "synthetic", "synthetic_rate": rate})
+        else:
+            self.server = BenchmarkWidgetServer(rate)
+            options["url"] = self.server.url
+        config.update(options)
+        
+        self.overlay = ChatOverlay(config)
+        if mode == "native":
+            QtCore.QTimer.singleShot(self.WARMUP_MS, self.start_measuring)
+        else:
+            self.overlay.browser.page().loadFinished.connect(self.on_load_finished)
+            QtCore.QTimer.singleShot(self.LOAD_TIMEOUT_MS, self.on_timeout)
+    
+    def pids(self):
+        pids = [os.getpid()]
+        if self.mode != "native":
+            page = self.overlay.browser.page()
+            pid = page.renderProcessPid() if hasattr(page, "renderProcessPid") else 0
+            if pid:
+                pids.append(pid)
+        return pids
+    
+    def cpu_time(self):
+        return sum(platform_backend.process_cpu_time(pid) for pid in self.pids())
+    
+    def on_load_finished(self, ok):
+        if not self.started:
+            self.started = True
+            QtCore.QTimer.singleShot(self.WARMUP_MS, self.start_measuring)
+    
+    def on_timeout(self):
+        if not self.started:
+            self.results["error"] = "a página não carregou"
+            self.finish()
+    
+    def message_count(self, callback):
+        """Mensagens exibidas até agora, entregues a `callback`"""
+        if self.mode == "native":
+            callback(self.overlay.chat_source.count)
+        else:
+            self.overlay.browser.page().runJavaScript(
+                PAGE_STATS_SCRIPT, lambda stats: callback(stats["messages"] if stats else 0))
+    
+    def start_measuring(self):
+        self.cpu_start = self.cpu_time()
+        self.message_count(self.on_start_count)
+        QtCore.QTimer.singleShot(int(self.duration * 1000), self.stop_measuring)
+    
+    def on_start_count(self, count):
+        self.messages_start = count
+    
+    def stop_measuring(self):
+        self.cpu_seconds = self.cpu_time() - self.cpu_start
+        memory = [platform_backend.process_memory(pid) for pid in self.pids()]
+        self.results["rss_mb"] = round(sum(memory) / (1024 * 1024), 1)
+        if len(memory) > 1:
+            self.results["renderer_rss_mb"] = round(memory[1] / (1024 * 1024), 1)
+        self.message_count(self.on_stop_count)
+    
+    def on_stop_count(self, count):
+        messages = count - self.messages_start
+        self.results["messages"] = messages
+        self.results["cpu_percent"] = round(self.cpu_seconds * 100 / self.duration, 1)
+        if messages:
+            self.results["cpu_ms_per_message"] = round(self.cpu_seconds * 1000 / messages, 3)
+        self.finish()
+    
+    def finish(self):
+        if self.done:
+            return
+        self.done = True
+        self.overlay.shutdown()
+        if self.server:
+            self.server.stop()
+        self.finished.emit(self.results)
+
+
+def run_single(args, qt_args):
+    """Uma medição (um modo, uma taxa) num processo próprio; imprime o resultado em JSON"""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
+    app = QtWidgets.QApplication(sys.argv[:1] + qt_args)
+    results = {}
+    
+    def on_finished(run_results):
+        results.update(run_results)
+        app.quit()
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        run = RenderModeRun(benchmark_config(work_dir), args.mode, args.rate, args.duration)
+        run.finished.connect(on_finished)
+        app.exec_()
+    print(json.dumps(results))
+    return 2 if "error" in results else 0
+
+
+def run_render_mode_benchmark(args, qt_args):
+    """
+    Compara o modo nativo e o web em cada taxa. Cada medição roda num processo
+    novo, para que o RSS de uma não inclua o que a anterior carregou (o
+    QtWebEngine, por exemplo, nunca é descarregado).
+    """
+    report = []
+    for rate in args.rates:
+        for mode in args.modes:
+            process = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--single", "--mode", mode,
+                 "--rate", str(rate), "--duration", str(args.duration)] + qt_args,
+                stdout=subprocess.PIPE, universal_newlines=True,
+            )
+            lines = process.stdout.strip().splitlines()
+            try:
+                report.append(json.loads(lines[-1]))
+            except (IndexError, ValueError):
+                report.append({"mode": mode, "rate": rate,
+                               "error": f"a medição terminou com o código {process.returncode}"})
+    
+    print(json.dumps(report, indent=4))
+    return 2 if any("error" in run for run in report) else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compara memória e CPU por mensagem dos modos de renderização nativo e web")
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 100, 1000],
+                        help="taxas de mensagens por segundo a medir")
+    parser.add_argument("--modes", nargs="+", default=["native", "web"], choices=["native", "web"])
+    parser.add_argument("--duration", type=float, default=10, help="duração de cada medição, em segundos")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", help=argparse.SUPPRESS)
+    parser.add_argument("--rate", type=float, help=argparse.SUPPRESS)
+    args, qt_args = parser.parse_known_args()
+    if args.single:
+        sys.exit(run_single(args, qt_args))
+    sys.exit(run_render_mode_benchmark(args, qt_args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import http.server
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+# Sem janela: os testes rodam na plataforma offscreen do Qt
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5 import QtCore, QtWidgets
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    # Permite importar o QtWebEngine depois de criar a QApplication
+    QtCore.QCoreApplication.setAttribute(QtCore.Qt.AA_ShareOpenGLContexts)
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    yield app
+
+
+@pytest.fixture
+def webengine(qapp):
+    """Pula o teste quando o QtWebEngine não pode ser carregado neste ambiente"""
+    try:
+        from PyQt5 import QtWebEngineWidgets
+    except ImportError as e:
+        pytest.skip(f"QtWebEngine indisponível: {e}")
+    return QtWebEngineWidgets
+
+
+@pytest.fixture
+def wait_until(qapp):
+    """Processa os eventos do Qt até `predicate()` ser verdadeiro ou estourar o tempo"""
+    def wait(predicate, timeout=5.0):
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            if time.perf_counter() > deadline:
+                return False
+            qapp.processEvents(QtCore.QEventLoop.AllEvents, 10)
+            time.sleep(0.001)
+        return True
+    return wait
+
+
+@pytest.fixture
+def config(tmp_path):
+    """ConfigManager num diretório temporário, com caches e histórico também nele"""
+    from Chat import ConfigManager
+    manager = ConfigManager(str(tmp_path / "config.json"))
+    manager.update({
+        "asset_cache_dir": str(tmp_path / "asset_cache"),
+        "image_cache_dir": str(tmp_path / "image_cache"),
+        "web_profile_dir": str(tmp_path / "web_profile"),
+        "recorder_dir": str(tmp_path / "chat_history"),
+        "hotkey_backend": "fake",
+        # Sem downloads: o AssetCache só busca URLs http(s)
+        "sound_url": "notify.ogg",
+    })
+    yield manager
+    manager.save_config()
+
+
+@pytest.fixture
+def make_overlay(qapp, config):
+    """Cria ChatOverlays com a configuração temporária e os encerra no fim do teste"""
+    from Chat import ChatOverlay
+    overlays = []
+    
+    def make(**options):
+        config.update(options)
+        overlay = ChatOverlay(config)
+        overlays.append(overlay)
+        return overlay
+    
+    yield make
+    for overlay in overlays:
+        overlay.shutdown()
+        overlay.deleteLater()
+    qapp.processEvents()
+
+
+class StaticServer:
+    """Servidor HTTP local que serve `files` ({caminho: (tipo, bytes)}) e conta as requisições"""
+    def __init__(self, files):
+        self.files = files
+        self.requests = []
+        server = self
+        
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.requests.append(self.path)
+                if self.path not in server.files:
+                    self.send_error(404)
+                    return
+                content_type, body = server.files[self.path]
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    
+    def url(self, path):
+        return self.base_url + path
+    
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def static_server():
+    server = StaticServer({})
+    yield server
+    server.stop()
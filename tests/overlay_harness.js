@@ -0,0 +1,101 @@
+// Roda o OVERLAY_SCRIPT no Node contra um `#log` falso, no lugar do widget do Streamlabs.
+// Uso: node overlay_harness.js script.js cenario.json
+// O cenário define a rajada: {"perTick": 50, "tickMs": 10, "total": 1000, "injections": 1}
+// e o resultado sai em JSON na saída padrão.
+var fs = require('fs');
+
+var script = fs.readFileSync(process.argv[2], 'utf8');
+var scenario = JSON.parse(fs.readFileSync(process.argv[3], 'utf8'));
+
+var result = { plays: 0, audioElements: 0, frames: 0, messages: 0, dom: 0, maxDom: 0, oldest: null };
+
+function MutationObserverStandIn(callback) {
+    this.callback = callback;
+    global.__observer = this;
+}
+MutationObserverStandIn.prototype.observe = function(target) { this.target = target; };
+MutationObserverStandIn.prototype.disconnect = function() {};
+
+var log = {
+    style: {},
+    children: [],
+    get childElementCount() { return this.children.length; },
+    removeChild: function(node) { this.children.splice(this.children.indexOf(node), 1); }
+};
+var iframeDoc = {
+    readyState: 'complete',
+    URL: 'http://127.0.0.1/widget',
+    getElementById: function(id) { return id === 'log' ? log : null; },
+    createRange: function() {
+        return {
+            setStart: function(target) { this.target = target; },
+            setEndBefore: function(node) { this.end = node; },
+            deleteContents: function() {
+                this.target.children.splice(0, this.target.children.indexOf(this.end));
+            }
+        };
+    }
+};
+log.ownerDocument = iframeDoc;
+var iframe = { contentDocument: iframeDoc, contentWindow: { document: iframeDoc } };
+
+global.window = global;
+global.document = {
+    hidden: false,
+    getElementById: function(id) { return id === 'chatFrame' ? iframe : null; }
+};
+global.MutationObserver = MutationObserverStandIn;
+global.requestAnimationFrame = function(callback) {
+    setTimeout(function() {
+        result.frames++;
+        callback();
+    }, 16);
+};
+// Sem AudioContext o script usa um único elemento <audio>
+global.Audio = function(url) {
+    result.audioElements++;
+    this.play = function() {
+        result.plays++;
+        return Promise.resolve();
+    };
+};
+
+for (var i = 0; i < (scenario.injections || 1); i++) {
+    eval(script);
+}
+
+function heapUsed() {
+    if (global.gc) global.gc();
+    return process.memoryUsage().heapUsed;
+}
+
+var heapStart = null;
+var started = Date.now();
+var timer = setInterval(function() {
+    var added = [];
+    for (var i = 0; i < scenario.perTick && result.messages < scenario.total; i++) {
+        var node = { nodeType: 1, style: {}, index: result.messages, textContent: 'usuario: mensagem ' + result.messages };
+        log.children.push(node);
+        added.push(node);
+        result.messages++;
+    }
+    if (added.length) {
+        __observer.callback([{ addedNodes: added }]);
+    }
+    result.maxDom = Math.max(result.maxDom, log.children.length);
+    if (heapStart === null && result.messages >= scenario.total / 10) {
+        heapStart = heapUsed();
+    }
+    if (result.messages >= scenario.total) {
+        clearInterval(timer);
+        // Espera o último quadro antes de medir
+        setTimeout(function() {
+            result.dom = log.children.length;
+            result.elapsedMs = Date.now() - started;
+            result.oldest = log.children.length ? log.children[0].index : null;
+            result.heapGrowth = heapUsed() - heapStart;
+            process.stdout.write(JSON.stringify(result));
+            process.exit(0);
+        }, 100);
+    }
+}, scenario.tickMs);
@@ -0,0 +1,45 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+from Chat import OVERLAY_SCRIPT
+
+HARNESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "overlay_harness.js")
+
+DEFAULT_OPTIONS = {
+    "enableSound": True,
+    "soundUrl": "notify.ogg",
+    "soundCooldownMs": 1000,
+    "soundMaxPerMinute": 20,
+    "maxMessages": 200,
+    "bridge": False,
+    "bridgeBatches": False,
+    "bridgeFlushMs": 250,
+    "bridgeQueueSize": 1000,
+    "filter": False,
+    "filterHide": False,
+    "highlightColor": "",
+    "watchdog": False,
+}
+
+
+def run_overlay_script(tmp_path, options=None, **scenario):
+    """Roda o script injetado no Node com uma rajada de mensagens e retorna as contagens"""
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("Node.js não encontrado")
+    
+    script = OVERLAY_SCRIPT.replace("__OPTIONS__", json.dumps(dict(DEFAULT_OPTIONS, **(options or {}))))
+    script_file = tmp_path / "overlay.js"
+    script_file.write_text(script, encoding="utf-8")
+    scenario_file = tmp_path / "scenario.json"
+    scenario_file.write_text(json.dumps(dict({"perTick": 50, "tickMs": 10, "total": 1000}, **scenario)))
+    
+    output = subprocess.run(
+        [node, "--expose-gc", HARNESS, str(script_file), str(scenario_file)],
+        capture_output=True, text=True, timeout=120, check=True
+    ).stdout
+    return json.loads(output)
@@ -0,0 +1,98 @@
+import json
+import os
+import time
+
+from Chat import AssetCache
+
+
+def wait_cached(cache, url, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while cache.local_path(url) is None:
+        assert time.monotonic() < deadline, f"{url} não foi baixado"
+        time.sleep(0.01)
+    return cache.local_path(url)
+
+
+def test_second_start_makes_no_requests(tmp_path, static_server):
+    static_server.files["/notify.ogg"] = ("audio/ogg", b"OggS" + b"\0" * 1000)
+    url = static_server.url("/notify.ogg")
+    cache_dir = str(tmp_path / "asset_cache")
+    
+    # Primeira inicialização: a URL original é usada enquanto o download acontece
+    first = AssetCache(cache_dir)
+    assert first.resolve(url) == url
+    path = wait_cached(first, url)
+    assert len(static_server.requests) == 1
+    
+    # Segunda inicialização: o índice em disco já aponta para o arquivo
+    second = AssetCache(cache_dir)
+    resolved = second.resolve(url)
+    assert resolved.startswith("file://")
+    assert resolved.endswith(os.path.basename(path))
+    time.sleep(0.1)
+    assert len(static_server.requests) == 1
+
+
+def test_concurrent_resolves_download_once(tmp_path, static_server):
+    static_server.files["/widget.css"] = ("text/css", b"body {}")
+    url = static_server.url("/widget.css")
+    cache = AssetCache(str(tmp_path / "asset_cache"))
+    for _ in range(20):
+        cache.resolve(url)
+    wait_cached(cache, url)
+    assert len(static_server.requests) == 1
+
+
+def test_files_are_named_by_content_hash(tmp_path):
+    cache = AssetCache(str(tmp_path / "asset_cache"))
+    first = cache.store("http://a/som.ogg", b"mesmo conteudo")
+    second = cache.store("http://b/outro.ogg", b"mesmo conteudo")
+    assert first == second
+    assert len([name for name in os.listdir(cache.cache_dir) if name.endswith(".ogg")]) == 1
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = AssetCache(str(tmp_path / "asset_cache"), max_bytes=250)
+    cache.store("http://a/1", b"1" * 100)
+    time.sleep(0.01)
+    cache.store("http://a/2", b"2" * 100)
+    time.sleep(0.01)
+    assert cache.local_path("http://a/1")  # passa a ser o mais recente
+    time.sleep(0.01)
+    cache.store("http://a/3", b"3" * 100)
+    
+    assert cache.local_path("http://a/2") is None
+    assert cache.local_path("http://a/1") and cache.local_path("http://a/3")
+    assert sum(entry["size"] for entry in cache.index.values()) <= 250
+    
+    # Depois de reiniciar, a ordem continua sendo a do último uso, não a do download
+    time.sleep(0.01)
+    assert cache.local_path("http://a/1")
+    cache.flush()  # no encerramento
+    restarted = AssetCache(cache.cache_dir, max_bytes=250)
+    restarted.store("http://a/4", b"4" * 100)
+    assert restarted.local_path("http://a/3") is None
+    assert restarted.local_path("http://a/1") and restarted.local_path("http://a/4")
+
+
+def test_recency_is_saved_periodically_without_a_flush(tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / "asset_cache")
+    cache = AssetCache(cache_dir)
+    cache.store("http://a/1", b"1")
+    saved = json.loads((tmp_path / "asset_cache" / AssetCache.INDEX_FILE).read_text())
+    
+    monkeypatch.setattr(AssetCache, "INDEX_SAVE_INTERVAL", 0)
+    time.sleep(0.01)
+    cache.local_path("http://a/1")
+    last_used = AssetCache(cache_dir).index["http://a/1"]["last_used"]
+    assert last_used > saved["http://a/1"]["last_used"]
+
+
+def test_failed_download_is_not_cached(tmp_path, static_server):
+    url = static_server.url("/faltando.ogg")
+    cache = AssetCache(str(tmp_path / "asset_cache"))
+    cache.resolve(url)
+    deadline = time.monotonic() + 5
+    while url in cache._downloading and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.local_path(url) is None
@@ -0,0 +1,50 @@
+from Chat import ChatBridge
+from bridge_benchmark import connect_bridge
+
+
+def test_post_messages_batch(qapp):
+    bridge = ChatBridge()
+    emitted = []
+    bridge.messages_received.connect(emitted.append)
+    
+    bridge.post_messages([
+        {"user": "ana", "text": "oi", "color": "#ff0000", "time": 1500000.0},
+        "não é um registro",
+        {"user": "bia", "text": "tudo bem?"},
+    ], 4)
+    
+    assert bridge.received_count == 2
+    assert bridge.dropped_count == 4
+    assert bridge.batch_count == 1
+    # O lote inteiro sai num único sinal
+    assert len(emitted) == 1
+    first, second = emitted[0]
+    assert (first.user, first.text, first.color, first.timestamp) == ("ana", "oi", "#ff0000", 1500.0)
+    assert (second.user, second.text, second.color) == ("bia", "tudo bem?", "#ffffff")
+
+
+def test_empty_batch_only_counts_drops(qapp):
+    bridge = ChatBridge()
+    emitted = []
+    bridge.messages_received.connect(emitted.append)
+    
+    bridge.post_messages([], 7)
+    bridge.post_messages([{"user": "ana", "text": "oi"}], 0)
+    
+    assert (bridge.received_count, bridge.dropped_count, bridge.batch_count) == (1, 7, 2)
+    assert [len(batch) for batch in emitted] == [1]
+
+
+def test_post_messages_through_web_channel(qapp, wait_until):
+    bridge = ChatBridge()
+    emitted = []
+    bridge.messages_received.connect(emitted.extend)
+    transport = connect_bridge(bridge)
+    
+    records = [{"user": f"usuario{i}", "text": f"mensagem {i}", "time": 1000.0 * i} for i in range(100)]
+    transport.invoke("chatBridge", "post_messages", [records, 3])
+    
+    assert wait_until(lambda: bridge.received_count == 100)
+    assert bridge.dropped_count == 3
+    assert [message.text for message in emitted] == [f"mensagem {i}" for i in range(100)]
+    assert emitted[10].timestamp == 10.0
@@ -0,0 +1,71 @@
+from Chat import ChatFilter
+
+HIGHLIGHT = ChatFilter.HIGHLIGHT
+HIDE = ChatFilter.HIDE
+
+
+def test_whole_words_ignore_case():
+    chat_filter = ChatFilter(highlight=["Olá"], hide=["spam"])
+    assert chat_filter.match("a", "OLÁ pessoal") == HIGHLIGHT
+    assert chat_filter.match("a", "olázinho") == 0
+    assert chat_filter.match("a", "isto é SPAM!") == HIDE
+    assert chat_filter.match("a", "olá, spam") == HIGHLIGHT | HIDE
+
+
+def test_overlapping_words():
+    chat_filter = ChatFilter(highlight=["he", "she", "hers"])
+    assert chat_filter.match("a", "ushers") == 0
+    assert chat_filter.match("a", "is it hers") == HIGHLIGHT
+
+
+def test_muted_users_are_hidden():
+    chat_filter = ChatFilter(muted_users=["  Troll "])
+    assert chat_filter.match("TROLL", "oi") == HIDE
+    assert chat_filter.hides
+
+
+def test_regex_rules():
+    chat_filter = ChatFilter(highlight=["/gg+/", "/^!comando/"])
+    assert chat_filter.match("a", "GGGG") == HIGHLIGHT
+    assert chat_filter.match("a", "!Comando agora") == HIGHLIGHT
+    assert chat_filter.match("a", "agora !comando") == 0
+
+
+def test_invalid_regex_is_skipped():
+    chat_filter = ChatFilter(hide=["/(aberto/", "/fechado/"])
+    assert chat_filter.match("a", "fechado") == HIDE
+
+
+def test_inline_flags_do_not_break_the_other_rules():
+    # Juntas, "(?s)" ficaria no meio da expressão, o que é um erro
+    chat_filter = ChatFilter(hide=["/abc/", "/(?s)um.dois/", "/xyz/"])
+    assert chat_filter.match("a", "um\ndois") == HIDE
+    assert chat_filter.match("a", "abc") == HIDE
+    assert chat_filter.match("a", "xyz") == HIDE
+    assert chat_filter.match("a", "nada") == 0
+
+
+def test_backreferences_keep_their_meaning():
+    # Unidas, \1 da segunda expressão apontaria para o grupo da primeira
+    chat_filter = ChatFilter(hide=["/(a)b/", "/(x)\\1/"])
+    assert chat_filter.match("a", "xx") == HIDE
+    assert chat_filter.match("a", "ab") == HIDE
+    assert chat_filter.match("a", "xa") == 0
+
+
+def test_duplicate_group_names():
+    chat_filter = ChatFilter(hide=["/(?P<p>foo)/", "/(?P<p>bar)/"])
+    assert chat_filter.match("a", "foo") == HIDE
+    assert chat_filter.match("a", "bar") == HIDE
+
+
+def test_simple_rules_share_one_expression():
+    chat_filter = ChatFilter(highlight=["/a+/", "/b+/", "/c+/", "/(d)\\1/"])
+    assert len(chat_filter.patterns[HIGHLIGHT]) == 2
+
+
+def test_inactive_filter():
+    chat_filter = ChatFilter()
+    assert not chat_filter.active
+    assert not chat_filter.hides
+    assert chat_filter.match("a", "qualquer coisa") == 0
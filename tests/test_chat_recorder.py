@@ -0,0 +1,127 @@
+import os
+
+from Chat import ChatMessage, ChatRecorder
+
+
+def record(directory, messages, **options):
+    recorder = ChatRecorder(str(directory), commit_interval=0, **options)
+    recorder.record(messages)
+    recorder.close()
+    return recorder
+
+
+def chat(count, start=0):
+    return [ChatMessage(f"usuario{i % 3}", f"mensagem {i}", timestamp=1000.0 + i) for i in range(start, start + count)]
+
+
+def texts(messages):
+    return [message.text for message in messages]
+
+
+def test_query_by_time_and_user(tmp_path):
+    recorder = record(tmp_path, chat(3000))
+    assert len(recorder.query()) == 3000
+    assert texts(recorder.query(start=1010, end=1012)) == ["mensagem 10", "mensagem 11", "mensagem 12"]
+    by_user = recorder.query(user="USUARIO1")
+    assert len(by_user) == 1000
+    assert all(message.user == "usuario1" for message in by_user)
+
+
+def test_segments_roll_over(tmp_path):
+    recorder = record(tmp_path, chat(250), segment_messages=100)
+    assert recorder.segment_ids() == [0, 1, 2]
+    assert len(recorder.query()) == 250
+    assert ChatRecorder(str(tmp_path)).segment_count == 50
+
+
+def test_partial_index_line_is_truncated(tmp_path):
+    record(tmp_path, chat(10))
+    index_path = tmp_path / "000000.idx"
+    # Gravação interrompida no meio da linha do índice
+    with open(index_path, "ab") as f:
+        f.write(b'{"offset": 999, "si')
+    
+    recorder = record(tmp_path, chat(10, start=10))
+    assert texts(recorder.query()) == [f"mensagem {i}" for i in range(20)]
+    assert index_path.read_bytes().endswith(b"\n")
+    assert len(index_path.read_bytes().splitlines()) == 2
+
+
+def test_log_bytes_past_the_last_indexed_block_are_dropped(tmp_path):
+    record(tmp_path, chat(10))
+    log_path = tmp_path / "000000.log"
+    size = os.path.getsize(log_path)
+    # Bloco gravado no .log sem a entrada no índice
+    with open(log_path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00lixo")
+    
+    recorder = ChatRecorder(str(tmp_path), commit_interval=0)
+    assert os.path.getsize(log_path) == size
+    recorder.record(chat(5, start=10))
+    recorder.close()
+    assert len(recorder.query()) == 15
+
+
+def test_index_entries_without_their_block_are_dropped(tmp_path):
+    record(tmp_path, chat(10))
+    record(tmp_path, chat(10, start=10))
+    log_path = tmp_path / "000000.log"
+    # O segundo bloco foi perdido, mas a entrada dele ficou no índice
+    with open(log_path, "r+b") as f:
+        f.truncate(os.path.getsize(log_path) - 5)
+    
+    recorder = ChatRecorder(str(tmp_path))
+    assert recorder.segment_count == 10
+    assert len(recorder.query()) == 10
+
+
+def test_invalid_lines_are_skipped_not_fatal(tmp_path):
+    record(tmp_path, chat(10))
+    index_path = tmp_path / "000000.idx"
+    first = index_path.read_bytes()
+    record(tmp_path, chat(10, start=10))
+    second = index_path.read_bytes()[len(first):]
+    index_path.write_bytes(first + b"isto nao e json\n[1, 2]\n" + second)
+    
+    assert len(ChatRecorder(str(tmp_path)).query()) == 20
+
+
+def test_append_starts_on_a_new_line(tmp_path):
+    record(tmp_path, chat(5))
+    index_path = tmp_path / "000000.idx"
+    recorder = ChatRecorder(str(tmp_path), commit_interval=0)
+    # Linha sem o "\n" final, deixada depois que o segmento foi aberto
+    index_path.write_bytes(index_path.read_bytes().rstrip(b"\n"))
+    
+    recorder.record(chat(5, start=5))
+    recorder.close()
+    assert len(index_path.read_bytes().splitlines()) == 2
+    assert len(ChatRecorder(str(tmp_path)).query()) == 10
+
+
+def test_read_only_open_leaves_a_block_in_progress_alone(tmp_path):
+    record(tmp_path, chat(10))
+    log_path = tmp_path / "000000.log"
+    index_path = tmp_path / "000000.idx"
+    # Um overlay em execução gravou o bloco no .log e ainda não o indexou
+    with open(log_path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00bloco em curso")
+    log_bytes = log_path.read_bytes()
+    index_bytes = index_path.read_bytes()
+    
+    reader = ChatRecorder(str(tmp_path), recover=False)
+    assert len(reader.query()) == 10
+    reader.record(chat(5, start=10))
+    reader.close()
+    assert log_path.read_bytes() == log_bytes
+    assert index_path.read_bytes() == index_bytes
+
+
+def test_read_only_query_skips_blocks_missing_from_the_log(tmp_path):
+    record(tmp_path, chat(10))
+    record(tmp_path, chat(10, start=10))
+    log_path = tmp_path / "000000.log"
+    with open(log_path, "r+b") as f:
+        f.truncate(os.path.getsize(log_path) - 5)
+    
+    assert texts(ChatRecorder(str(tmp_path), recover=False).query()) == [f"mensagem {i}" for i in range(10)]
@@ -0,0 +1,141 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from Chat import ChatReplayServer, SocketChatSource, parse_chat_line
+
+
+class ReplayLoop:
+    """
+    ChatReplayServer rodando num laço asyncio em outra thread, numa porta
+    livre. `finished` é marcado quando o servidor termina de enviar o log.
+    """
+    def __init__(self, replay):
+        self.replay = replay
+        self.finished = threading.Event()
+        self.loop = asyncio.new_event_loop()
+        self.server = self.loop.run_until_complete(
+            asyncio.start_server(self.handle_client, "127.0.0.1", 0))
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+    
+    async def handle_client(self, reader, writer):
+        await self.replay.handle_client(reader, writer)
+        self.finished.set()
+    
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=2)
+        self.server.close()
+        self.loop.close()
+
+
+@pytest.fixture
+def replay_log(tmp_path):
+    """Grava um log com `count` mensagens e o reproduz no servidor local"""
+    loops = []
+    
+    def start(count, text_size=10):
+        path = tmp_path / "chat.jsonl"
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(count):
+                text = f"mensagem {i} ".ljust(text_size, "x")
+                f.write(json.dumps({"timestamp": 1000.0 + i, "user": f"usuario{i % 5}", "text": text}) + "\n")
+        loop = ReplayLoop(ChatReplayServer(str(path), speed=0))
+        loops.append(loop)
+        return loop
+    
+    yield start
+    for loop in loops:
+        loop.stop()
+
+
+@pytest.fixture
+def source(qapp):
+    sources = []
+    
+    def create(port, queue_size=1000):
+        chat_source = SocketChatSource("127.0.0.1", port, queue_size)
+        sources.append(chat_source)
+        return chat_source
+    
+    yield create
+    for chat_source in sources:
+        chat_source.stop()
+
+
+def test_parse_chat_line_keeps_numeric_timestamps():
+    assert parse_chat_line('{"user": "a", "text": "oi", "timestamp": 1500}').timestamp == 1500
+    assert parse_chat_line('{"user": "a", "text": "oi", "timestamp": 1500.5}').timestamp == 1500.5
+
+
+@pytest.mark.parametrize("timestamp", ['"1500"', "true", "null", "[1500]", '{"s": 1}'])
+def test_parse_chat_line_replaces_invalid_timestamps_with_arrival_time(timestamp):
+    before = time.time()
+    message = parse_chat_line('{"user": "a", "text": "oi", "timestamp": %s}' % timestamp)
+    assert message.text == "oi"
+    assert isinstance(message.timestamp, float)
+    assert before <= message.timestamp <= time.time()
+
+
+def test_parse_chat_line_rejects_invalid_lines():
+    assert parse_chat_line("não é json") is None
+    assert parse_chat_line("[1, 2]") is None
+    assert parse_chat_line(b'{"user": "a", "text": "oi"}').user == "a"
+
+
+def test_source_survives_string_timestamps(qapp, wait_until, source):
+    # Antes, o timestamp em texto quebrava o cálculo da latência dentro do slot do Qt
+    def handle_client(reader, writer):
+        writer.write(b'{"user": "a", "text": "oi", "timestamp": "agora"}\n')
+        writer.close()
+    
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(asyncio.start_server(handle_client, "127.0.0.1", 0))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        chat_source = source(server.sockets[0].getsockname()[1])
+        chat_source.start()
+        assert wait_until(lambda: chat_source.received_count == 1)
+        assert 0 <= chat_source.last_latency < 5
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=2)
+        server.close()
+        loop.close()
+
+
+def test_replayed_log_reaches_the_source(qapp, wait_until, replay_log, source):
+    replay = replay_log(2000)
+    chat_source = source(replay.port)
+    received = []
+    chat_source.messages_received.connect(received.extend)
+    chat_source.start()
+    
+    assert wait_until(lambda: chat_source.received_count == 2000, timeout=10)
+    assert [message.text.split()[1] for message in received] == [str(i) for i in range(2000)]
+    # O servidor troca o timestamp gravado pelo horário do envio
+    assert 0 <= chat_source.last_latency < 5
+    assert replay.finished.wait(2)
+
+
+def test_slow_interface_pushes_back_on_the_sender(qapp, wait_until, replay_log, source):
+    # Mensagens grandes o bastante para encher a fila e os buffers do TCP
+    count = 800
+    replay = replay_log(count, text_size=32 * 1024)
+    chat_source = source(replay.port, queue_size=50)
+    chat_source.start()
+    
+    # Sem processar os eventos do Qt, a interface não consome nenhum lote:
+    # a fila enche, a leitura pausa e o servidor fica preso no drain()
+    time.sleep(1.0)
+    assert chat_source.received_count == 0
+    assert not replay.finished.is_set()
+    
+    assert wait_until(lambda: chat_source.received_count == count, timeout=20)
+    assert replay.finished.wait(2)
@@ -0,0 +1,200 @@
+import time
+
+from PyQt5 import QtCore
+
+from Chat import ChatWatchdog
+
+
+class FakePage(QtCore.QObject):
+    """Página que responde ao script do watchdog conforme o estado simulado"""
+    NormalTerminationStatus = 0
+    CrashedTerminationStatus = 2
+    
+    loadStarted = QtCore.pyqtSignal()
+    loadFinished = QtCore.pyqtSignal(bool)
+    renderProcessTerminated = QtCore.pyqtSignal(int, int)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.hung = False  # o JavaScript da página não responde
+        self.crashed = False
+        self.attached = True  # o contêiner das mensagens está no documento
+    
+    def runJavaScript(self, js, callback=None):
+        if self.hung or self.crashed or callback is None:
+            return
+        now = time.time() * 1000
+        QtCore.QTimer.singleShot(1, lambda: callback(
+            {"now": now, "heartbeat": now, "attached": self.attached, "lastMessage": now}
+        ))
+
+
+class FakeBrowser(QtCore.QObject):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._page = FakePage(self)
+    
+    def page(self):
+        return self._page
+
+
+class FakeOverlay(QtCore.QObject):
+    """Só o que o ChatWatchdog usa do ChatOverlay, registrando as ações de recuperação"""
+    LOAD_MS = 50
+    
+    def __init__(self):
+        super().__init__()
+        self.browser = FakeBrowser(self)
+        self.actions = []
+        self.reload_in_signal = False
+        self.finish_loads = True
+        self._in_signal = False
+    
+    def isVisible(self):
+        return True
+    
+    def inject_script(self):
+        self.actions.append("inject")
+    
+    def reload_iframe(self):
+        self.actions.append("iframe")
+    
+    def load_embedded_html(self):
+        self.actions.append("reload")
+        self.reload_in_signal = self.reload_in_signal or self._in_signal
+        page = self.browser.page()
+        page.loadStarted.emit()
+        if self.finish_loads:
+            QtCore.QTimer.singleShot(self.LOAD_MS, lambda: self.finish_load(page))
+    
+    def finish_load(self, page):
+        page.hung = False
+        page.crashed = False
+        page.loadFinished.emit(True)
+    
+    def crash(self):
+        page = self.browser.page()
+        page.crashed = True
+        self._in_signal = True
+        page.renderProcessTerminated.emit(page.CrashedTerminationStatus, 11)
+        self._in_signal = False
+
+
+def make_watchdog(overlay, **options):
+    options.setdefault("interval_ms", 50)
+    options.setdefault("max_backoff_s", 1)
+    return ChatWatchdog(overlay, **options)
+
+
+def test_healthy_page_needs_no_recovery(qapp, wait_until):
+    overlay = FakeOverlay()
+    watchdog = make_watchdog(overlay)
+    wait_until(lambda: False, timeout=0.3)
+    watchdog.stop()
+    assert overlay.actions == []
+    assert watchdog.failures == 0
+
+
+def test_stalled_page_escalates_until_it_recovers(qapp, wait_until):
+    overlay = FakeOverlay()
+    watchdog = make_watchdog(overlay)
+    overlay.browser.page().hung = True
+    
+    assert wait_until(lambda: watchdog.recoveries == 1, timeout=10)
+    watchdog.stop()
+    # Reinjetar e recarregar o iframe não destravam a página; a recarga sim
+    assert overlay.actions == ["inject", "iframe", "reload"]
+    assert watchdog.failures == 0
+    # Três verificações sem resposta mais o recuo entre elas (50, 100 e 200 ms ±50%)
+    assert watchdog.recovery_times[0] < 2000
+
+
+def test_crash_reloads_outside_the_signal_and_recovers(qapp, wait_until):
+    overlay = FakeOverlay()
+    watchdog = make_watchdog(overlay)
+    
+    start = time.perf_counter()
+    overlay.crash()
+    assert overlay.actions == []  # adiado para depois do sinal
+    assert wait_until(lambda: watchdog.recoveries == 1, timeout=10)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    watchdog.stop()
+    
+    assert overlay.actions == ["reload"]
+    assert not overlay.reload_in_signal
+    assert watchdog.recovery_times[0] <= elapsed_ms
+    assert watchdog.recovery_times[0] < 1000
+
+
+def test_detached_chat_is_not_reloaded(qapp, wait_until):
+    overlay = FakeOverlay()
+    watchdog = make_watchdog(overlay)
+    page = overlay.browser.page()
+    page.attached = False
+    
+    assert wait_until(lambda: watchdog.detached, timeout=5)
+    # Várias verificações depois, continua só registrando, sem recarregar
+    wait_until(lambda: False, timeout=0.5)
+    assert overlay.actions == ["inject", "iframe"]
+    assert watchdog.failures == 2
+    
+    page.attached = True
+    assert wait_until(lambda: watchdog.recoveries == 1, timeout=5)
+    watchdog.stop()
+    assert not watchdog.detached
+    assert overlay.actions == ["inject", "iframe"]
+
+
+def test_detached_chat_that_hangs_is_reloaded(qapp, wait_until):
+    overlay = FakeOverlay()
+    watchdog = make_watchdog(overlay)
+    page = overlay.browser.page()
+    page.attached = False
+    assert wait_until(lambda: watchdog.detached, timeout=5)
+    
+    # Batimento parado é motivo para a recarga completa
+    page.hung = True
+    assert wait_until(lambda: "reload" in overlay.actions, timeout=5)
+    watchdog.stop()
+    assert overlay.actions == ["inject", "iframe", "reload"]
+
+
+def test_normal_termination_is_ignored(qapp, wait_until):
+    overlay = FakeOverlay()
+    watchdog = make_watchdog(overlay)
+    page = overlay.browser.page()
+    page.renderProcessTerminated.emit(page.NormalTerminationStatus, 0)
+    wait_until(lambda: False, timeout=0.2)
+    watchdog.stop()
+    assert overlay.actions == []
+
+
+def test_stuck_load_times_out_and_moves_on(qapp, wait_until):
+    overlay = FakeOverlay()
+    overlay.finish_loads = False
+    watchdog = make_watchdog(overlay, load_timeout_ms=100)
+    
+    overlay.crash()
+    assert wait_until(lambda: overlay.actions == ["reload"])
+    assert watchdog.loading
+    # O carregamento nunca termina: o tempo limite conta como nova falha
+    assert wait_until(lambda: len(overlay.actions) >= 2, timeout=5)
+    assert not watchdog.loading or watchdog.load_timer.isActive()
+    assert watchdog.failures >= 2
+    
+    overlay.finish_loads = True
+    assert wait_until(lambda: watchdog.recoveries == 1, timeout=10)
+    watchdog.stop()
+
+
+def test_backoff_doubles_up_to_the_limit(qapp):
+    overlay = FakeOverlay()
+    watchdog = ChatWatchdog(overlay, interval_ms=1000, max_backoff_s=5)
+    watchdog.stop()
+    delays = []
+    for failures in range(1, 6):
+        watchdog.failures = failures
+        delays.append(watchdog.backoff_ms())
+    assert 500 <= delays[0] <= 1500
+    assert 1000 <= delays[1] <= 3000
+    assert all(delay <= 7500 for delay in delays)
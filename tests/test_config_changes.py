@@ -0,0 +1,117 @@
+from PyQt5 import QtCore
+
+import pytest
+
+from Chat import diff_config
+
+
+class FakePage(QtCore.QObject):
+    """Página que só registra os scripts executados"""
+    loadFinished = QtCore.pyqtSignal(bool)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.scripts = []
+    
+    def runJavaScript(self, js, callback=None):
+        self.scripts.append(js)
+    
+    def setWebChannel(self, channel):
+        self.channel = channel
+
+
+class FakeBrowser(QtCore.QObject):
+    """Substitui o QWebEngineView e conta as navegações"""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._page = FakePage(self)
+        self.loads = 0
+    
+    def page(self):
+        return self._page
+    
+    def setHtml(self, html, base_url):
+        self.loads += 1
+
+
+def apply(overlay, new_values):
+    """Altera a configuração como o ConfigDialog e aplica só o que mudou"""
+    previous = dict(overlay.config.config)
+    overlay.config.update(new_values)
+    return overlay.apply_config_changes(diff_config(previous, overlay.config.config))
+
+
+def web_overlay(make_overlay):
+    """Overlay cuja página é um FakeBrowser, para rodar sem o QtWebEngine"""
+    overlay = make_overlay(render_mode="native")
+    overlay.browser = FakeBrowser(overlay)
+    overlay.bridge = None
+    return overlay
+
+
+# Campo, novo valor, ação esperada na página e se houve navegação
+WEB_MATRIX = [
+    ("opacity", 50, None, False),
+    ("width", 420, None, False),
+    ("height", 500, None, False),
+    ("hotkey", 0x10, None, False),
+    ("max_fps", 30, None, False),
+    ("enable_sound", False, "inject", False),
+    ("sound_url", "ding.ogg", "inject", False),
+    ("sound_cooldown_ms", 2500, "inject", False),
+    ("max_messages", 50, "inject", False),
+    ("filter_highlight_color", "red", "inject", False),
+    ("url", "https://streamlabs.com/widgets/chat-box/v1/outro", "reload", True),
+]
+
+
+@pytest.mark.parametrize("key, value, action, reloaded", WEB_MATRIX)
+def test_web_config_change_matrix(make_overlay, key, value, action, reloaded):
+    overlay = web_overlay(make_overlay)
+    assert apply(overlay, {key: value}) == action
+    assert (overlay.browser.loads > 0) == reloaded
+    assert bool(overlay.browser.page().scripts) == (action == "inject")
+
+
+def test_live_changes_are_applied(make_overlay):
+    overlay = web_overlay(make_overlay)
+    apply(overlay, {"opacity": 50, "width": 420, "hotkey": 0x10})
+    assert overlay.windowOpacity() == pytest.approx(0.5, abs=0.01)
+    assert overlay.geometry().width() == 420
+    assert overlay.hotkey_backend.vk_code == 0x10
+
+
+def test_first_filter_rule_reloads_once_for_the_bridge(make_overlay):
+    overlay = web_overlay(make_overlay)
+    assert apply(overlay, {"filter_highlight": ["olá"]}) == "reload"
+    assert overlay.bridge is not None
+    assert apply(overlay, {"filter_highlight": ["olá", "tchau"]}) == "inject"
+    assert overlay.browser.loads == 1
+    assert overlay.bridge.chat_filter is overlay.chat_filter
+
+
+@pytest.mark.parametrize("key, value, action, reloaded", WEB_MATRIX)
+def test_native_mode_never_touches_a_page(make_overlay, key, value, action, reloaded):
+    overlay = make_overlay(render_mode="native")
+    assert apply(overlay, {key: value}) is None
+
+
+def test_native_filter_change_is_applied(make_overlay):
+    overlay = make_overlay(render_mode="native")
+    assert apply(overlay, {"filter_hide": ["spam"]}) is None
+    assert overlay.chat_filter.hides
+
+
+def test_max_messages_resizes_the_hidden_buffer(make_overlay):
+    from Chat import ChatMessage
+    overlay = make_overlay(render_mode="native", max_messages=10)
+    overlay.hide()
+    overlay.on_messages_received([ChatMessage("a", str(i)) for i in range(10)])
+    
+    apply(overlay, {"max_messages": 3})
+    assert overlay.hidden_messages.maxlen == 3
+    assert [message.text for message in overlay.hidden_messages] == ["7", "8", "9"]
+    assert overlay.chat_view.chat_model.max_messages == 3
+    
+    overlay.on_messages_received([ChatMessage("a", "10")])
+    assert [message.text for message in overlay.hidden_messages] == ["8", "9", "10"]
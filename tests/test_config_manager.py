@@ -0,0 +1,56 @@
+import json
+import os
+import time
+
+from Chat import ConfigManager
+
+
+def wait_for_writes(manager, timeout=5.0):
+    """Espera o writer em segundo plano esvaziar a gravação agendada"""
+    deadline = time.monotonic() + timeout
+    while manager._save_deadline is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # A gravação começa logo depois que o prazo é limpo
+    with manager._write_lock:
+        pass
+
+
+def test_rapid_position_updates_are_coalesced(tmp_path):
+    config_file = tmp_path / "config.json"
+    manager = ConfigManager(str(config_file), save_delay=0.2)
+    
+    for i in range(1000):
+        manager.update({"position_x": i, "position_y": i * 2})
+    assert manager.write_count == 0
+    
+    time.sleep(0.3)
+    wait_for_writes(manager)
+    assert manager.write_count <= 2
+    with open(config_file, encoding="utf-8") as f:
+        saved = json.load(f)
+    assert (saved["position_x"], saved["position_y"]) == (999, 1998)
+    assert not os.path.exists(f"{config_file}.tmp")
+
+
+def test_unchanged_config_is_not_rewritten(tmp_path):
+    manager = ConfigManager(str(tmp_path / "config.json"), save_delay=0.05)
+    assert manager.save_config()
+    assert manager.write_count == 1
+    
+    manager.set("opacity", manager.get("opacity"))
+    time.sleep(0.15)
+    wait_for_writes(manager)
+    assert manager.save_config()
+    assert manager.write_count == 1
+
+
+def test_save_config_flushes_a_pending_write(tmp_path):
+    config_file = tmp_path / "config.json"
+    manager = ConfigManager(str(config_file), save_delay=60)
+    manager.set("opacity", 0.5)
+    manager.save_config()
+    assert manager.write_count == 1
+    assert json.loads(config_file.read_text(encoding="utf-8"))["opacity"] == 0.5
+    
+    # Recarregar mescla o arquivo com os padrões
+    assert ConfigManager(str(config_file)).get("opacity") == 0.5
@@ -0,0 +1,27 @@
+from overlay_script import run_overlay_script
+
+
+def test_dom_stays_bounded_over_100k_messages(tmp_path):
+    result = run_overlay_script(
+        tmp_path, {"enableSound": False, "maxMessages": 200}, perTick=500, tickMs=5, total=100000
+    )
+    assert result["messages"] == 100000
+    # Remoção em lotes: até 10% acima do limite depois de cada quadro; entre
+    # dois quadros só cresce o que chegou nesse intervalo
+    assert result["dom"] <= 220
+    assert result["maxDom"] < 10000
+    # As mensagens removidas não ficam retidas pelo script
+    assert result["heapGrowth"] < 5 * 1024 * 1024
+
+
+def test_no_pruning_without_a_limit(tmp_path):
+    result = run_overlay_script(
+        tmp_path, {"enableSound": False, "maxMessages": 0, "watchdog": True}, total=1000
+    )
+    assert result["dom"] == 1000
+
+
+def test_pruning_keeps_the_newest_messages(tmp_path):
+    result = run_overlay_script(tmp_path, {"enableSound": False, "maxMessages": 50}, total=1000)
+    assert 50 <= result["dom"] <= 55
+    assert result["oldest"] == 1000 - result["dom"]
@@ -0,0 +1,74 @@
+import os
+import time
+
+from Chat import BACKGROUND_CHROMIUM_FLAGS, ChatMessage, PAGE_STATS_SCRIPT, apply_chromium_flags, platform_backend
+
+
+def test_chromium_flags_keep_existing_ones(config, monkeypatch):
+    monkeypatch.setenv("QTWEBENGINE_CHROMIUM_FLAGS", "--disable-gpu")
+    apply_chromium_flags(config)
+    apply_chromium_flags(config)
+    flags = os.environ["QTWEBENGINE_CHROMIUM_FLAGS"].split()
+    assert flags == ["--disable-gpu", *BACKGROUND_CHROMIUM_FLAGS]
+
+
+def test_no_chromium_flags_when_the_page_is_frozen(config, monkeypatch):
+    monkeypatch.delenv("QTWEBENGINE_CHROMIUM_FLAGS", raising=False)
+    config.set("hidden_lifecycle", "frozen")
+    apply_chromium_flags(config)
+    assert "QTWEBENGINE_CHROMIUM_FLAGS" not in os.environ
+
+
+def test_native_hidden_messages_are_shown_in_one_batch(make_overlay):
+    overlay = make_overlay(render_mode="native", max_messages=500)
+    model = overlay.chat_view.chat_model
+    overlay.hide()
+    for i in range(300):
+        overlay.on_messages_received([ChatMessage("usuario", f"mensagem {i}")])
+    assert model.rowCount() == 0
+    
+    inserts = []
+    model.rowsInserted.connect(lambda parent, first, last: inserts.append(last - first + 1))
+    overlay.show()
+    assert inserts == [300]
+    assert model.messages[-1].text == "mensagem 299"
+
+
+def page_stats(overlay, wait_until):
+    stats = []
+    overlay.browser.page().runJavaScript(PAGE_STATS_SCRIPT, stats.append)
+    assert wait_until(lambda: stats)
+    return stats[0]
+
+
+def test_hidden_page_keeps_receiving_messages_cheaply(webengine, make_overlay, config, wait_until):
+    from overlay_benchmark import BenchmarkWidgetServer
+    
+    rate = 100
+    hidden_seconds = 5
+    server = BenchmarkWidgetServer(rate)
+    try:
+        apply_chromium_flags(config)
+        overlay = make_overlay(url=server.url, enable_sound=False, watchdog_enabled=False)
+        assert wait_until(lambda: page_stats(overlay, wait_until)["messages"] > 0, timeout=30)
+        
+        overlay.hide()
+        wait_until(lambda: False, timeout=0.5)
+        pid = overlay.browser.page().renderProcessPid()
+        start_messages = page_stats(overlay, wait_until)["messages"]
+        start_cpu = platform_backend.process_cpu_time(pid)
+        start = time.perf_counter()
+        wait_until(lambda: False, timeout=hidden_seconds)
+        elapsed = time.perf_counter() - start
+        cpu = platform_backend.process_cpu_time(pid) - start_cpu
+        received = page_stats(overlay, wait_until)["messages"] - start_messages
+        
+        # Sem throttling, nenhuma mensagem do widget se perde com a janela oculta
+        assert received >= rate * elapsed * 0.9
+        # ... e o renderizador não fica ocupado: o log oculto não é diagramado
+        assert cpu / elapsed < 0.25
+        
+        overlay.show()
+        assert page_stats(overlay, wait_until)["messages"] >= start_messages + received
+    finally:
+        server.stop()
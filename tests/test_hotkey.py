@@ -0,0 +1,111 @@
+from PyQt5 import QtCore
+
+import Chat
+from Chat import (
+    FRAME_BUDGET_MS, GWL_EXSTYLE, VK_CONTROL, VK_SHIFT, WM_KEYDOWN, WM_KEYUP, WS_EX_TRANSPARENT,
+    FakeHotkeyBackend, HookHotkeyBackend, PollingHotkeyBackend, create_hotkey_backend
+)
+
+VK_LCONTROL = 0xA2
+VK_RCONTROL = 0xA3
+
+
+def click_through(overlay):
+    style = Chat.platform_backend.get_window_long(overlay.winId().__int__(), GWL_EXSTYLE)
+    return bool(style & WS_EX_TRANSPARENT)
+
+
+def test_press_switches_to_edit_mode_and_release_back(make_overlay):
+    overlay = make_overlay(render_mode="native", hotkey=VK_CONTROL)
+    backend = overlay.hotkey_backend
+    assert isinstance(backend, FakeHotkeyBackend)
+    assert not overlay.edit_mode and click_through(overlay)
+    
+    backend.press()
+    assert overlay.edit_mode
+    assert not click_through(overlay)
+    assert not overlay.testAttribute(QtCore.Qt.WA_TransparentForMouseEvents)
+    
+    backend.release()
+    assert not overlay.edit_mode
+    assert click_through(overlay)
+    assert len(overlay.mode_switch_times) == 2
+    assert max(overlay.mode_switch_times) < FRAME_BUDGET_MS
+
+
+def test_repeated_key_down_switches_once(make_overlay):
+    overlay = make_overlay(render_mode="native", hotkey=VK_CONTROL)
+    backend = overlay.hotkey_backend
+    for _ in range(5):
+        backend.inject(VK_CONTROL, True)  # repetição automática do teclado
+    assert overlay.edit_mode
+    assert len(overlay.mode_switch_times) == 1
+
+
+def test_left_and_right_modifiers_count_as_the_key():
+    backend = FakeHotkeyBackend(VK_CONTROL)
+    events = []
+    backend.pressed.connect(lambda: events.append("pressed"))
+    backend.released.connect(lambda: events.append("released"))
+    
+    backend.inject(VK_LCONTROL, True)
+    backend.inject(VK_RCONTROL, True)
+    backend.inject(VK_LCONTROL, False)
+    assert backend.is_pressed  # o direito continua pressionado
+    backend.inject(VK_RCONTROL, False)
+    assert events == ["pressed", "released"]
+
+
+def test_other_keys_are_ignored():
+    backend = FakeHotkeyBackend(VK_CONTROL)
+    backend.inject(VK_SHIFT, True)
+    backend.inject(0x41, True)
+    assert not backend.is_pressed
+
+
+def test_set_key_changes_the_key_and_releases():
+    backend = FakeHotkeyBackend(VK_CONTROL)
+    released = []
+    backend.released.connect(lambda: released.append(True))
+    backend.press()
+    
+    backend.set_key(VK_SHIFT)
+    assert not backend.is_pressed
+    assert released == [True]
+    backend.inject(VK_LCONTROL, True)
+    assert not backend.is_pressed
+    backend.inject(0xA0, True)  # Shift esquerdo
+    assert backend.is_pressed
+
+
+def test_polling_backend_reads_the_key_state(qapp, monkeypatch):
+    platform = Chat.FakePlatform()
+    monkeypatch.setattr(Chat, "platform_backend", platform)
+    backend = PollingHotkeyBackend(VK_CONTROL)
+    platform.key_states[VK_CONTROL] = True
+    backend.check_hotkey()
+    assert backend.is_pressed
+    platform.key_states[VK_CONTROL] = False
+    backend.check_hotkey()
+    assert not backend.is_pressed
+
+
+def test_hook_events_are_handled_on_the_event_loop(qapp, wait_until, monkeypatch):
+    monkeypatch.setattr(Chat, "platform_backend", Chat.FakePlatform())
+    backend = HookHotkeyBackend(VK_CONTROL)
+    # Com o FakePlatform, o l_param é o próprio código virtual da tecla
+    backend._hook_proc(0, WM_KEYDOWN, VK_LCONTROL)
+    assert not backend.is_pressed  # adiado para fora do hook
+    assert wait_until(lambda: backend.is_pressed)
+    backend._hook_proc(0, WM_KEYUP, VK_LCONTROL)
+    assert wait_until(lambda: not backend.is_pressed)
+
+
+def test_auto_falls_back_to_polling_without_a_hook(qapp, monkeypatch):
+    monkeypatch.setattr(Chat, "platform_backend", Chat.FakePlatform())
+    backend = create_hotkey_backend("auto", VK_CONTROL)
+    assert isinstance(backend, PollingHotkeyBackend)
+    assert backend.timer.isActive()
+    backend.stop()
+    assert not backend.timer.isActive()
+    assert isinstance(create_hotkey_backend("fake", VK_CONTROL), FakeHotkeyBackend)
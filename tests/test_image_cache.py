@@ -0,0 +1,103 @@
+import random
+
+from Chat import AssetCache, ImageCache, image_type
+
+PNG = b"\x89PNG\r\n\x1a\n"
+
+
+def serve_emotes(server, count, size):
+    urls = []
+    for i in range(count):
+        path = f"/emote/{i}.png"
+        server.files[path] = ("image/png", PNG + bytes([i % 256]) * size)
+        urls.append(server.url(path))
+    return urls
+
+
+def request_all(cache, urls, wait_until):
+    replies = []
+    for url in urls:
+        cache.request(url, replies.append)
+    assert wait_until(lambda: len(replies) == len(urls), timeout=10)
+    return replies
+
+
+def test_repeated_emotes_hit_the_memory_cache(qapp, tmp_path, static_server, wait_until):
+    urls = serve_emotes(static_server, 20, 1000)
+    cache = ImageCache(AssetCache(str(tmp_path / "images")), memory_bytes=1024 * 1024)
+    
+    # Emotes populares se repetem muito mais que os outros
+    rng = random.Random(1)
+    stream = rng.choices(urls, weights=[1 / (rank + 1) for rank in range(len(urls))], k=2000)
+    replies = request_all(cache, stream, wait_until)
+    
+    assert all(reply.startswith(PNG) for reply in replies)
+    stats = cache.stats()
+    assert stats["downloads"] == len(set(stream))
+    assert len(static_server.requests) == len(set(stream))
+    hits = stats["memory_hits"] + stats["disk_hits"] + stats["shared_requests"]
+    assert hits / len(stream) >= 0.98
+
+
+def test_memory_stays_within_its_bound(qapp, tmp_path, static_server, wait_until):
+    urls = serve_emotes(static_server, 50, 10000)
+    limit = 64 * 1024
+    cache = ImageCache(AssetCache(str(tmp_path / "images")), memory_bytes=limit)
+    
+    peak = []
+    for url in urls * 3:
+        request_all(cache, [url], wait_until)
+        peak.append(cache.memory_size)
+        assert cache.memory_size == sum(len(data) for data in cache.memory.values())
+    assert max(peak) <= limit
+    # O que saiu da memória volta do disco, sem nova requisição
+    assert len(static_server.requests) == 50
+    assert cache.stats()["disk_hits"] > 0
+
+
+def test_images_larger_than_the_memory_bound_are_not_kept(qapp, tmp_path, static_server, wait_until):
+    [url] = serve_emotes(static_server, 1, 5000)
+    cache = ImageCache(AssetCache(str(tmp_path / "images")), memory_bytes=1000)
+    request_all(cache, [url], wait_until)
+    assert cache.memory_size == 0
+
+
+def test_concurrent_requests_share_one_download(qapp, tmp_path, static_server, wait_until):
+    [url] = serve_emotes(static_server, 1, 100)
+    cache = ImageCache(AssetCache(str(tmp_path / "images")))
+    replies = request_all(cache, [url] * 30, wait_until)
+    assert len(set(replies)) == 1
+    assert cache.stats()["downloads"] == 1
+    assert len(static_server.requests) == 1
+
+
+def test_next_start_is_served_from_disk(qapp, tmp_path, static_server, wait_until):
+    urls = serve_emotes(static_server, 5, 100)
+    request_all(ImageCache(AssetCache(str(tmp_path / "images"))), urls, wait_until)
+    
+    cache = ImageCache(AssetCache(str(tmp_path / "images")))
+    request_all(cache, urls, wait_until)
+    assert cache.stats()["disk_hits"] == 5
+    assert len(static_server.requests) == 5
+
+
+def test_failed_download_replies_empty(qapp, tmp_path, static_server, wait_until):
+    cache = ImageCache(AssetCache(str(tmp_path / "images")))
+    [reply] = request_all(cache, [static_server.url("/faltando.png")], wait_until)
+    assert reply == b""
+    assert not cache.memory
+
+
+def test_cache_urls_round_trip():
+    cache = ImageCache(AssetCache("unused"))
+    url = "https://static-cdn.jtvnw.net/emoticons/v2/25/default/dark/1.0?x=ç"
+    assert cache.cache_url(url).startswith("overlay-image:")
+    assert cache.original_url(cache.cache_url(url)) == url
+
+
+def test_image_type():
+    assert image_type(PNG) == b"image/png"
+    assert image_type(b"GIF89a") == b"image/gif"
+    assert image_type(b"RIFF\0\0\0\0WEBP") == b"image/webp"
+    assert image_type(b"  <svg xmlns=''>") == b"image/svg+xml"
+    assert image_type(b"???") == b"application/octet-stream"
@@ -0,0 +1,7 @@
+from import_benchmark import LAZY_MODULES, import_times
+
+
+def test_importing_chat_skips_optional_modules():
+    times = import_times()
+    assert "Chat" in times
+    assert not LAZY_MODULES & times.keys()
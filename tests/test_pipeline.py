@@ -0,0 +1,112 @@
+import threading
+
+from Chat import ChatMessage, MessagePipeline, PipelineStage
+
+
+class UpperStage(PipelineStage):
+    name = "upper"
+    
+    def process(self, messages):
+        return [message.text.upper() for message in messages]
+
+
+class ProcessUpperStage(UpperStage):
+    name = "process_upper"
+    processes = True
+
+
+class ShortStage(PipelineStage):
+    """Devolve um resultado a menos quando recebe a mensagem "curta" """
+    name = "short"
+    batch_size = 1
+    
+    def process(self, messages):
+        if messages[0].text == "curta":
+            return []
+        return [message.text for message in messages]
+
+
+class BlockedStage(PipelineStage):
+    """Fica parado até `release` ser liberado, para encher a fila"""
+    name = "blocked"
+    queue_size = 3
+    batch_size = 1
+    
+    def __init__(self, **options):
+        super().__init__(**options)
+        self.release = threading.Event()
+    
+    def process(self, messages):
+        self.release.wait(5)
+        return [message.text for message in messages]
+
+
+def collect(pipeline):
+    results = []
+    pipeline.results_ready.connect(
+        lambda batch: results.extend(pair for _, pairs in batch for pair in pairs)
+    )
+    return results
+
+
+def messages(count, user=None):
+    return [ChatMessage(user or f"usuario{i}", f"mensagem {i}") for i in range(count)]
+
+
+def test_results_are_paired_with_their_messages(qapp, wait_until):
+    pipeline = MessagePipeline([UpperStage()])
+    results = collect(pipeline)
+    sent = messages(250)
+    pipeline.submit(sent)
+    assert wait_until(lambda: len(results) == 250)
+    pipeline.stop()
+    assert [message for message, _ in results] == sent
+    assert all(result == message.text.upper() for message, result in results)
+
+
+def test_process_stage(qapp, wait_until):
+    pipeline = MessagePipeline([ProcessUpperStage()])
+    results = collect(pipeline)
+    pipeline.submit(messages(20))
+    assert wait_until(lambda: len(results) == 20, timeout=30)
+    pipeline.stop()
+    assert results[0][1] == "MENSAGEM 0"
+
+
+def test_wrong_result_count_drops_the_batch_and_keeps_running(qapp, wait_until, capsys):
+    pipeline = MessagePipeline([ShortStage()])
+    results = collect(pipeline)
+    pipeline.submit([ChatMessage("a", "antes"), ChatMessage("b", "curta"), ChatMessage("c", "depois")])
+    assert wait_until(lambda: len(results) == 2)
+    pipeline.stop()
+    assert [result for _, result in results] == ["antes", "depois"]
+    assert pipeline.stats()["short"]["processed"] == 2
+    assert "0 resultados para 1 mensagens" in capsys.readouterr().out
+
+
+def test_drop_oldest_and_drop_newest(qapp, wait_until):
+    for policy, expected in (("drop_oldest", ["mensagem 7", "mensagem 8", "mensagem 9"]),
+                             ("drop_newest", ["mensagem 1", "mensagem 2", "mensagem 3"])):
+        stage = BlockedStage(policy=policy)
+        pipeline = MessagePipeline([stage])
+        pipeline.submit(messages(1))
+        worker = pipeline.workers[0]
+        # Espera o worker pegar a primeira mensagem e travar nela
+        assert wait_until(lambda: not worker.pending)
+        pipeline.submit(messages(10)[1:])
+        assert [message.text for message in worker.pending] == expected
+        assert pipeline.stats()["blocked"]["dropped"] == 6
+        stage.release.set()
+        pipeline.stop()
+
+
+def test_coalesce_keeps_the_latest_message_per_user(qapp, wait_until):
+    stage = BlockedStage(policy="coalesce")
+    pipeline = MessagePipeline([stage])
+    pipeline.submit(messages(1, user="primeiro"))
+    worker = pipeline.workers[0]
+    assert wait_until(lambda: not worker.pending)
+    pipeline.submit([ChatMessage("a", "1"), ChatMessage("b", "2"), ChatMessage("a", "3")])
+    assert [message.text for message in worker.pending.values()] == ["2", "3"]
+    stage.release.set()
+    pipeline.stop()
@@ -0,0 +1,110 @@
+import pytest
+
+import Chat
+from Chat import ScreenInfo, ScreenLayout
+
+PRIMARY = ScreenInfo("primario", (0, 0, 1920, 1040), 96.0)
+SECOND = ScreenInfo("secundario", (1920, 0, 2560, 1400), 96.0)
+
+
+def layout(*screens):
+    return ScreenLayout(screens=list(screens))
+
+
+def test_round_trip_on_the_same_monitor(qapp):
+    screens = layout(PRIMARY, SECOND)
+    rect = (2300, 200, 300, 600)
+    saved = screens.to_relative(rect)
+    assert saved["screen"] == "secundario"
+    assert (saved["width"], saved["height"], saved["dpi"]) == (300, 600, 96.0)
+    assert screens.place((999, 999), saved, (0, 0)) == rect
+
+
+def test_corner_is_kept_after_a_resolution_change(qapp):
+    saved = layout(PRIMARY).to_relative((1620, 440, 300, 600))  # canto inferior direito
+    smaller = ScreenInfo("primario", (0, 0, 1280, 680), 96.0)
+    assert layout(smaller).place((300, 600), saved, (0, 0)) == (980, 80, 300, 600)
+
+
+def test_dpi_change_keeps_the_physical_size(qapp):
+    saved = layout(PRIMARY).to_relative((0, 0, 300, 400))
+    hidpi = ScreenInfo("primario", (0, 0, 1920, 1040), 192.0)
+    assert layout(hidpi).place((300, 400), saved, (0, 0))[2:] == (600, 800)
+
+
+def test_saving_after_a_dpi_change_does_not_drift(qapp):
+    saved = layout(PRIMARY).to_relative((100, 100, 300, 400))
+    hidpi = layout(ScreenInfo("primario", (0, 0, 1920, 1040), 192.0))
+    
+    # A janela é salva (arrastada ou fechada) já no novo DPI
+    rect = hidpi.place((300, 400), saved, (0, 0))
+    saved = hidpi.to_relative(rect)
+    assert hidpi.place((300, 400), saved, (0, 0))[2:] == (600, 800)
+    # De volta ao DPI original, volta ao tamanho original
+    assert layout(PRIMARY).place((300, 400), saved, (0, 0))[2:] == (300, 400)
+
+
+def test_size_is_clipped_to_a_small_monitor(qapp):
+    saved = layout(PRIMARY).to_relative((0, 0, 300, 700))
+    hidpi = ScreenInfo("primario", (0, 0, 1920, 1040), 192.0)
+    assert layout(hidpi).place((300, 700), saved, (0, 0)) == (0, 0, 600, 1040)
+
+
+def test_missing_monitor_falls_back_to_the_primary(qapp):
+    saved = layout(PRIMARY, SECOND).to_relative((3000, 300, 300, 600))
+    assert layout(PRIMARY).place((300, 600), saved, (3000, 300)) == (1620, 300, 300, 600)
+
+
+def test_old_saved_positions_use_the_configured_size(qapp):
+    saved = {"screen": "primario", "x": 0.5, "y": 0.0, "dpi": 96.0}
+    assert layout(PRIMARY).place((300, 600), saved, (0, 0)) == (810, 0, 300, 600)
+
+
+def test_snap_to_nearby_edges(qapp):
+    screens = layout(PRIMARY, SECOND)
+    assert screens.snap((10, 500, 300, 400)) == (0, 500, 300, 400)
+    assert screens.snap((1615, 500, 300, 400)) == (1620, 500, 300, 400)
+    assert screens.snap((500, -50, 300, 400)) == (500, 0, 300, 400)
+    assert screens.snap((2000, 500, 300, 400)) == (2000, 500, 300, 400)
+
+
+def test_screen_at_picks_the_largest_overlap(qapp):
+    screens = layout(PRIMARY, SECOND)
+    assert screens.screen_at((1800, 0, 300, 400)).id == "secundario"
+    assert screens.screen_at((-5000, 0, 300, 400)).id == "primario"
+
+
+@pytest.fixture
+def screens(qapp, monkeypatch):
+    screens = layout(PRIMARY)
+    monkeypatch.setattr(Chat, "_screen_layout", screens)
+    return screens
+
+
+def test_overlay_keeps_its_size_across_a_dpi_change_and_restart(screens, make_overlay, config):
+    overlay = make_overlay(render_mode="native", width=300, height=400, position_x=100, position_y=100)
+    assert overlay.window_rect() == (100, 100, 300, 400)
+    overlay.save_geometry()  # como ao soltar a janela depois de arrastar
+    
+    screens.screens = [ScreenInfo("primario", (0, 0, 1920, 1040), 192.0)]
+    screens.changed.emit()
+    assert overlay.window_rect()[2:] == (600, 800)
+    
+    # Salva no novo DPI e reinicia com a mesma configuração
+    overlay.save_geometry()
+    overlay.shutdown()
+    restarted = make_overlay()
+    assert restarted.window_rect()[2:] == (600, 800)
+
+
+def test_configured_size_applies_at_the_current_dpi(screens, make_overlay, config):
+    from test_config_changes import apply
+    screens.screens = [ScreenInfo("primario", (0, 0, 1920, 1040), 192.0)]
+    overlay = make_overlay(render_mode="native", width=300, height=400)
+    apply(overlay, {"width": 500, "height": 450})
+    assert overlay.window_rect()[2:] == (500, 450)
+    assert config.get("screen_position")["width"] == 500
+    
+    screens.screens = [PRIMARY]
+    screens.changed.emit()
+    assert overlay.window_rect()[2:] == (250, 225)
@@ -0,0 +1,38 @@
+from overlay_script import run_overlay_script
+
+
+def test_burst_respects_the_cooldown(tmp_path):
+    # 2.000 mensagens em cerca de 2 s, a 1.000 por segundo
+    result = run_overlay_script(
+        tmp_path, {"soundCooldownMs": 500, "soundMaxPerMinute": 0}, perTick=10, total=2000
+    )
+    assert result["messages"] == 2000
+    assert 1 <= result["plays"] <= result["elapsedMs"] // 500 + 1
+
+
+def test_burst_respects_the_limit_per_minute(tmp_path):
+    result = run_overlay_script(
+        tmp_path, {"soundCooldownMs": 0, "soundMaxPerMinute": 5}, perTick=10, total=1000
+    )
+    assert result["plays"] == 5
+
+
+def test_mutations_are_batched_per_frame(tmp_path):
+    # Sem limites, no máximo um toque por quadro, não um por mensagem
+    result = run_overlay_script(
+        tmp_path, {"soundCooldownMs": 0, "soundMaxPerMinute": 0}, perTick=50, tickMs=5, total=5000
+    )
+    assert result["plays"] <= result["frames"]
+    assert result["plays"] < result["messages"] / 10
+
+
+def test_sound_is_loaded_once_across_injections(tmp_path):
+    result = run_overlay_script(tmp_path, injections=3, total=100)
+    assert result["audioElements"] == 1
+    assert result["plays"] == 1
+
+
+def test_no_sound_when_disabled(tmp_path):
+    result = run_overlay_script(tmp_path, {"enableSound": False}, total=500)
+    assert result["audioElements"] == 0
+    assert result["plays"] == 0